@@ -0,0 +1,81 @@
+import argparse
+import statistics
+import time
+from typing import Dict, List
+from langchain_core.callbacks import get_usage_metadata_callback
+from src.service.image_process_service import analyze_submission, PIPELINE_MODES
+from src.utils.image2text import image2text
+
+
+def _usage_totals(usage_metadata: Dict[str, dict]) -> Dict[str, int]:
+    totals = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for usage in usage_metadata.values():
+        for key in totals:
+            totals[key] += usage.get(key, 0)
+    return totals
+
+
+def run_benchmark(image_paths: List[str], solution: str, repeat: int = 1) -> Dict[str, dict]:
+    """
+    같은 OCR 결과에 대해 chain / fused 모드의 분석 단계 지연 시간과 토큰 사용량을 비교합니다.
+    OCR 호출은 두 모드에서 동일하므로 한 번만 실행해 결과를 공유합니다.
+
+    Args:
+        image_paths: 벤치마크할 풀이 이미지 경로 또는 URL 목록
+        solution: 문제의 솔루션
+        repeat: 이미지당 반복 횟수
+
+    Returns:
+        모드별 {"latency_ms": [...], "tokens": {...}, "rejected": int}
+    """
+    texts = []
+    ocr_latency = []
+    for image_path in image_paths:
+        start = time.perf_counter()
+        texts.append(image2text(image_path))
+        ocr_latency.append((time.perf_counter() - start) * 1000)
+
+    report = {"ocr": {"latency_ms": ocr_latency}}
+    for mode in PIPELINE_MODES:
+        latency = []
+        rejected = 0
+        with get_usage_metadata_callback() as callback:
+            for _ in range(repeat):
+                for text in texts:
+                    start = time.perf_counter()
+                    outcome = analyze_submission(text, solution, mode)
+                    latency.append((time.perf_counter() - start) * 1000)
+                    rejected += 0 if outcome.ok else 1
+        report[mode] = {
+            "latency_ms": latency,
+            "tokens": _usage_totals(callback.usage_metadata),
+            "rejected": rejected,
+        }
+    return report
+
+
+def print_report(report: Dict[str, dict]) -> None:
+    runs = len(report["chain"]["latency_ms"])
+    print(f"OCR (shared)  p50 {statistics.median(report['ocr']['latency_ms']):8.1f} ms")
+    print(f"{'mode':8} {'p50 ms':>10} {'max ms':>10} {'in tok/run':>12} {'out tok/run':>12} {'rejected':>9}")
+    for mode in PIPELINE_MODES:
+        result = report[mode]
+        print(
+            f"{mode:8} "
+            f"{statistics.median(result['latency_ms']):10.1f} "
+            f"{max(result['latency_ms']):10.1f} "
+            f"{result['tokens']['input_tokens'] / runs:12.1f} "
+            f"{result['tokens']['output_tokens'] / runs:12.1f} "
+            f"{result['rejected']:9d}"
+        )
+
+
+if __name__ == "__main__":
+    # python -m src.benchmark.pipeline_benchmark src/test/test_math_submit.jpg --solution "..."
+    arg_parser = argparse.ArgumentParser(description="image_process chain vs fused benchmark")
+    arg_parser.add_argument("images", nargs="+", help="풀이 이미지 경로 또는 URL")
+    arg_parser.add_argument("--solution", default="", help="문제의 솔루션")
+    arg_parser.add_argument("--repeat", type=int, default=1)
+    args = arg_parser.parse_args()
+
+    print_report(run_benchmark(args.images, args.solution, args.repeat))
@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+from typing import Dict, List, Tuple
+from src.utils.prevalidate_text import score_text, prevalidate_text, ACCEPT, REJECT, DEFER
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "prevalidation_fixtures.jsonl")
+
+
+def load_fixtures(path: str = FIXTURE_PATH) -> List[dict]:
+    """
+    {"text": str, "valid": bool} 한 줄씩 저장된 라벨 fixture 를 읽습니다.
+    """
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(samples: List[dict], reject_below: float, accept_above: float) -> Dict[str, int]:
+    """
+    주어진 임계값으로 fixture 를 판단한 결과를 셉니다.
+
+    Returns:
+        {"accept", "reject", "defer", "false_accept", "false_reject", "avoided_llm_calls"}
+    """
+    report = {ACCEPT: 0, REJECT: 0, DEFER: 0, "false_accept": 0, "false_reject": 0}
+    for sample in samples:
+        decision = prevalidate_text(sample["text"], reject_below, accept_above).decision
+        report[decision] += 1
+        if decision == ACCEPT and not sample["valid"]:
+            report["false_accept"] += 1
+        if decision == REJECT and sample["valid"]:
+            report["false_reject"] += 1
+    # Every short-circuit skips both the modify and the validate call
+    report["avoided_llm_calls"] = 2 * (report[ACCEPT] + report[REJECT])
+    return report
+
+
+def tune_thresholds(samples: List[dict], max_errors: int = 0, step: float = 0.05) -> Tuple[float, float]:
+    """
+    오판이 max_errors 이하인 임계값 중 LLM 까지 가는 (defer) 건수가 가장 적은 조합을 찾습니다.
+    같으면 더 보수적인 (defer 구간이 넓은) 조합을 고릅니다.
+
+    Returns:
+        (reject_below, accept_above)
+    """
+    grid = [round(i * step, 3) for i in range(int(1 / step) + 1)]
+    best = None
+    for reject_below in grid:
+        for accept_above in grid:
+            if accept_above < reject_below:
+                continue
+            report = evaluate(samples, reject_below, accept_above)
+            if report["false_accept"] + report["false_reject"] > max_errors:
+                continue
+            rank = (report[DEFER], -(accept_above - reject_below))
+            if best is None or rank < best[0]:
+                best = (rank, reject_below, accept_above)
+    if best is None:
+        raise ValueError("no thresholds satisfy max_errors")
+    return best[1], best[2]
+
+
+def print_report(samples: List[dict], reject_below: float, accept_above: float) -> None:
+    report = evaluate(samples, reject_below, accept_above)
+    total = len(samples)
+    print(f"thresholds    reject < {reject_below:.2f}, accept >= {accept_above:.2f}")
+    print(f"samples       {total}")
+    for decision in (ACCEPT, REJECT, DEFER):
+        print(f"{decision:13} {report[decision]:4d} ({report[decision] / total:6.1%})")
+    print(f"false accept  {report['false_accept']:4d}")
+    print(f"false reject  {report['false_reject']:4d}")
+    print(f"LLM calls     {2 * total - report['avoided_llm_calls']:4d} / {2 * total} (avoided {report['avoided_llm_calls']})")
+
+
+if __name__ == "__main__":
+    # python -m src.benchmark.prevalidation_report [--fixtures path] [--max-errors 0] [--scores]
+    parser = argparse.ArgumentParser(description="Tune text pre-validation thresholds on labelled OCR samples")
+    parser.add_argument("--fixtures", default=FIXTURE_PATH)
+    parser.add_argument("--max-errors", type=int, default=0)
+    parser.add_argument("--scores", action="store_true", help="print the score of every sample")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if args.scores:
+        for fixture in sorted(fixtures, key=lambda fixture: score_text(fixture["text"])):
+            print(f"{score_text(fixture['text']):.3f} {'valid  ' if fixture['valid'] else 'invalid'} {fixture['text'][:60]!r}")
+    print_report(fixtures, *tune_thresholds(fixtures, args.max_errors))
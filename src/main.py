@@ -1,17 +1,33 @@
 from src.model.image_model import ImageProcessRequest, ImageGenerationRequest
-from fastapi import FastAPI, Header, Response, HTTPException, BackgroundTasks, Request
+from fastapi import FastAPI, Header, Response, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
 from typing import List
 from src.model.assignment_model import AssignmentAnalysisRequest
 from src.model.problem_model import ProblemStatsModel, AssignmentReview
 from src.model.landing_page_model import LandingPageModel
 from src.model.response_model import BaseResponse
+from src.model.job_model import JobStatusResponse
 from src.service import chat_service, generate_service, landing_page_service, assignment_analysis_service, \
     image_service, image_process_service, new_generate_service
 from src.model.chat_model import *
 from src.model.generate_model import *
 from src.service import problem_service
 from src.utils.get_assignment_analysis import get_assignment_analysis as gaa
-from src.utils.validate_image import validate_image_url
+from src.utils.fetch_image import fetch_image, spool_image, ImageFetchError
+from src.utils.job_queue import get_job_queue, JOB_WORKERS
+from src.utils.llm_client import get_pool_metrics
+from src.utils.model_routing import load_model_routes
+from src.utils.problem_repository import get_problem_repository
+from src.utils.problem_counters import get_counter_writer
+from src.utils.prevalidate_text import get_prevalidation_metrics
+from src.utils.llm_usage import get_prompt_cache_metrics, get_prompt_token_metrics
+from src.utils.map_reduce_summary import get_analysis_summarizer
+from src.utils.problem_analysis_cache import get_problem_analysis_cache
+from src.utils.llm_governor import get_llm_governor
+from src.utils.chat_session import require_shared_sessions
+from src.worker import create_worker_pool
+import asyncio
 import logging
 import time
 import json
@@ -19,7 +35,25 @@ import json
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # JOB_WORKERS=0 이면 웹 프로세스는 enqueue 만 하고, 워커는 python -m src.worker 로 분리 실행
+    # Invalid routing config fails here instead of on the first request
+    load_model_routes()
+    if JOB_WORKERS == 0:
+        require_shared_sessions()
+    pool = create_worker_pool() if JOB_WORKERS > 0 else None
+    if pool:
+        pool.start()
+    yield
+    if pool:
+        pool.stop()
+    get_counter_writer().close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.middleware("http")
@@ -56,68 +90,152 @@ async def log_request(request: Request, call_next):
 
 
 @app.post("/chat", summary="학생 LLM 채팅")
-def talk_chatbot(chat_request: ChatRequest, Authorization: Union[str, None] = Header(default=None)) -> ChatResponse:
-    return chat_service.response_chat(chat_request, Authorization)
+async def talk_chatbot(chat_request: ChatRequest, Authorization: Union[str, None] = Header(default=None)) -> ChatResponse:
+    return await chat_service.response_chat(chat_request, Authorization)
+
+
+@app.post("/chat/stream", summary="학생 LLM 채팅 (SSE 스트리밍)")
+async def talk_chatbot_stream(chat_request: ChatRequest, Authorization: Union[str, None] = Header(default=None)) -> StreamingResponse:
+    chat_input = await chat_service.prepare_chat(chat_request, Authorization)
+
+    # Starlette cancels the generator on client disconnect, which closes the upstream LLM stream
+    return StreamingResponse(
+        chat_service.stream_chat(chat_input),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.post("/problem/generate", summary="관리자 비슷한 문제 생성")
-def generate_problem(generate_request: GenerateRequest) -> BaseResponse:
-    return generate_service.generate_problem(generate_request)
-    # return new_generate_service.generate_problem(generate_request)
+async def generate_problem(generate_request: GenerateRequest) -> BaseResponse:
+    return await generate_service.generate_problem(generate_request)
+    # return await new_generate_service.generate_problem(generate_request)
 
 
 @app.post("/submission/analyze", summary="학생 제출 이미지 텍스트 분석 및 저장")
-async def image_analysis(analysis_request: ImageProcessRequest, background_tasks: BackgroundTasks) -> BaseResponse:
-    # Get submission image from image URL
-    if not validate_image_url(analysis_request.imageURL):
+async def image_analysis(analysis_request: ImageProcessRequest) -> BaseResponse:
+    # Get submission image from image URL (downloaded once, the worker reads the spooled copy)
+    try:
+        image = await fetch_image(analysis_request.imageURL)
+    except ImageFetchError as e:
         raise HTTPException(status_code=400, detail="invalid image URL or format")
-    background_tasks.add_task(image_process_service.image_process, analysis_request)
+    payload = analysis_request.model_dump()
+    payload["imagePath"] = await asyncio.to_thread(spool_image, image)
+    job = await asyncio.to_thread(get_job_queue().enqueue, "image_process", payload)
 
-    return BaseResponse(status_code=200, message="Image processing started successfully.")
+    return BaseResponse(status_code=200, message="Image processing started successfully.", data={"jobId": job.id})
+
+
+@app.get("/submission/jobs/{job_id}", summary="학생 제출 이미지 분석 작업 상태 조회")
+def get_submission_job(job_id: str) -> JobStatusResponse:
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return JobStatusResponse(
+        jobId=job.id,
+        task=job.task,
+        status=job.status,
+        attempts=job.attempts,
+        maxAttempts=job.max_attempts,
+        result=job.result,
+        error=job.error,
+        createdAt=job.created_at,
+        updatedAt=job.updated_at,
+    )
 
 
 @app.post("/assignment/analyze", summary="과제 마감 후 제출물 분석")
-def analyze_assignment(a_a_request: AssignmentAnalysisRequest, authorization: str = Header(None)) -> BaseResponse:
-    return assignment_analysis_service.analyze_assignment(a_a_request, authorization)
+async def analyze_assignment(a_a_request: AssignmentAnalysisRequest, authorization: str = Header(None)) -> BaseResponse:
+    return await assignment_analysis_service.analyze_assignment(a_a_request, authorization)
 
 
 @app.get("/assignment/analysis", summary="과제 분석 내용 조회")
 # def get_assignment_analysis(acaId: str, assignmentId: str, authorization: str = Header(None)) -> BaseResponse:
 #     return assignment_analysis_service.get_assignment_analysis(acaId, assignmentId, authorization)
-def get_assignment_analysis(courseId: str, assignmentId: str) -> BaseResponse:
-    return gaa(courseId, assignmentId)
+async def get_assignment_analysis(courseId: str, assignmentId: str) -> BaseResponse:
+    return await gaa(courseId, assignmentId)
 
 
 @app.post("/landing/{subdomain}", summary="랜딩 페이지 Create")
-def create_landing_page(subdomain: str, landing_page_request: LandingPageModel):
-    return landing_page_service.create_landing_page(subdomain, landing_page_request)
+async def create_landing_page(subdomain: str, landing_page_request: LandingPageModel):
+    return await landing_page_service.create_landing_page(subdomain, landing_page_request)
 
 
 @app.get("/landing/{subdomain}", summary="랜딩 페이지 Read")
-def get_landing_page(subdomain: str) -> LandingPageModel:
-    return landing_page_service.get_landing_page(subdomain)
+async def get_landing_page(subdomain: str, request: Request, response: Response) -> LandingPageModel:
+    landing_page, etag = await landing_page_service.get_landing_page_with_etag(subdomain)
+
+    # Browsers / CDNs revalidate every time and get 304 while the content is unchanged
+    headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+    if landing_page_service.etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return landing_page
 
 
 @app.put("/landing/{subdomain}", summary="랜딩 페이지 Update")
-def update_landing_page(subdomain: str, landing_page_request: LandingPageModel):
-    return landing_page_service.update_landing_page(subdomain, landing_page_request)
+async def update_landing_page(subdomain: str, landing_page_request: LandingPageModel):
+    return await landing_page_service.update_landing_page(subdomain, landing_page_request)
 
 
 @app.get("/problem/stats", summary="문제에 대한 통계를 조회하는 API")
-def get_problem_stats(subdomain: str, problem_id: str) -> ProblemStatsModel:
-    return problem_service.get_problem_stats(subdomain, problem_id)
+async def get_problem_stats(subdomain: str, problem_id: str) -> ProblemStatsModel:
+    return await problem_service.get_problem_stats(subdomain, problem_id)
 
 
 @app.get("/problem_analysis", summary="문제 분석 생성 및 조회 API")
-def problem_analysis(problem_id: str) -> str:
-    return problem_service.get_analysis_summary(problem_id)
+async def problem_analysis(problem_id: str) -> str:
+    return await problem_service.get_analysis_summary(problem_id)
 
 
 @app.get("/review", summary="학생의 과제 분석 결과를 조회하는 API")
-def get_student_assignment_review(student_id: str, assignment_id: str) -> List[AssignmentReview]:
-    return problem_service.get_student_assignment_review(student_id, assignment_id)
+async def get_student_assignment_review(student_id: str, assignment_id: str) -> List[AssignmentReview]:
+    return await problem_service.get_student_assignment_review(student_id, assignment_id)
 
 
 @app.post("/image_generation", summary="이미지 생성 요청 API")
-def image_generation(image_request: ImageGenerationRequest) -> Response:
-    return image_service.generate_image(image_request)
+async def image_generation(image_request: ImageGenerationRequest) -> Response:
+    return await image_service.generate_image(image_request)
+
+
+@app.get("/metrics/llm_clients", summary="LLM 클라이언트 커넥션 풀 사용량 조회 API")
+def llm_client_metrics() -> dict:
+    return get_pool_metrics()
+
+
+@app.get("/metrics/problem_cache", summary="문제 캐시 적중률 조회 API")
+def problem_cache_metrics() -> dict:
+    return get_problem_repository().metrics()
+
+
+@app.get("/metrics/text_validation", summary="OCR 텍스트 사전 검증으로 건너뛴 LLM 호출 수 조회 API")
+def text_validation_metrics() -> dict:
+    return get_prevalidation_metrics()
+
+
+@app.get("/metrics/prompt_cache", summary="프롬프트별 provider 프롬프트 캐시 적중률 조회 API")
+def prompt_cache_metrics() -> dict:
+    return get_prompt_cache_metrics()
+
+
+@app.get("/metrics/prompt_tokens", summary="프롬프트 변수별 토큰 수와 예산 초과로 잘린 호출 수 조회 API")
+def prompt_token_metrics() -> dict:
+    return get_prompt_token_metrics()
+
+
+@app.get("/metrics/analysis_summary", summary="문제 분석 부분 요약 캐시 사용량 조회 API")
+def analysis_summary_metrics() -> dict:
+    return get_analysis_summarizer().metrics()
+
+
+@app.get("/metrics/problem_analysis", summary="문제 분석 요약 캐시 적중률 조회 API")
+def problem_analysis_metrics() -> dict:
+    return get_problem_analysis_cache().metrics()
+
+
+@app.get("/metrics/llm_governor", summary="LLM 호출 lane 별 대기열 / 대기 시간과 남은 RPM / TPM 조회 API")
+def llm_governor_metrics() -> dict:
+    governor = get_llm_governor()
+    return governor.metrics() if governor else {"enabled": False}
@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Union
+from pydantic import BaseModel
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """
+    작업 큐에 저장되는 작업
+
+    Args :
+        - id : 작업 id
+        - task : 실행할 핸들러 이름
+        - payload : 핸들러에 전달할 데이터
+        - status : queued / running / succeeded / failed
+        - attempts : 시도 횟수
+        - max_attempts : 최대 시도 횟수
+        - available_at : 다음 실행 가능 시각 (epoch seconds)
+        - locked_until : visibility timeout 만료 시각 (epoch seconds)
+    """
+    id: str
+    task: str
+    payload: Dict[str, Any]
+    status: str = JOB_QUEUED
+    attempts: int = 0
+    max_attempts: int = 3
+    result: Union[Dict[str, Any], None] = None
+    error: Union[str, None] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    available_at: float = 0.0
+    locked_until: float = 0.0
+
+
+class JobStatusResponse(BaseModel):
+    """
+    작업 상태 조회 응답
+
+    Args :
+        - jobId: str
+        - task: str
+        - status: str
+        - attempts: int
+        - maxAttempts: int
+        - result: Union[dict, None]
+        - error: Union[str, None]
+        - createdAt: float
+        - updatedAt: float
+    """
+    jobId: str
+    task: str
+    status: str
+    attempts: int
+    maxAttempts: int
+    result: Union[Dict[str, Any], None] = None
+    error: Union[str, None] = None
+    createdAt: float
+    updatedAt: float
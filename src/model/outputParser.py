@@ -127,3 +127,19 @@ class VerifyResult(BaseModel):
     - verification : bool
     """
     verification : bool = Field(description="True or False")
+
+
+class FusedAnalysisResult(BaseModel):
+    """
+    텍스트 수정, 유효성 판단, 풀이 분석, 이유 분류를 한 번에 처리한 결과
+
+    Args :
+        - text : str
+        - validity : bool
+        - analysis : str
+        - reason : str
+    """
+    text: str = Field(description="validated_text")
+    validity: bool = Field(description="True or False")
+    analysis: str = Field(description="Submission Explanation Result")
+    reason: str = Field(description="Reason Categorize Result")
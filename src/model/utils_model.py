@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -9,4 +9,157 @@ class TextResponse:
         - text: str
     """
     ok: bool
-    text: str
\ No newline at end of file
+    text: str
+
+
+@dataclass
+class AnalysisOutcome:
+    """
+    image_process 분석 단계 결과
+
+    Args :
+        - ok : bool
+        - text: str
+        - analysis: str
+        - reason: str
+    """
+    ok: bool
+    text: str
+    analysis: str = ""
+    reason: str = ""
+
+
+@dataclass
+class PreparedImage:
+    """
+    vision 요청용으로 전처리된 이미지
+
+    Args :
+        - data : bytes
+        - mime_type : str
+        - width : int
+        - height : int
+        - detail : "low" / "high"
+    """
+    data: bytes
+    mime_type: str
+    width: int
+    height: int
+    detail: str
+
+
+@dataclass
+class FetchedImage:
+    """
+    검증을 통과한 제출 이미지
+
+    Args :
+        - data : bytes
+        - image_format : "JPEG" / "PNG"
+        - etag : ETag 헤더
+        - last_modified : Last-Modified 헤더
+    """
+    data: bytes
+    image_format: str
+    etag: str = None
+    last_modified: str = None
+
+
+@dataclass
+class TextScore:
+    """
+    OCR 텍스트 사전 검증 결과
+
+    Args :
+        - decision : "accept" / "reject" / "defer" (LLM 으로 판단)
+        - score : 0 ~ 1 품질 점수
+        - reason : 판단 근거
+    """
+    decision: str
+    score: float
+    reason: str = ""
+
+
+@dataclass
+class AnswerKey:
+    """
+    문제의 정답 정보
+
+    Args :
+        - problem_type : "subjective" / "select" / "multi"
+        - answers : 정답 (subjective 는 값, select / multi 는 선택지 인덱스)
+        - choices : 선택지
+    """
+    problem_type: str
+    answers: list
+    choices: list
+
+
+@dataclass
+class ChatSession:
+    """
+    (assignmentUuid, problemId, sub) 단위의 채팅 세션
+
+    Args :
+        - problem : 조회한 문제 (None 이면 다시 조회)
+        - submission : 조회한 제출물 (None 이면 다시 조회)
+        - summary : 압축된 이전 대화 요약
+        - history : 최근 대화 [{"role": "student" / "teacher", "text": str}]
+    """
+    problem: dict = None
+    submission: dict = None
+    summary: str = ""
+    history: list = field(default_factory=list)
+
+
+@dataclass
+class AnalysisSummaryEntry:
+    """
+    저장된 문제 분석 요약
+
+    Args :
+        - summary : 문제 분석
+        - watermark : 요약에 포함된 제출물들의 지문 (제출물 수 + 키 / 분석 해시)
+        - computed_at : 마지막으로 확인한 시각 (epoch 초)
+        - fresh_until : 이 시각까지는 제출물을 다시 확인하지 않고 그대로 반환 (epoch 초)
+    """
+    summary: str
+    watermark: str
+    computed_at: float
+    fresh_until: float
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """
+    파이프라인 단계별 모델 설정
+
+    Args :
+        - model : 기본 모델
+        - temperature : 샘플링 온도
+        - max_tokens : 최대 출력 토큰 수 (None 이면 모델 기본값)
+        - timeout : 호출 제한 시간 (초), 넘으면 다음 fallback 모델로 넘어갑니다
+        - fallbacks : 기본 모델이 실패하거나 제한 시간을 넘었을 때 순서대로 시도할 모델
+    """
+    model: str
+    temperature: float = 0.5
+    max_tokens: int = None
+    timeout: float = None
+    fallbacks: tuple = ()
+
+
+@dataclass
+class LLMPermit:
+    """
+    LLM 호출 조절기에서 받은 호출 차례
+
+    Args :
+        - lane : 호출 lane (interactive / admin / background)
+        - academy : 학원 id
+        - tokens : 차례를 받을 때 차감한 추정 토큰 수
+        - waited : 차례를 받기까지 기다린 시간 (초)
+    """
+    lane: str
+    academy: str
+    tokens: int
+    waited: float
@@ -1,26 +1,38 @@
-import boto3
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Set, Tuple
 import logging
 import dotenv
-from langchain.chains.llm import LLMChain
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
-from src.model.outputParser import *
 from src.model.chat_model import ChatRequest, ChatResponse
 from src.utils.extract_claim_sub import extract_claim_sub
 from src.utils.guard_injection import guard_injection
+from src.utils.ddb_executor import run_ddb
+from src.utils.ddb import assignment_submits_table
+from src.utils.model_routing import get_route, get_stage_model
+from src.utils.prompt_registry import get_chain, get_prompt, prompt_version
+from src.utils.token_count import fit_prompt
+from src.utils.llm_usage import record_message_usage
+from src.utils.llm_governor import INTERACTIVE, estimate_call_tokens, get_llm_governor, governed, llm_lane, used_tokens
+from langchain_core.output_parsers import StrOutputParser
+from src.utils.problem_repository import get_problem_repository, CHAT_PROBLEM_FIELDS
+from src.utils.chat_session import get_chat_session_store, render_history, render_messages, split_for_compaction, \
+    CONTEXT, STUDENT, TEACHER
+from src.model.utils_model import ChatSession
 from fastapi import HTTPException
 
 logger = logging.getLogger(__name__)
 dotenv.load_dotenv()
 
-ddb = boto3.resource(
-    'dynamodb',
-    region_name='ap-northeast-2'
-)
+# Session saves / compactions running after the response, kept referenced until they finish
+_background: Set[asyncio.Task] = set()
 
 
-def response_chat(chat_request: ChatRequest, authorization: str) -> ChatResponse:
+def _track(task: asyncio.Task) -> None:
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def response_chat(chat_request: ChatRequest, authorization: str) -> ChatResponse:
     """
     학생의 질문 사항과 문제, 학생의 제출물을 기반으로 학생의 질문에 대한 답을 리턴하는 함수
     Args:
@@ -31,6 +43,31 @@ def response_chat(chat_request: ChatRequest, authorization: str) -> ChatResponse
 
     """
 
+    chat_input = await prepare_chat(chat_request, authorization)
+
+    # Request to LLM to get response with problem and submission
+    llm = get_stage_model("chat")
+
+    chain = get_chain("chat", llm)
+    with llm_lane(INTERACTIVE, chat_input.get("academy")):
+        chat_result = await chain.ainvoke(_prompt_input("chat", chat_input))
+
+        await record_turn(chat_input, chat_result.chat)
+
+    return ChatResponse(
+        message=chat_result.chat
+    )
+
+
+async def prepare_chat(chat_request: ChatRequest, authorization: str) -> Dict[str, Any]:
+    """
+    인증, injection 검사 후 채팅 프롬프트 입력을 만듭니다.
+    스트리밍 응답은 시작한 뒤에는 상태 코드를 바꿀 수 없으므로, 실패는 여기서 HTTPException 으로 끝냅니다.
+
+    Returns:
+        {"problem", "submission", "history", "question", "session_key", "session", "academy"}
+    """
+
     sub, ok, e = extract_claim_sub(authorization)
     if not ok:
         logger.error(e)
@@ -43,65 +80,183 @@ def response_chat(chat_request: ChatRequest, authorization: str) -> ChatResponse
             detail="Forbidden: Bad input detected"
         )
 
-    # Get problem from ddb-problems
-    problem = ddb.Table("problems").get_item(
-        Key={"PK": chat_request.acaSubdomain, "SK": f"PROBLEM#{chat_request.problemId}"}
-    )
+    # Follow-up questions reuse the problem / submission kept in the session
+    session_key = (chat_request.assignmentUuid, chat_request.problemId, sub)
+    store = get_chat_session_store()
+    session = await asyncio.to_thread(store.get, *session_key)
+    if session is None:
+        # Seed a new session with the context the client kept, skipping anything the guard rejects
+        # The context mixes both sides without roles, so it goes in as one unattributed block
+        context = [text for text in chat_request.context or [] if text and guard_injection(text)]
+        session = ChatSession(history=[{"role": CONTEXT, "text": "\n".join(context)}] if context else [])
 
-    # Get submission from ddb-assignment_submits
-    submission = get_submission(chat_request, sub)
+    if session.problem is None or session.submission is None:
+        # Get problem from ddb-problems and submission from ddb-assignment_submits concurrently
+        session.problem, session.submission = await asyncio.gather(
+            get_problem_repository().aget(chat_request.acaSubdomain, chat_request.problemId, CHAT_PROBLEM_FIELDS),
+            get_submission(chat_request, sub),
+        )
 
-    # Request to LLM to get response with problem and submission
-    llm = ChatOpenAI(
-        model="gpt-4o",
-        temperature=0.5
-    )
+    return {
+        "problem": session.problem,
+        "submission": session.submission,
+        "history": render_history(session),
+        "question": chat_request.message,
+        "session_key": session_key,
+        "session": session,
+        "academy": chat_request.acaSubdomain,
+    }
 
-    parser = PydanticOutputParser(pydantic_object=ChatResult)
-
-    chat_prompt = """
-            당신은 수학 교사입니다.
-            다음은 학생이 제출한 답변과 문제, 그리고 학생의 질문 사항입니다.
-            문제: {problem}
-            학생이 제출한 답변: {submission}
-            학생의 질문 사항: {question}
-
-            문제와 학생이 제출한 답을 바탕으로 학생의 질문 사항을 다음과 같은 지침에 따라 분석해 주세요.
-            단 질문 내용이 직접적으로 답변에 존재해서는 안됩니다. 
-            1. 만약 학생이 제출한 답이 없거나 문제 풀이 분석 내용이 없다면 질문 사항에 답이 없다고 말하고, 질문 사항과 답에 대해서 적절히 답변을 생성해 주세요.
-            2. 제출 사항이 있다면 문제의 정답과 솔루션을 바탕으로 학생의 질문에 상세히 답변해 주세요.
-            3. 질문의 답변을 학생의 풀이 과정에 대한 분석 내용과 틀린 이유에 맞춰 요약해 주세요.
-            4. 요약한 답변이 여전히 문제의 솔루션과 정답에 반하지 않는지 확인해 주세요.
-            5. 문제의 정답과 학생의 정답이 같더라도 풀이과정이 틀렸다면, 학생의 풀이과정에 대한 분석 내용을 포함하여 답변해 주세요.
-            6. 검증한 답변을 문장 단위로 행간 처리 하고 정리한 후 요약해 주세요.
-            7. 요약한 내용을 마크다운 형식으로 수정해 주세요.
-
-            {format_instructions}    
-            """
-    prompt = PromptTemplate(
-        template=chat_prompt,
-        input_variables=["problem", "submission", "question"],
-        partial_variables={
-            "format_instructions": parser.get_format_instructions()
-        }
-    )
 
-    chain = LLMChain(llm=llm, prompt=prompt)
-    llm_response = chain.run(
-        problem=problem,
-        submission=submission,
-        question=chat_request.message,
-    )
+def _prompt_input(name: str, chat_input: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: chat_input[key] for key in get_prompt(name).spec.input_variables}
 
-    chat_result = parser.parse(llm_response)
 
-    return ChatResponse(
-        message=chat_result.chat
-    )
+async def compact_history(session: ChatSession) -> None:
+    """
+    대화가 CHAT_HISTORY_TOKEN_BUDGET 을 넘으면 오래된 대화를 요약에 합칩니다.
+    요약에 실패하면 대화를 그대로 두고 다음 질문에서 다시 시도합니다.
+    """
+    older, recent = split_for_compaction(session)
+    if not older:
+        return
+
+    llm = get_stage_model("chat_summary")
+    chain = get_prompt("chat_summary").prompt | governed(llm, get_route("chat_summary").max_tokens)
+    try:
+        message = await chain.ainvoke(fit_prompt("chat_summary", {
+            "summary": session.summary or "없음",
+            "history": render_messages(older),
+        }))
+    except Exception as e:
+        logger.warning(f"chat history compaction failed: {e}")
+        return
+
+    record_message_usage(prompt_version("chat_summary"), message)
+    session.summary = StrOutputParser().invoke(message).strip()
+    session.history = recent
+
+
+async def compact_saved_session(session_key: Tuple[str, str, str], session: ChatSession) -> None:
+    """
+    저장된 세션의 대화를 요약에 합치고 다시 저장합니다. (응답을 보낸 뒤 백그라운드에서 실행)
+    그 사이 다음 질문이 저장되었을 수 있으므로, 저장된 세션에서 요약한 앞부분만 요약으로 바꿉니다.
+    """
+    summary, history = session.summary, list(session.history)
+    await compact_history(session)
+    if session.history == history:
+        return
+
+    older = history[:len(history) - len(session.history)]
+    store = get_chat_session_store()
+    try:
+        latest = await asyncio.to_thread(store.get, *session_key)
+        if latest is None or latest.summary != summary or latest.history[:len(older)] != older:
+            logger.info("chat session changed during compaction, skipping")
+            return
+        latest.summary = session.summary
+        latest.history = latest.history[len(older):]
+        await asyncio.to_thread(store.save, *session_key, latest)
+    except Exception as e:
+        logger.error(f"failed to save compacted chat session: {e}")
+
+
+async def record_turn(chat_input: Dict[str, Any], answer: str) -> None:
+    """
+    질문과 답변을 저장된 세션에 추가하고 저장합니다. 세션 저장 실패는 답변에 영향을 주지 않습니다.
+    같은 세션의 다른 질문이 그 사이 저장되었을 수 있으므로, 저장 직전에 세션을 다시 읽어 그 뒤에 붙입니다.
+    대화가 예산을 넘으면 요약 (LLM 호출) 은 백그라운드 작업으로 넘겨 응답을 늦추지 않습니다.
+
+    Args:
+        chat_input: prepare_chat 결과
+        answer: 선생님 답변
+    """
+    session_key: Tuple[str, str, str] = chat_input.get("session_key")
+    session: ChatSession = chat_input.get("session")
+    if session_key is None or session is None:
+        return
+
+    turn = [{"role": STUDENT, "text": chat_input["question"]}, {"role": TEACHER, "text": answer}]
+
+    def append() -> ChatSession:
+        # Another message in the same session may have been saved since prepare_chat, append to the stored copy
+        store = get_chat_session_store()
+        latest = store.get(*session_key) or ChatSession(history=list(session.history))
+        if latest.problem is None or latest.submission is None:
+            latest.problem, latest.submission = session.problem, session.submission
+        latest.history.extend(turn)
+        store.save(*session_key, latest)
+        return latest
+
+    try:
+        saved = await asyncio.to_thread(append)
+    except Exception as e:
+        logger.error(f"failed to save chat session: {e}")
+        return
+
+    older, _ = split_for_compaction(saved)
+    if older:
+        _track(asyncio.create_task(compact_saved_session(session_key, saved)))
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def stream_chat(chat_input: Dict[str, Any]) -> AsyncIterator[str]:
+    """
+    채팅 답변을 토큰이 도착하는 대로 SSE 이벤트로 내보냅니다.
+    클라이언트가 연결을 끊으면 이 generator 가 취소되고, 진행 중인 LLM 스트림도 함께 닫힙니다.
+
+    Args:
+        chat_input: prepare_chat 결과
+
+    Returns:
+        "token" 이벤트들과 전체 메시지를 담은 "done" 이벤트 (실패 시 "error")
+    """
+    llm = get_stage_model("chat")
+    prompt = get_prompt("chat_stream").prompt.invoke(fit_prompt("chat_stream", _prompt_input("chat_stream", chat_input)))
+
+    chunks = []
+    final = None
+    governor = get_llm_governor()
+    permit = None
+    try:
+        if governor is not None:
+            permit = await governor.aacquire(
+                estimate_call_tokens(prompt, get_route("chat").max_tokens),
+                lane=INTERACTIVE,
+                academy=chat_input.get("academy"),
+            )
+        async for chunk in llm.astream(prompt):
+            # Usage arrives on the last chunk, so keep the running sum
+            final = chunk if final is None else final + chunk
+            token = chunk.content
+            if token:
+                chunks.append(token)
+                yield _sse("token", {"text": token})
+    except asyncio.CancelledError:
+        logger.info(f"chat stream cancelled by client after {len(chunks)} tokens")
+        raise
+    except Exception as e:
+        logger.error(f"chat stream failed: {e}")
+        yield _sse("error", {"message": "failed to generate response"})
+        return
+    finally:
+        if permit is not None:
+            await governor.asettle(permit, used_tokens(final))
+
+    record_message_usage(prompt_version("chat_stream"), final)
+    message = "".join(chunks)
+    # Saved in the background so "done" goes out right away, even if the client closes after it
+    with llm_lane(INTERACTIVE, chat_input.get("academy")):
+        _track(asyncio.create_task(record_turn(chat_input, message)))
+    yield _sse("done", {"message": message})
 
 
-def get_submission(chat_request: ChatRequest, sub: str):
-    submission = ddb.Table("assignment_submits").get_item(
+async def get_submission(chat_request: ChatRequest, sub: str):
+    submission = await run_ddb(
+        assignment_submits_table().get_item,
         Key={
             "PK": f"ASSIGNMENT#{chat_request.assignmentUuid}",
             "SK": f"{sub}#{chat_request.problemId}"}
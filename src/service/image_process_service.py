@@ -1,23 +1,146 @@
 import logging
-import boto3
+import os
+import threading
 import dotenv
 import json
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_core.prompts import PromptTemplate
 from src.model.image_model import *
 from src.model.response_model import *
-from langchain_openai import ChatOpenAI
-from langchain.chains import LLMChain
-from src.model.outputParser import AnalysisResult, ReasonResult
 from src.model.categories import categories
 from src.utils.image2text import image2text
+from src.utils.fetch_image import load_spooled_image, remove_spooled_image
+from src.utils.job_queue import PermanentJobError, is_final_attempt
 from src.utils.text_validation import text_validation
-from src.model.utils_model import TextResponse
+from src.utils.prevalidate_text import prevalidate_text, record_decision, PREVALIDATION_ENABLED, REJECT
+from src.model.utils_model import TextResponse, AnalysisOutcome, AnswerKey
+from src.utils.model_routing import get_stage_model
+from src.utils.prompt_registry import get_chain
+from src.utils.problem_repository import get_problem_repository
+from src.utils.ddb import assignment_submits_table
+from src.utils.problem_counters import get_counter_writer, CORRECT_REASON, COUNTER_WRITE_WAIT
+from src.utils.answer_match import match_answer, answer_key_from_problem, ANSWER_FIELDS, ANSWER_MATCH_ENABLED
+from src.utils.stage_executor import Stage, StageError, run_stages, raise_if_cancelled
+from src.utils.chat_session import get_chat_session_store
+from src.utils.problem_analysis_cache import get_problem_analysis_cache
+from src.utils.llm_governor import BACKGROUND, llm_lane
 
 logger = logging.getLogger(__name__)
 dotenv.load_dotenv()
 
-def image_process(i_p_request: ImageProcessRequest):
+# "chain": 수정 -> 유효성 -> 분석 -> 분류를 각각 호출 (기본값)
+# "fused": 수정, 유효성, 분석, 분류를 한 번의 structured output 호출로 처리
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "chain")
+PIPELINE_MODES = ("chain", "fused")
+
+# image_process 단계별 제한 시간 (초)
+STAGE_OCR_TIMEOUT = float(os.getenv("STAGE_OCR_TIMEOUT", "60"))
+STAGE_PROBLEM_TIMEOUT = float(os.getenv("STAGE_PROBLEM_TIMEOUT", "10"))
+STAGE_ANALYZE_TIMEOUT = float(os.getenv("STAGE_ANALYZE_TIMEOUT", "180"))
+
+
+def analyze_chain(converted_text: str, solution: str, answer_key: AnswerKey = None, cancelled: threading.Event = None) -> AnalysisOutcome:
+    """
+    OCR 텍스트를 수정 / 유효성 / 분석 / 분류 4번의 LLM 호출로 처리합니다.
+    최종 답이 정답과 일치하면 분류 호출 없이 "정답" 으로 처리합니다.
+
+    Args:
+        converted_text: 이미지로부터 추출된 텍스트
+        solution: 문제의 솔루션
+        answer_key: 문제의 정답 정보 (없으면 항상 LLM 으로 분류)
+        cancelled: 파이프라인 취소 신호 (세워지면 다음 LLM 호출 전에 StageCancelled)
+
+    Returns:
+        AnalysisOutcome
+    """
+
+    # Text Validity Check
+    text_response : TextResponse = text_validation(converted_text, cancelled)
+    if not text_response.ok :
+        logger.error(f"failed to text_validity {text_response.ok}")
+        return AnalysisOutcome(False, "")
+
+    logger.info(f"text_response: {text_response}")
+
+    # Request analysis to LLM with submission and solution
+    raise_if_cancelled(cancelled)
+    llm = get_stage_model("analyze")
+
+    analysis_result = get_chain("analysis", llm).invoke({
+        "explanation": text_response.text,
+        "solution": solution,
+    })
+
+    # Final answer matches the stored answer -> no need to ask for the reason
+    if ANSWER_MATCH_ENABLED and match_answer(text_response.text, answer_key):
+        logger.info("final answer matched, skipping categorize")
+        return AnalysisOutcome(True, text_response.text, analysis_result.analysis, CORRECT_REASON)
+
+    # Request LLM to categorize incorrect_reason from submission_analysis
+    raise_if_cancelled(cancelled)
+    llm = get_stage_model("categorize")
+    categorize_result = get_chain("categorize", llm).invoke({
+        "analysis_result": analysis_result.analysis,
+        "categories": json.dumps(categories),
+    })
+
+    return AnalysisOutcome(True, text_response.text, analysis_result.analysis, categorize_result.reason)
+
+
+def analyze_fused(converted_text: str, solution: str, cancelled: threading.Event = None) -> AnalysisOutcome:
+    """
+    OCR 텍스트의 수정, 유효성 판단, 분석, 이유 분류를 한 번의 LLM 호출로 처리합니다.
+
+    Args:
+        converted_text: 이미지로부터 추출된 텍스트
+        solution: 문제의 솔루션
+        cancelled: 파이프라인 취소 신호 (세워지면 LLM 호출 전에 StageCancelled)
+
+    Returns:
+        AnalysisOutcome
+    """
+    # Blank / garbage OCR output is rejected without the fused call
+    if PREVALIDATION_ENABLED:
+        pre = prevalidate_text(converted_text)
+        # Only a reject skips the fused call; an accept still needs the analysis
+        record_decision(pre.decision, skipped_calls=1 if pre.decision == REJECT else 0)
+        if pre.decision == REJECT:
+            logger.error("failed to text_validity: rejected by pre-validation")
+            return AnalysisOutcome(False, "")
+
+    raise_if_cancelled(cancelled)
+    llm = get_stage_model("fused_analysis")
+    fused_result = get_chain("fused_analysis", llm).invoke({
+        "text": converted_text,
+        "solution": solution,
+        "categories": json.dumps(categories),
+    })
+
+    if not fused_result.validity:
+        logger.error(f"failed to text_validity {fused_result.validity}")
+        return AnalysisOutcome(False, "")
+
+    return AnalysisOutcome(True, fused_result.text, fused_result.analysis, fused_result.reason)
+
+
+def analyze_submission(
+        converted_text: str,
+        solution: str,
+        mode: str = None,
+        answer_key: AnswerKey = None,
+        cancelled: threading.Event = None,
+) -> AnalysisOutcome:
+    """
+    PIPELINE_MODE (또는 mode) 에 따라 분석 단계를 실행합니다.
+    """
+    mode = mode or PIPELINE_MODE
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"unknown pipeline mode: {mode}")
+
+    if mode == "fused":
+        return analyze_fused(converted_text, solution, cancelled)
+    return analyze_chain(converted_text, solution, answer_key, cancelled)
+
+
+def image_process(i_p_request: ImageProcessRequest, mode: str = None, image_bytes: bytes = None):
     """
     학생의 explanation 이미지를 텍스트로 변환하고,
     변환된 텍스트의 유효성을 판단하여 ddb 저장 또는 반려하는 함수
@@ -29,164 +152,140 @@ def image_process(i_p_request: ImageProcessRequest):
             - acaId: 학원 id
             - assignmentUuid : 과제 id
             - problemId : 문제 id
+        mode: 분석 파이프라인 모드 ("chain" / "fused"), 없으면 PIPELINE_MODE
+        image_bytes: 이미 검증한 이미지 바이트, 없으면 imageURL 에서 내려받음
 
     Returns:
         if success : SuccessResponse
+        if the submission text is rejected : BadRequestResponse
         Otherwise : InternalServerConflictResponse
 
     """
 
     # init
-    ddb = boto3.resource(
-        'dynamodb',
-        region_name='ap-northeast-2',
-    )
-    llm = ChatOpenAI(model="gpt-4o", temperature=0.5)
-
+    problems = get_problem_repository()
     sub = i_p_request.studentId
 
     logger.info("text2image")
 
-    # image2text
+    # OCR and the problem lookup are independent, the analysis needs both
+    # A failed / timed out stage sets cancelled, running stages stop before their next LLM call
+    cancelled = threading.Event()
+    stages = [
+        Stage(
+            "ocr",
+            lambda _: image2text(i_p_request.imageURL, image_bytes=image_bytes, cancelled=cancelled),
+            timeout=STAGE_OCR_TIMEOUT,
+        ),
+        Stage(
+            "problem",
+            lambda _: problems.get(i_p_request.acaId, i_p_request.problemId, ("Solution",) + ANSWER_FIELDS),
+            timeout=STAGE_PROBLEM_TIMEOUT,
+        ),
+        Stage(
+            "analyze",
+            lambda inputs: analyze_submission(
+                inputs["ocr"],
+                inputs["problem"].get('Solution', ''),
+                mode,
+                answer_key_from_problem(inputs["problem"]),
+                cancelled,
+            ),
+            deps=("ocr", "problem"),
+            timeout=STAGE_ANALYZE_TIMEOUT,
+        ),
+    ]
     try :
-        converted_text = image2text(i_p_request.imageURL)
-    except Exception as e :
-        return InternalServerErrorResponse(message="failed to convert image to text")
-
-    # Text Validity Check
-    text_response : TextResponse = text_validation(converted_text)
-    if not text_response.ok :
-        logger.error(f"failed to text_validity {text_response.ok}")
-        return InternalServerErrorResponse(message="failed to convert image to text")
-
-    logger.info(f"text_response: {text_response}")
-
-    # DDB interaction
-    try :
-        # Get solution from ddb-problems
-        problem = ddb.Table("problems").get_item(
-            Key={"PK": i_p_request.acaId, "SK": f"PROBLEM#{i_p_request.problemId}"}
-        )
-        solution = problem.get("Item", {}).get('Solution', '')
-        problem_reasons = problem.get("Item", {}).get("Reasons", {})
-
-    except Exception as e :
-        return InternalServerErrorResponse(message="failed to get item from ddb")
-
-    # Request analysis to LLM with submission and solution
-    llm = ChatOpenAI(
-        model="gpt-4o",
-        temperature=0.5
-    )
-
-    parser = PydanticOutputParser(pydantic_object=AnalysisResult)
-
-    analysis_prompt = """
-        당신은 수학 교사입니다.
-        다음은 학생의 문제 풀이 과정과 솔루션입니다.
-        학생 풀이: {explanation}
-        솔루션: {solution}
-
-        만약 문제 풀이 내용이 없다면 분석을 종료하고 빈 문자열로 주세요.
-        위 두 풀이를 비교하여 다음 지침에 따라 분석해 주세요.
-        1. 학생 풀이의 과정에 대해서 상세하게 설명해 주세요.
-        2. 솔루션과 학생 풀이를 비교하여 틀리거나 다른 이유를 간결하게 요약해 주세요.
-
-        {format_instructions}
-    """
-    prompt = PromptTemplate(
-        template=analysis_prompt,
-        input_variables=["explanation", "solution"],
-        partial_variables={
-            "format_instructions": parser.get_format_instructions()
-        }
-    )
-
-    chain = LLMChain(llm=llm, prompt=prompt)
-    llm_response = chain.run(
-        explanation=text_response.text,
-        solution=solution,
-    )
-
-    analysis_result = parser.parse(llm_response)
-
-    # Request LLM to categorize incorrect_reason from submission_analysis
-    parser = PydanticOutputParser(pydantic_object=ReasonResult)
-
-    categorized_prompt = """
-        당신은 수학 교사입니다.
-        다음은 학생의 문제 풀이 분석 결과와 이유 리스트 입니다.
-        문제 풀이 분석: {analysis_result}
-        이유: {categories}
-
-        문제 풀이 분석을 바탕으로 아래 지침에 따라 이유를 분류해 주세요.
-        맞았다면 정답으로 주세요.
-        - 이유들 중, 분석 결과에 가장 근접한 한글 이유를 선택합니다.
-            "개념 부족"
-            "적용 오류"
-            "문제 해석 오류" 
-            "정보 누락/오독"
-            "계산 실수"
-            "논리적 오류"
-            "선택지 오해"
-            "추론 실패"
-            "오타"
-            "정답"
-                    
-            {format_instructions}
-    """
-    prompt = PromptTemplate(
-        template=categorized_prompt,
-        input_variables=["analysis_result", "categories"],
-        partial_variables={
-            "format_instructions": parser.get_format_instructions()
-        }
-    )
-
-    chain = LLMChain(llm=llm, prompt=prompt)
-    llm_response = chain.run(
-        analysis_result=analysis_result.analysis,
-        categories=json.dumps(categories),
-    )
-
-    categorize_result = parser.parse(llm_response)
+        run = run_stages(stages, cancelled)
+    except StageError as e :
+        if e.stage == "ocr" :
+            return InternalServerErrorResponse(message="failed to convert image to text")
+        if e.stage == "problem" :
+            return InternalServerErrorResponse(message="failed to get item from ddb")
+        raise
+
+    # Analyze submission text with solution
+    outcome = run.results["analyze"]
+    if not outcome.ok :
+        # The text itself was rejected, retrying would give the same answer
+        return BadRequestResponse(message="submission text rejected")
 
     logger.info("chain complete")
 
     # Update analysis into ddb-assignment_submits
     try :
-        ddb.Table("assignment_submits").update_item(
+        assignment_submits_table().update_item(
             Key={"PK": f"ASSIGNMENT#{i_p_request.assignmentUuid}", "SK": f"{sub}#{i_p_request.problemId}"},
             UpdateExpression="SET Analysis = :a, Reason = :ir, Explanation = :ex",
             ExpressionAttributeValues={
-                ":a": analysis_result.analysis,
-                ":ir": categorize_result.reason,
-                ":ex": text_response.text,
+                ":a": outcome.analysis,
+                ":ir": outcome.reason,
+                ":ex": outcome.text,
             }
         )
 
-        # Update incorrect_reason into ddb-problems
-        item = problem.get("Item", {})
-        inc = item.get("IncorrectCount",0)
-        if categorize_result.reason != "정답": inc += 1
-        problem_reasons[categorize_result.reason] = problem_reasons.get(categorize_result.reason, 0) + 1
-
-        ddb.Table("problems").update_item(
-            Key={
-                "PK": i_p_request.acaId,
-                "SK": f"PROBLEM#{i_p_request.problemId}"
-            },
-            UpdateExpression="SET IncorrectCount = :inc, Reasons = :r ",
-            ExpressionAttributeValues={
-                ":inc": inc,
-                ":r": problem_reasons
-            }
-        )
+        # Update incorrect_reason into ddb-problems (atomic ADD, coalesced per problem)
+        counted = get_counter_writer().record(i_p_request.acaId, i_p_request.problemId, outcome.reason)
 
     except Exception as e :
         return InternalServerErrorResponse(message="failed to update item to ddb")
 
-    return SuccessResponse()
+    # The chat session must re-read the new submission on the next question,
+    # and the problem analysis summary must pick up the new analysis
+    try :
+        get_chat_session_store().forget_context(i_p_request.assignmentUuid, i_p_request.problemId, sub)
+        get_problem_analysis_cache().mark_stale(i_p_request.problemId)
+    except Exception as e :
+        logger.warning(f"failed to reset derived caches: {e}")
+
+    # The job is marked complete after this returns, so the increment must not be left only in memory.
+    # Waiting (instead of writing directly) keeps increments from concurrent submissions coalesced.
+    # A failed write stays pending for the next flush rather than failing the job, since a retry would count it twice.
+    if not counted.wait(COUNTER_WRITE_WAIT):
+        logger.error(f"counter increment for {i_p_request.acaId}/{i_p_request.problemId} not written yet, left pending")
+
+    return SuccessResponse(data={"timings": run.timings})
 
 
+def image_process_job(payload: dict) -> dict:
+    """
+    작업 큐 워커에서 실행되는 image_process 핸들러
+
+    Args:
+        payload: ImageProcessRequest 를 dump 한 dict (+ 웹 프로세스가 저장한 imagePath)
 
+    Returns:
+        처리 결과 응답 dict
+
+    Raises:
+        PermanentJobError: 제출물이 반려되었을 때 (4xx, 재시도하지 않음)
+        RuntimeError: 일시적인 실패일 때 (5xx, 작업 큐가 재시도하도록)
+            background lane 이 LLM 차례를 받지 못한 GovernorTimeout 도 여기에 포함되어 백오프 후 재시도됩니다.
+
+    lease (visibility timeout) 가 만료된 뒤 작업이 재전달되면 분석과 카운터 증가가 다시 실행되므로,
+    처음 시도가 이미 카운터를 썼다면 IncorrectCount / Reasons 가 두 번 늘어날 수 있습니다.
+    JOB_VISIBILITY_TIMEOUT 은 STAGE_*_TIMEOUT 합과 COUNTER_WRITE_WAIT 보다 넉넉하게 잡아야 합니다.
+    """
+    payload = dict(payload)
+    image_path = payload.pop("imagePath", None)
+
+    # The spooled copy is kept only while the queue will retry this job
+    retrying = False
+    try:
+        # Analysis jobs only use the quota interactive chats leave over
+        with llm_lane(BACKGROUND, payload.get("acaId")):
+            # Falls back to downloading imageURL when the spooled copy is gone
+            response = image_process(ImageProcessRequest(**payload), image_bytes=load_spooled_image(image_path))
+        if 400 <= response.status_code < 500:
+            raise PermanentJobError(response.message)
+        if response.status_code != 200:
+            raise RuntimeError(response.message)
+        return response.model_dump()
+    except PermanentJobError:
+        raise
+    except Exception:
+        retrying = not is_final_attempt()
+        raise
+    finally:
+        if not retrying:
+            remove_spooled_image(image_path)
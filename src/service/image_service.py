@@ -1,18 +1,16 @@
-from openai import OpenAI
 import base64
 from fastapi.responses import Response
 from src.model.image_model import ImageGenerationRequest
+from src.utils.llm_client import get_async_openai_client
 
-client = OpenAI()
 
-
-def generate_image(image_request: ImageGenerationRequest) -> Response:
+async def generate_image(image_request: ImageGenerationRequest) -> Response:
     image_prompt = (f"Generate an image that will be used as a landing page description image."
                     f"The image style is {image_request.style}, "
                     f"The image should not include the prompt text, instead have a visual representation."
                     f"the prompt is: {image_request.title} : {image_request.description}")
 
-    result = client.images.generate(
+    result = await get_async_openai_client().images.generate(
         model="gpt-image-1",
         prompt=image_prompt,
         quality="low",
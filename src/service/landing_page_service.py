@@ -1,16 +1,68 @@
-from typing import List
+from typing import List, Tuple, Union
 from fastapi import HTTPException
-import boto3
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import dotenv
 from botocore.exceptions import BotoCoreError, ClientError
 from src.model.landing_page_model import LandingPageModel
+from src.utils.ddb_executor import run_ddb
+from src.utils.ddb import landing_page_table
+from src.utils.shared_cache import CacheBackend, MemoryCacheBackend, create_cache_backend
 
-ddb = boto3.resource(
-    'dynamodb',
-    region_name='ap-northeast-2',
-)
+dotenv.load_dotenv()
 
+# "memory" 는 워커별 캐시, 여러 워커가 무효화를 함께 보려면 "sqlite" 또는 "package.module:ClassName"
+LANDING_CACHE_BACKEND = os.getenv("LANDING_CACHE_BACKEND", "memory")
+LANDING_CACHE_PATH = os.getenv("LANDING_CACHE_PATH", "landing_cache.sqlite3")
+LANDING_CACHE_TTL = float(os.getenv("LANDING_CACHE_TTL", "60"))
+LANDING_CACHE_MAX_ITEMS = int(os.getenv("LANDING_CACHE_MAX_ITEMS", "1024"))
 
-def create_landing_page(subdomain: str, landing_page_request: LandingPageModel):
+_cache: Union[CacheBackend, None] = None
+_cache_lock = threading.Lock()
+
+
+def get_landing_cache() -> CacheBackend:
+    """
+    랜딩 페이지 캐시 저장소를 반환합니다.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = create_cache_backend(LANDING_CACHE_BACKEND, LANDING_CACHE_PATH, LANDING_CACHE_MAX_ITEMS)
+        return _cache
+
+
+async def _cache_call(func, *args):
+    # Out-of-process backends block on I/O, keep them off the event loop
+    if isinstance(get_landing_cache(), MemoryCacheBackend):
+        return func(*args)
+    return await asyncio.to_thread(func, *args)
+
+
+def _cache_key(subdomain: str) -> str:
+    return f"landing_page:{subdomain}"
+
+
+def compute_etag(landing_page: LandingPageModel) -> str:
+    """
+    랜딩 페이지 내용으로 strong ETag 를 계산합니다. 내용이 같으면 워커와 관계없이 같은 값입니다.
+    """
+    body = json.dumps(landing_page.model_dump(), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"'
+
+
+async def invalidate_landing_page(subdomain: str) -> None:
+    """
+    랜딩 페이지 캐시를 무효화합니다.
+    """
+    cache = get_landing_cache()
+    await _cache_call(cache.delete, _cache_key(subdomain))
+
+
+async def create_landing_page(subdomain: str, landing_page_request: LandingPageModel):
     """
     랜딩 페이지를 생성합니다.
 
@@ -25,7 +77,8 @@ def create_landing_page(subdomain: str, landing_page_request: LandingPageModel):
         raise HTTPException(status_code=400, detail="Invalid input data")
 
     try:
-        ddb.Table("landing_page").put_item(
+        await run_ddb(
+            landing_page_table().put_item,
             Item={
                 "subdomain": subdomain,
                 "hero": landing_page_request.hero.model_dump(),
@@ -37,10 +90,11 @@ def create_landing_page(subdomain: str, landing_page_request: LandingPageModel):
     except (BotoCoreError, ClientError) as e:
         raise HTTPException(status_code=500, detail=f"Failed to create landing page: {e}")
 
+    await invalidate_landing_page(subdomain)
     return {"message": "success"}
 
 
-def get_landing_page(subdomain: str) -> LandingPageModel:
+async def get_landing_page(subdomain: str) -> LandingPageModel:
     """
     랜딩 페이지 정보를 조회합니다.
 
@@ -50,11 +104,32 @@ def get_landing_page(subdomain: str) -> LandingPageModel:
     Returns:
         dict: 랜딩 페이지 정보.
     """
+    landing_page, _ = await get_landing_page_with_etag(subdomain)
+    return landing_page
+
+
+async def get_landing_page_with_etag(subdomain: str) -> Tuple[LandingPageModel, str]:
+    """
+    랜딩 페이지 정보와 ETag 를 조회합니다. 캐시에 있으면 DynamoDB 를 읽지 않습니다.
+
+    Args:
+        subdomain (str): 서브도메인 이름.
+
+    Returns:
+        (LandingPageModel, ETag)
+    """
     if not subdomain:
         raise HTTPException(status_code=400, detail="Subdomain is required")
 
+    cache = get_landing_cache()
+    cached = await _cache_call(cache.get, _cache_key(subdomain))
+    if cached is not None:
+        entry = json.loads(cached)
+        return LandingPageModel(**entry["item"]), entry["etag"]
+
     try:
-        response = ddb.Table("landing_page").get_item(
+        response = await run_ddb(
+            landing_page_table().get_item,
             Key={"subdomain": subdomain}
         )
     except (BotoCoreError, ClientError) as e:
@@ -65,15 +140,32 @@ def get_landing_page(subdomain: str) -> LandingPageModel:
 
     item = response['Item']
 
-    return LandingPageModel(
+    landing_page = LandingPageModel(
         hero=item.get("hero", ""),
         section_1=item.get("section_1", ""),
         section_2=item.get("section_2", ""),
         section_3=item.get("section_3", ""),
     )
+    etag = compute_etag(landing_page)
+
+    entry = json.dumps({"item": landing_page.model_dump(), "etag": etag}, ensure_ascii=False)
+    await _cache_call(cache.set, _cache_key(subdomain), entry, LANDING_CACHE_TTL)
+    return landing_page, etag
+
+
+def etag_matches(if_none_match: Union[str, None], etag: str) -> bool:
+    """
+    If-None-Match 헤더가 ETag 와 일치하는지 확인합니다. (weak 비교, "*" 허용)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
 
 
-def update_landing_page(subdomain: str, landing_page_request: LandingPageModel):
+async def update_landing_page(subdomain: str, landing_page_request: LandingPageModel):
     """
     랜딩 페이지 정보를 업데이트합니다.
 
@@ -88,7 +180,8 @@ def update_landing_page(subdomain: str, landing_page_request: LandingPageModel):
         raise HTTPException(status_code=400, detail="Invalid input data")
 
     try:
-        ddb.Table("landing_page").update_item(
+        await run_ddb(
+            landing_page_table().update_item,
             Key={"subdomain": subdomain},
             UpdateExpression="SET hero = :hero, section_1 = :section_1, section_2 = :section_2, section_3 = :section_3",
             ExpressionAttributeValues={
@@ -101,4 +194,5 @@ def update_landing_page(subdomain: str, landing_page_request: LandingPageModel):
     except (BotoCoreError, ClientError) as e:
         raise HTTPException(status_code=500, detail=f"Failed to update landing page: {e}")
 
+    await invalidate_landing_page(subdomain)
     return {"message": "success"}
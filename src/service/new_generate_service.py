@@ -1,20 +1,18 @@
-import boto3
 import logging
 import dotenv
 import uuid
-from langchain.chains.llm import LLMChain
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
-from src.model.outputParser import *
 from src.model.generate_model import GenerateRequest
 from src.model.response_model import *
+from src.utils.llm_governor import ADMIN, llm_lane
+from src.utils.model_routing import get_stage_model
+from src.utils.prompt_registry import get_chain
+from src.utils.problem_repository import get_problem_repository
 
 logger = logging.getLogger(__name__)
 dotenv.load_dotenv()
 
 
-def generate_problem(generate_request: GenerateRequest, generate_result=None) -> BaseResponse:
+async def generate_problem(generate_request: GenerateRequest, generate_result=None) -> BaseResponse:
     """
         비슷한 문제 생성
 
@@ -27,116 +25,34 @@ def generate_problem(generate_request: GenerateRequest, generate_result=None) ->
             조회된 과제 제출 결과 데이터
         """
 
-    ddb = boto3.resource(
-        'dynamodb',
-        region_name='ap-northeast-2'
-    )
-
     # Get Problem with acaID & problemID from ddb-problems
-    problem = ddb.Table("problems").get_item(
-        Key={"PK": generate_request.acaId, "SK": f"PROBLEM#{generate_request.problemId}"}
-    ).get('Item', {})
+    problem = await get_problem_repository().aget(generate_request.acaId, generate_request.problemId)
 
     # Request to LLM that a kind of problem of selected problem
-    llm = ChatOpenAI(
-        model="gpt-4o",
-        temperature=0.3
-    )
-
-    generate_parser = PydanticOutputParser(pydantic_object=GenerateResult)
-
     new_problem_id = uuid.uuid4().hex
-    generate_template = """
-        당신은 수학 교사입니다.
-        다음은 문제, 문제를 틀린 학생들의 이유와 그 수입니다.
-        문제: {problem}
-        이유와 그 수: {reasons}
-
-        문제, 이유를 바탕으로 다음과 같은 지침에 따라 문제와 비슷한 문제를 생성해 주세요.
-        1. 총 제출자와 이유의 수를 기반으로 정답률을 고려해 문제의 복잡도를 전체 학생 수준의 중간으로 조정해 주세요.
-        2. 이유와 그 수를 고려하여 가장 많이 이유를 훈련할 수 있도록 새 문제의 문항을 생성해 주세요.
-        3. 새 문제에 맞는 풀이 과정을 솔루션으로 만들고, 문항의 타입을 subjective로 지정해 주세요.
-        3-1. 답은 숫자로 된 문자열을 답으로 처리해 주세요. (예, 250, 32 등)
-
-
-             8. 문제를 완전히 만든 후, 생성된 문제와 그 답이 정상적으로 풀 수 있는지 검사해 주세요.
-        9. 정상적으로 점검된 문제를 정리하여 기존 문제와 같은 형식으로 만들어 주세요.
-        10. 생성된 모든 내용을 한글로 번역해 주세요.
-
-
-        {format_instructions}    
-    """
-    generate_prompt = PromptTemplate(
-        template=generate_template,
-        input_variables=["problem", "reasons"],
-        partial_variables={
-            "format_instructions": generate_parser.get_format_instructions()
-        }
-    )
-    generate_chain = generate_prompt | llm | generate_parser
+    generate_chain = get_chain("new_generate", get_stage_model("new_generate"))
 
     # verify
-    verify_parser = PydanticOutputParser(pydantic_object=VerifyResult)
-
-    verify_template = """
-        당신은 수학 문제 전문 검수위원입니다.
-        만들어진 문제에 대해서 문항과 답이 정상적으로 풀 수 있는지 검사해 주세요.
-        만약 검수에 실패한다면 false와 문제를 다시 반환해 주세요.
-
-        문제 {new_problem}
-        만약 문제가 없다면 문제에 latex 문법을 적용할 수 있는 부분에 대해서 적용해 주세요.
-        적용된 문제와 true를 반환해 주세요.
-
-        {format_instructions}
-    """
-    verify_prompt = PromptTemplate(
-        template=verify_template,
-        input_variables=["new_problem"],
-        partial_variables={
-            "format_instructions": verify_parser.get_format_instructions()
-        }
-    )
-    verify_chain = verify_prompt | llm | verify_parser
+    verify_chain = get_chain("verify", get_stage_model("verify"))
 
     # title
-    title_parser = PydanticOutputParser(pydantic_object=TitleResult)
-
-    title_template = """
-        당신은 수학 교사입니다.
-        다음은 문제와 이를 바탕으로 새롭게 만들어진 문제입니다.
-        문제: {problem}
-        새로운 문제: {generate_result}
-
-        문제를 바탕으로  다음과 같은 지침에 따라 문제의 제목을 생성해 주세요.
-        1. 문제의 제목과 새로운 문제를 바탕으로 문제의 제목에 같은 형식의 제목을 작성해 주세요.
-        2. 새롭게 지어진 제목에 오탈자가 없는지 확인해 주세요
-        3. 확인한 제목을 가독성 있게 다듬어 주세요.
-
-        {format_instructions}    
-    """
-    title_prompt = PromptTemplate(
-        template=title_template,
-        input_variables=["problem", "generate_result"],
-        partial_variables={
-            "format_instructions": title_parser.get_format_instructions()
-        }
-    )
-    title_chain = title_prompt | llm | title_parser
-
-    generate_result = generate_chain.invoke(
-        {
+    title_chain = get_chain("title", get_stage_model("title"))
+
+    with llm_lane(ADMIN, generate_request.acaId):
+        generate_result = await generate_chain.ainvoke(
+            {
+                "problem": problem,
+                "reasons": generate_result.reasons
+            }
+        )
+        verify_result = await verify_chain.ainvoke({
+            "new_problem": generate_result.dict()
+        })
+
+        title_result = await title_chain.ainvoke({
             "problem": problem,
-            "reasons": generate_result.reasons
-        }
-    )
-    verify_result = verify_chain.invoke({
-        "new_problem": generate_result.dict()
-    })
-
-    title_result = title_chain.invoke({
-        "problem": problem,
-        "generate_result": generate_result.dict()
-    })
+            "generate_result": generate_result.dict()
+        })
 
     # Formatting title and generated problem into problem-ddb-format
     response_item = {
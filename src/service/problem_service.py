@@ -1,22 +1,19 @@
 from typing import List
-import boto3
 import dotenv
-import langchain_openai
 from boto3.dynamodb.conditions import Key
 from fastapi import HTTPException
-from langchain.chains.llm import LLMChain
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_core.prompts import PromptTemplate
 
-from src.model.outputParser import ProblemAnalysisResult
 from src.model.problem_model import ProblemStatsModel, AssignmentReview
-
-ddb = boto3.resource("dynamodb", region_name="ap-northeast-2")
+from src.utils.ddb import assignment_submits_table
+from src.utils.ddb_query import aiter_query
+from src.utils.problem_analysis_cache import get_problem_analysis_cache
+from src.utils.llm_governor import ADMIN, llm_lane
+from src.utils.problem_repository import get_problem_repository
 
 dotenv.load_dotenv()
 
 
-def get_problem_stats(subdomain: str, problem_id: str) -> ProblemStatsModel:
+async def get_problem_stats(subdomain: str, problem_id: str) -> ProblemStatsModel:
     """
     Get statistics for a specific problem in a subdomain.
 
@@ -27,14 +24,10 @@ def get_problem_stats(subdomain: str, problem_id: str) -> ProblemStatsModel:
     Returns:
         dict: A dictionary containing the problem statistics.
     """
-    table = ddb.Table("problems")
-    response = table.get_item(
-        Key={"PK": subdomain, "SK": f"PROBLEM#{problem_id}"}
-    )
+    item = await get_problem_repository().aget(subdomain, problem_id)
 
-    if 'Item' not in response:
+    if not item:
         raise HTTPException(status_code=404, detail="Problem not found")
-    item = response['Item']
 
     total_solved = item.get('TotalSolved', 0)
     incorrect_count = item.get('IncorrectCount', 0)
@@ -51,58 +44,13 @@ def get_problem_stats(subdomain: str, problem_id: str) -> ProblemStatsModel:
     )
 
 
-def get_analysis_summary(problem_id: str) -> str:
-    table = ddb.Table("assignment_submits")
-    response = table.query(
-        IndexName="ProblemID-index",
-        KeyConditionExpression=Key('ProblemID').eq(problem_id),
-    )
-    response_items = response.get('Items', [])
-    analysis = [item.get('Analysis', "") for item in response_items]
-
-    llm = langchain_openai.ChatOpenAI(
-        model="gpt-4o",
-        temperature=0.5,
-    )
-
-    parser = PydanticOutputParser(pydantic_object=ProblemAnalysisResult)
-    problem_analysis_template = """
-    당신은 수학 문제 풀이 분석가입니다.
-    역할은 학생들의 과제 분석을 토대로 문제의 어떤 부분에 대해 학생들이 어려움을 겪는지 파악하고, 그에 대한 분석을 제공합니다.
-    
-    학생들의 과제: {analysis}
-    
-    {format_instructions}
-    """
-    problem_analysis_prompt = PromptTemplate(
-        template=problem_analysis_template,
-        input_variables=["analysis"],
-        partial_variables={
-            "format_instructions": parser.get_format_instructions()
-        }
-    )
-    chain = LLMChain(
-        llm=llm,
-        prompt=problem_analysis_prompt,
-    )
+async def get_analysis_summary(problem_id: str) -> str:
+    # Served from the persisted summary, recomputed in the background once stale
+    with llm_lane(ADMIN):
+        return await get_problem_analysis_cache().get(problem_id)
 
-    llm_response = chain.run(
-        analysis=analysis,
-    )
-    problem_analysis_result = parser.parse(llm_response)
-
-    return problem_analysis_result.analysis
-
-
-def get_student_assignment_review(student_id: str, assignment_id: str) -> List[AssignmentReview]:
-    table = ddb.Table("assignment_submits")
-    response = table.query(
-        KeyConditionExpression=Key('PK').eq(f"ASSIGNMENT#{assignment_id}") & Key('SK').begins_with(student_id)
-    )
-
-    if 'Items' not in response or not response['Items']:
-        raise HTTPException(status_code=404, detail="No submissions found for the student")
 
+async def get_student_assignment_review(student_id: str, assignment_id: str) -> List[AssignmentReview]:
     # Map the DynamoDB items to AssignmentReview objects
     return_items = [
         AssignmentReview(
@@ -111,7 +59,14 @@ def get_student_assignment_review(student_id: str, assignment_id: str) -> List[A
             analysis=item.get('Analysis', None),
             explanation=item.get('Explanation', None),
         )
-        for item in response['Items']
+        async for item in aiter_query(
+            assignment_submits_table(),
+            fields=("SK", "Reason", "Analysis", "Explanation"),
+            KeyConditionExpression=Key('PK').eq(f"ASSIGNMENT#{assignment_id}") & Key('SK').begins_with(student_id),
+        )
     ]
 
+    if not return_items:
+        raise HTTPException(status_code=404, detail="No submissions found for the student")
+
     return return_items
@@ -0,0 +1,66 @@
+from src.model.utils_model import AnswerKey
+from src.utils.answer_match import extract_final_answer, match_answer, answer_key_from_problem
+
+
+def test_extract_final_answer():
+    """
+    Given: 다양한 형태로 최종 답을 적은 풀이가 있을 때
+    When: 최종 답을 추출하면
+    Then: 답 표시 뒤 또는 마지막 등호 오른쪽 값을 반환해야 한다
+    """
+    assert extract_final_answer("2x = 500\nx = 250") == "250"
+    assert extract_final_answer("따라서 답은 250 입니다.").startswith("250")
+    assert extract_final_answer("∴ x = \\frac{1}{2}") == "\\frac{1}{2}"
+    assert extract_final_answer("풀이를 모르겠습니다 그래서 적지 못했습니다") is None
+
+
+def test_subjective_answers_match_numerically():
+    """
+    Given: 주관식 문제의 정답이 있을 때
+    When: 같은 값을 다른 표기(분수, 소수, LaTeX)로 적은 풀이를 비교하면
+    Then: 일치로 판단하고, 다른 값은 일치하지 않아야 한다
+    """
+    key = AnswerKey(problem_type="subjective", answers=["1/2"], choices=[])
+    assert match_answer("x = \\frac{2}{4}", key)
+    assert match_answer("답: 0.5", key)
+    assert not match_answer("x = 0.25", key)
+
+
+def test_choice_answers_use_markers_or_choice_values():
+    """
+    Given: 객관식(select / multi) 문제의 정답 인덱스가 있을 때
+    When: 선택지 번호나 선택지 값으로 답을 적은 풀이를 비교하면
+    Then: 정답 선택지와 정확히 같을 때만 일치해야 한다
+    """
+    select = AnswerKey(problem_type="select", answers=[2], choices=["10", "20", "30", "40", "50"])
+    assert match_answer("답: ③", select)
+    assert match_answer("답 3번", select)
+    assert match_answer("x = 30", select)
+    # A bare number is not read as a choice number
+    assert not match_answer("x = 3", select)
+
+    multi = AnswerKey(problem_type="multi", answers=[1, 3], choices=["10", "20", "30", "40"])
+    assert match_answer("답: ②, ④", multi)
+    assert not match_answer("답: ②", multi)
+
+
+def test_answer_key_from_problem():
+    """
+    Given: 정답 정보가 있는 / 없는 problems 아이템이 있을 때
+    When: AnswerKey 를 만들면
+    Then: 정답이 없으면 None 이어야 한다
+    """
+    key = answer_key_from_problem({"Type": "subjective", "Answer": "250"})
+    assert key.answers == ["250"]
+    assert answer_key_from_problem({"Solution": "x = 250"}) is None
+
+
+def test_non_index_choice_answers_are_left_to_llm():
+    """
+    Given: 선택형 문제의 정답이 인덱스가 아닌 값 ("③", None) 으로 저장되어 있을 때
+    When: 풀이를 비교하면
+    Then: 예외 없이 False ("판단 불가") 를 반환해야 한다
+    """
+    for answers in (["③"], [None]):
+        key = AnswerKey(problem_type="select", answers=answers, choices=["1", "2", "3"])
+        assert not match_answer("답: ③", key)
@@ -0,0 +1,208 @@
+import asyncio
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from src.model.chat_model import ChatRequest
+from src.model.utils_model import ChatSession
+from src.service import chat_service
+from src.utils.chat_session import ChatSessionStore, split_for_compaction, render_history, require_shared_sessions, \
+    STUDENT, TEACHER
+from src.utils.shared_cache import MemoryCacheBackend
+
+REQUEST = {"acaSubdomain": "aca", "assignmentUuid": "a", "problemId": "1"}
+
+
+class FakeRepository:
+    def __init__(self):
+        self.reads = 0
+
+    async def aget(self, aca, pid, fields=None):
+        self.reads += 1
+        return {"Solution": "x = 2"}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = ChatSessionStore(MemoryCacheBackend())
+    monkeypatch.setattr(chat_service, "get_chat_session_store", lambda: store)
+    monkeypatch.setattr(chat_service, "extract_claim_sub", lambda authorization: ("student", True, None))
+    return store
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    repository = FakeRepository()
+    submissions = []
+
+    async def get_submission(chat_request, sub):
+        submissions.append(sub)
+        return {"Explanation": "x = 3"}
+
+    monkeypatch.setattr(chat_service, "get_problem_repository", lambda: repository)
+    monkeypatch.setattr(chat_service, "get_submission", get_submission)
+    return repository, submissions
+
+
+def test_follow_up_reuses_session(store, reads, monkeypatch):
+    """
+    Given: 같은 (과제, 문제, 학생) 으로 이미 한 번 질문했을 때
+    When: 이어서 질문하면
+    Then: 문제 / 제출물을 다시 조회하지 않고 이전 대화가 프롬프트에 포함되어야 한다
+    """
+    # Given
+    llm = FakeListChatModel(responses=['{"chat": "계산 실수입니다."}', '{"chat": "2 입니다."}', "unused"])
+    monkeypatch.setattr(chat_service, "get_stage_model", lambda *args, **kwargs: llm)
+    asyncio.run(chat_service.response_chat(ChatRequest(message="왜 틀렸나요?", **REQUEST), "token"))
+
+    # When
+    chat_input = asyncio.run(chat_service.prepare_chat(ChatRequest(message="정답은요?", **REQUEST), "token"))
+    asyncio.run(chat_service.response_chat(ChatRequest(message="정답은요?", **REQUEST), "token"))
+
+    # Then
+    repository, submissions = reads
+    assert repository.reads == 1
+    assert submissions == ["student"]
+    assert "학생: 왜 틀렸나요?" in chat_input["history"]
+    assert "선생님: 계산 실수입니다." in chat_input["history"]
+    assert len(store.get("a", "1", "student").history) == 4
+
+
+def test_forget_context_refetches_submission(store, reads):
+    """
+    Given: 문제 / 제출물이 저장된 세션이 있을 때
+    When: 제출물이 바뀌어 forget_context 를 호출하면
+    Then: 대화는 유지되고 다음 질문에서 제출물을 다시 조회해야 한다
+    """
+    # Given
+    store.save("a", "1", "student", ChatSession(
+        problem={"Solution": "x = 2"},
+        submission={"Explanation": "x = 1"},
+        history=[{"role": STUDENT, "text": "질문"}],
+    ))
+
+    # When
+    store.forget_context("a", "1", "student")
+    chat_input = asyncio.run(chat_service.prepare_chat(ChatRequest(message="다시 봐 주세요", **REQUEST), "token"))
+
+    # Then
+    repository, submissions = reads
+    assert submissions == ["student"]
+    assert chat_input["submission"] == {"Explanation": "x = 3"}
+    assert "학생: 질문" in chat_input["history"]
+
+
+def test_history_is_compacted_over_budget(monkeypatch):
+    """
+    Given: 토큰 예산을 넘는 대화가 쌓인 세션이 있을 때
+    When: compact_history 를 호출하면
+    Then: 오래된 대화는 요약으로 합쳐지고 최근 대화만 원문으로 남아야 한다
+    """
+    # Given
+    llm = FakeListChatModel(responses=["분배법칙을 헷갈려 함", "unused"])
+    monkeypatch.setattr(chat_service, "get_stage_model", lambda *args, **kwargs: llm)
+    monkeypatch.setattr(chat_service, "split_for_compaction", lambda session: split_for_compaction(session, budget=20, keep=2))
+    session = ChatSession(history=[
+        {"role": STUDENT if i % 2 == 0 else TEACHER, "text": f"대화 {i} " * 5} for i in range(6)
+    ])
+
+    # When
+    asyncio.run(chat_service.compact_history(session))
+
+    # Then
+    assert session.summary == "분배법칙을 헷갈려 함"
+    assert [message["text"] for message in session.history] == ["대화 4 " * 5, "대화 5 " * 5]
+    assert render_history(session).startswith("이전 대화 요약: 분배법칙을 헷갈려 함")
+
+
+def test_short_history_is_not_compacted():
+    """
+    Given: 토큰 예산 이내의 대화가 있을 때
+    When: split_for_compaction 을 호출하면
+    Then: 요약할 대화가 없어야 한다
+    """
+    # Given
+    session = ChatSession(history=[{"role": STUDENT, "text": "질문"}, {"role": TEACHER, "text": "답변"}])
+
+    # When
+    older, recent = split_for_compaction(session, budget=1500, keep=2)
+
+    # Then
+    assert older == []
+    assert recent == session.history
+
+
+def test_record_turn_compacts_in_background(store, monkeypatch):
+    """
+    Given: 이번 답변으로 토큰 예산을 넘는 세션이 있을 때
+    When: record_turn 을 호출하면
+    Then: 요약을 기다리지 않고 답변을 저장한 뒤 반환하고, 요약은 백그라운드에서 저장되어야 한다
+    """
+    # Given
+    llm = FakeListChatModel(responses=["분배법칙을 헷갈려 함", "unused"])
+    monkeypatch.setattr(chat_service, "get_stage_model", lambda *args, **kwargs: llm)
+    monkeypatch.setattr(chat_service, "split_for_compaction", lambda session: split_for_compaction(session, budget=20, keep=2))
+    session = ChatSession(history=[
+        {"role": STUDENT if i % 2 == 0 else TEACHER, "text": f"대화 {i} " * 5} for i in range(4)
+    ])
+    chat_input = {"session_key": ("a", "1", "student"), "session": session, "question": "정답은요?"}
+
+    # When
+    async def run():
+        await chat_service.record_turn(chat_input, "2 입니다.")
+        saved = store.get("a", "1", "student")
+        await asyncio.gather(*chat_service._background)
+        return saved
+    saved = asyncio.run(run())
+
+    # Then
+    compacted = store.get("a", "1", "student")
+    assert saved.summary == ""
+    assert len(saved.history) == 6
+    assert compacted.summary == "분배법칙을 헷갈려 함"
+    assert [message["text"] for message in compacted.history] == ["정답은요?", "2 입니다."]
+
+
+def test_memory_sessions_are_refused_for_separate_workers():
+    """
+    Given: 작업 워커가 별도 프로세스로 실행될 때
+    When: 세션 저장소가 프로세스 메모리 ("memory") 로 설정되어 있으면
+    Then: 제출물이 바뀌어도 세션이 갱신되지 않으므로 시작을 막아야 한다
+    """
+    with pytest.raises(RuntimeError):
+        require_shared_sessions("memory")
+    require_shared_sessions("sqlite")
+
+
+def test_client_context_is_not_attributed_to_student(store, reads):
+    """
+    Given: 세션이 없고, 클라이언트가 학생 질문과 선생님 답변이 섞인 이전 대화를 context 로 보낼 때
+    When: 질문하면
+    Then: context 는 학생의 말이 아닌 하나의 "이전 대화" 블록으로 프롬프트에 들어가야 한다
+    """
+    # Given
+    request = ChatRequest(message="정답은요?", context=["왜 틀렸나요?", "계산 실수입니다."], **REQUEST)
+
+    # When
+    chat_input = asyncio.run(chat_service.prepare_chat(request, "token"))
+
+    # Then
+    assert chat_input["history"] == "이전 대화: 왜 틀렸나요?\n계산 실수입니다."
+    assert "학생:" not in chat_input["history"]
+
+
+def test_concurrent_turns_are_both_kept(store, reads, monkeypatch):
+    """
+    Given: 같은 세션에서 두 질문이 동시에 준비되었을 때 (둘 다 저장 전의 세션을 읽음)
+    When: 두 답변이 차례로 저장되면
+    Then: 나중 저장이 먼저 저장된 대화를 덮어쓰지 않고 두 대화가 모두 남아야 한다
+    """
+    # Given
+    first = asyncio.run(chat_service.prepare_chat(ChatRequest(message="왜 틀렸나요?", **REQUEST), "token"))
+    second = asyncio.run(chat_service.prepare_chat(ChatRequest(message="정답은요?", **REQUEST), "token"))
+
+    # When
+    asyncio.run(chat_service.record_turn(first, "계산 실수입니다."))
+    asyncio.run(chat_service.record_turn(second, "2 입니다."))
+
+    # Then
+    history = store.get("a", "1", "student").history
+    assert [message["text"] for message in history] == ["왜 틀렸나요?", "계산 실수입니다.", "정답은요?", "2 입니다."]
@@ -0,0 +1,67 @@
+import asyncio
+import json
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from src.main import app
+from src.service import chat_service
+
+CHAT_INPUT = {"problem": {"Solution": "x = 2"}, "submission": {"Explanation": "x = 3"}, "history": "없음", "question": "왜 틀렸나요?"}
+
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_stream_emits_tokens_and_final_message(monkeypatch):
+    """
+    Given: 답변을 스트리밍하는 LLM 이 있을 때
+    When: /chat/stream 을 호출하면
+    Then: token 이벤트들이 먼저 오고, 마지막 done 이벤트에 전체 메시지가 담겨야 한다
+    """
+    # Given
+    llm = FakeListChatModel(responses=["계산 실수입니다."])
+    monkeypatch.setattr(chat_service, "get_stage_model", lambda *args, **kwargs: llm)
+
+    async def prepare_chat(chat_request, authorization):
+        return CHAT_INPUT
+    monkeypatch.setattr(chat_service, "prepare_chat", prepare_chat)
+
+    # When
+    response = TestClient(app).post("/chat/stream", json={
+        "acaSubdomain": "aca", "assignmentUuid": "a", "problemId": "1", "message": "왜 틀렸나요?",
+    })
+
+    # Then
+    events = parse_events(response.text)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert len(events) > 2
+    assert all(event == "token" for event, _ in events[:-1])
+    assert events[-1] == ("done", {"message": "계산 실수입니다."})
+    assert "".join(data["text"] for _, data in events[:-1]) == "계산 실수입니다."
+
+
+def test_closing_stream_stops_generation(monkeypatch):
+    """
+    Given: 스트리밍 중인 채팅 답변이 있을 때
+    When: 첫 토큰을 받은 뒤 클라이언트가 스트림을 닫으면
+    Then: done 이벤트 없이 generator 가 종료되어야 한다
+    """
+    # Given
+    llm = FakeListChatModel(responses=["아주 긴 답변입니다."])
+    monkeypatch.setattr(chat_service, "get_stage_model", lambda *args, **kwargs: llm)
+
+    # When
+    async def consume_first():
+        stream = chat_service.stream_chat(CHAT_INPUT)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first, [event async for event in stream]
+    first, rest = asyncio.run(consume_first())
+
+    # Then
+    assert first.startswith("event: token")
+    assert rest == []
@@ -0,0 +1,64 @@
+import asyncio
+from src.utils.ddb_query import iter_query, aiter_query
+
+
+class PagedTable:
+    """
+    page_size 개씩 나눠서 LastEvaluatedKey 와 함께 응답하는 가짜 Table
+    """
+
+    def __init__(self, items, page_size=2):
+        self.items = items
+        self.page_size = page_size
+        self.calls = []
+
+    def _page(self, items, params):
+        start = params.get("ExclusiveStartKey", {}).get("offset", 0)
+        page = {"Items": items[start:start + self.page_size]}
+        if start + self.page_size < len(items):
+            page["LastEvaluatedKey"] = {"offset": start + self.page_size}
+        return page
+
+    def query(self, **params):
+        self.calls.append(params)
+        return self._page(self.items, params)
+
+
+def test_iter_query_follows_pagination_lazily():
+    """
+    Given: 여러 페이지로 나뉜 query 결과가 있을 때
+    When: 첫 아이템만 소비하면
+    Then: 첫 페이지만 요청하고, 끝까지 소비하면 모든 아이템을 돌려줘야 한다
+    """
+    # Given
+    table = PagedTable([{"n": i} for i in range(5)])
+
+    # When
+    iterator = iter_query(table, fields=("n",))
+    first = next(iterator)
+
+    # Then
+    assert first == {"n": 0}
+    assert len(table.calls) == 1
+    assert [first] + list(iterator) == [{"n": i} for i in range(5)]
+    assert table.calls[0]["ProjectionExpression"] == "#p0"
+    assert table.calls[0]["ExpressionAttributeNames"] == {"#p0": "n"}
+
+
+def test_aiter_query_returns_every_page():
+    """
+    Given: 여러 페이지로 나뉜 query 결과가 있을 때
+    When: 비동기로 끝까지 소비하면
+    Then: 모든 아이템을 순서대로 돌려줘야 한다
+    """
+    # Given
+    table = PagedTable([{"n": i} for i in range(7)], page_size=3)
+
+    # When
+    async def collect():
+        return [item async for item in aiter_query(table)]
+    items = asyncio.run(collect())
+
+    # Then
+    assert items == [{"n": i} for i in range(7)]
+    assert len(table.calls) == 3
@@ -0,0 +1,94 @@
+import asyncio
+from io import BytesIO
+import httpx
+import pytest
+from PIL import Image
+import src.utils.fetch_image as fetch_module
+from src.utils.fetch_image import fetch_image, spool_image, load_spooled_image, remove_spooled_image, ImageFetchError
+
+
+def _png_bytes() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8), "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    def install(body: bytes, headers: dict):
+        def handler(request):
+            # Streamed body -> no Content-Length unless the test sets one
+            return httpx.Response(200, headers=headers, stream=httpx.ByteStream(body))
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(fetch_module, "_async_client", client)
+    return install
+
+
+def test_fetch_image_sniffs_format_without_content_length(serve):
+    """
+    Given: Content-Length 없이 PNG 이미지를 응답하는 서버가 있을 때
+    When: fetch_image 를 호출하면
+    Then: 본문과 매직 바이트로 판별한 형식을 반환해야 한다
+    """
+    # Given
+    body = _png_bytes()
+    serve(body, {"Content-Type": "image/png", "ETag": '"abc"'})
+
+    # When
+    image = asyncio.run(fetch_image("https://example.com/a.png"))
+
+    # Then
+    assert image.data == body
+    assert image.image_format == "PNG"
+    assert image.etag == '"abc"'
+
+
+def test_fetch_image_stops_at_byte_cap(serve):
+    """
+    Given: Content-Length 없이 최대 크기보다 큰 본문을 응답하는 서버가 있을 때
+    When: fetch_image 를 호출하면
+    Then: ImageFetchError 가 발생해야 한다
+    """
+    # Given
+    serve(_png_bytes() + b"\0" * 2048, {"Content-Type": "image/png"})
+
+    # When / Then
+    with pytest.raises(ImageFetchError):
+        asyncio.run(fetch_image("https://example.com/a.png", max_bytes=1024))
+
+
+def test_malformed_content_length_is_rejected(serve):
+    """
+    Given: Content-Length 헤더가 숫자가 아닌 응답을 주는 서버가 있을 때
+    When: fetch_image 를 호출하면
+    Then: ValueError 가 아니라 ImageFetchError 가 발생해야 한다 (400 응답)
+    """
+    # Given
+    serve(_png_bytes(), {"Content-Type": "image/png", "Content-Length": "abc"})
+
+    # When / Then
+    with pytest.raises(ImageFetchError):
+        asyncio.run(fetch_image("https://example.com/a.png"))
+
+
+def test_spooled_image_round_trip(monkeypatch, tmp_path):
+    """
+    Given: 검증된 이미지를 스풀 디렉터리에 저장했을 때
+    When: 저장된 경로와 스풀 밖의 경로를 읽으면
+    Then: 저장된 이미지만 읽히고, 삭제 후에는 None 이어야 한다
+    """
+    # Given
+    monkeypatch.setattr(fetch_module, "IMAGE_SPOOL_DIR", str(tmp_path / "spool"))
+    outside = tmp_path / "secret.png"
+    outside.write_bytes(b"secret")
+    image = fetch_module.FetchedImage(data=_png_bytes(), image_format="PNG")
+
+    # When
+    path = spool_image(image)
+
+    # Then
+    assert load_spooled_image(path) == image.data
+    assert load_spooled_image(str(outside)) is None
+    remove_spooled_image(path)
+    assert load_spooled_image(path) is None
@@ -0,0 +1,239 @@
+import threading
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from src.service import image_process_service
+from src.model.utils_model import AnswerKey, TextResponse
+from src.utils.stage_executor import StageCancelled
+from src.model.response_model import BadRequestResponse
+from src.model.image_model import ImageProcessRequest
+from src.utils.job_queue import PermanentJobError, SQLiteJobQueue, WorkerPool
+from src.model.job_model import JOB_QUEUED
+from src.utils.llm_governor import GovernorTimeout
+from src.utils.prevalidate_text import get_prevalidation_metrics, REJECT
+
+
+def use_fake_llm(monkeypatch, responses):
+    llm = FakeListChatModel(responses=responses)
+    monkeypatch.setattr(image_process_service, "get_stage_model", lambda *args, **kwargs: llm)
+    return llm
+
+
+class FakeProblems:
+    def get(self, aca, pid, fields=None):
+        return {"Solution": "x = 2"}
+
+
+def run_image_job(monkeypatch, tmp_path, ocr):
+    # Runs one image_process job through the queue with the OCR stage replaced by ocr
+    monkeypatch.setattr(image_process_service, "image2text", ocr)
+    monkeypatch.setattr(image_process_service, "get_problem_repository", lambda: FakeProblems())
+    spooled = tmp_path / "image.png"
+    spooled.write_bytes(b"image")
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"))
+    job = queue.enqueue("image_process", {
+        "imageURL": "https://example.com/a.png", "acaId": "aca", "assignmentUuid": "a",
+        "problemId": "1", "studentId": "s", "imagePath": str(spooled),
+    }, max_attempts=3)
+    WorkerPool(queue, {"image_process": image_process_service.image_process_job}, workers=1).run_once()
+    return queue.get(job.id), spooled
+
+
+def test_fused_mode_uses_single_call(monkeypatch):
+    """
+    Given: 수정, 유효성, 분석, 분류를 한 번에 응답하는 LLM 이 있을 때
+    When: fused 모드로 분석하면
+    Then: 한 번의 호출 결과로 분석 결과를 만들어야 한다
+    """
+    # Given
+    llm = use_fake_llm(monkeypatch, [
+        '{"text": "x = 2", "validity": true, "analysis": "풀이가 맞음", "reason": "정답"}',
+        '{"unused": true}',
+    ])
+
+    # When
+    outcome = image_process_service.analyze_submission("x = 2", "x = 2", mode="fused")
+
+    # Then
+    assert outcome.ok is True
+    assert outcome.text == "x = 2"
+    assert outcome.reason == "정답"
+    assert llm.i == 1
+
+
+def test_fused_mode_rejects_invalid_text(monkeypatch):
+    """
+    Given: 읽을 수 없는 풀이라고 응답하는 LLM 이 있을 때
+    When: fused 모드로 분석하면
+    Then: 실패 결과를 반환해야 한다
+    """
+    # Given
+    use_fake_llm(monkeypatch, ['{"text": "", "validity": false, "analysis": "", "reason": ""}'])
+
+    # When
+    outcome = image_process_service.analyze_submission("@@@@", "x = 2", mode="fused")
+
+    # Then
+    assert outcome.ok is False
+
+
+def test_unknown_mode_raises():
+    """
+    Given: 등록되지 않은 파이프라인 모드가 주어졌을 때
+    When: 분석을 요청하면
+    Then: ValueError 가 발생해야 한다
+    """
+    with pytest.raises(ValueError):
+        image_process_service.analyze_submission("x = 2", "x = 2", mode="unknown")
+
+
+def test_matching_final_answer_skips_categorize(monkeypatch):
+    """
+    Given: 최종 답이 저장된 정답과 같은 풀이가 있을 때
+    When: chain 모드로 분석하면
+    Then: 분류 LLM 호출 없이 "정답" 으로 처리되어야 한다
+    """
+    # Given
+    llm = use_fake_llm(monkeypatch, [
+        '{"analysis": "풀이가 맞음", "reason": "없음"}',
+        '{"unused": true}',
+    ])
+    answer_key = AnswerKey(problem_type="subjective", answers=["250"], choices=[])
+    text = "2x = 500\n따라서 답은 250 입니다."
+
+    # When
+    outcome = image_process_service.analyze_submission(text, "x = 250", mode="chain", answer_key=answer_key)
+
+    # Then
+    assert outcome.ok is True
+    assert outcome.reason == "정답"
+    assert llm.i == 1
+
+
+def test_rejected_job_is_not_retried_and_spool_is_removed(monkeypatch, tmp_path):
+    """
+    Given: 제출물 텍스트가 반려되는 작업이 있을 때
+    When: 작업 핸들러를 실행하면
+    Then: 재시도하지 않는 PermanentJobError 가 나고 스풀 파일이 지워져야 한다
+    """
+    # Given
+    spooled = tmp_path / "image.png"
+    spooled.write_bytes(b"image")
+    monkeypatch.setattr(image_process_service, "load_spooled_image", lambda path: b"image")
+    monkeypatch.setattr(
+        image_process_service, "image_process",
+        lambda *args, **kwargs: BadRequestResponse(message="submission text rejected"),
+    )
+    payload = {
+        "imageURL": "https://example.com/a.png", "acaId": "aca", "assignmentUuid": "a",
+        "problemId": "1", "studentId": "s", "imagePath": str(spooled),
+    }
+
+    # When
+    with pytest.raises(PermanentJobError):
+        image_process_service.image_process_job(payload)
+
+    # Then
+    assert not spooled.exists()
+
+
+def test_cancelled_analysis_makes_no_llm_call(monkeypatch):
+    """
+    Given: 파이프라인이 이미 취소되었을 때 (다른 단계 실패 / 제한 시간 초과)
+    When: 분석 단계가 실행되면
+    Then: LLM 을 호출하지 않고 StageCancelled 로 멈춰야 한다
+    """
+    # Given
+    llm = use_fake_llm(monkeypatch, ['{"unused": true}'])
+    monkeypatch.setattr(image_process_service, "text_validation", lambda text, cancelled=None: TextResponse(True, text))
+    cancelled = threading.Event()
+    cancelled.set()
+
+    # When / Then
+    with pytest.raises(StageCancelled):
+        image_process_service.analyze_submission("x = 2", "x = 2", mode="chain", cancelled=cancelled)
+    assert llm.i == 0
+
+
+def test_fused_mode_records_prevalidation(monkeypatch):
+    """
+    Given: 사전 검증에서 반려되는 OCR 텍스트가 있을 때
+    When: fused 모드로 분석하면
+    Then: LLM 호출 없이 반려되고, 사전 검증 metrics 에 반려와 건너뛴 호출 1번이 기록되어야 한다
+    """
+    # Given
+    llm = use_fake_llm(monkeypatch, ['{"unused": true}'])
+    before = get_prevalidation_metrics()
+
+    # When
+    outcome = image_process_service.analyze_submission("", "x = 2", mode="fused")
+
+    # Then
+    after = get_prevalidation_metrics()
+    assert outcome.ok is False
+    assert llm.i == 0
+    assert after[REJECT] - before[REJECT] == 1
+    assert after["avoided_llm_calls"] - before["avoided_llm_calls"] == 1
+
+
+def test_ocr_failure_is_retried_not_rejected(monkeypatch, tmp_path):
+    """
+    Given: OCR 호출이 일시적인 오류 (연결 끊김 / 429 등) 로 실패할 때
+    When: image_process 작업을 실행하면
+    Then: 제출물을 반려하지 않고 작업을 재시도 대기열에 다시 넣고, 스풀 파일도 남겨야 한다
+    """
+    # Given
+    def ocr(*args, **kwargs):
+        raise ConnectionError("Connection error.")
+
+    # When
+    job, spooled = run_image_job(monkeypatch, tmp_path, ocr)
+
+    # Then
+    assert job.status == JOB_QUEUED
+    assert job.attempts == 1
+    assert "rejected" not in job.error
+    assert spooled.exists()
+
+
+def test_governor_timeout_is_retried(monkeypatch, tmp_path):
+    """
+    Given: 마감 직전 부하로 background lane 이 OCR 호출 차례를 받지 못할 때 (GovernorTimeout)
+    When: image_process 작업을 실행하면
+    Then: 제출물을 반려하지 않고 작업이 백오프 후 재시도되어야 한다
+    """
+    # Given
+    def ocr(*args, **kwargs):
+        raise GovernorTimeout("background lane waited 30.0s")
+
+    # When
+    job, spooled = run_image_job(monkeypatch, tmp_path, ocr)
+
+    # Then
+    assert job.status == JOB_QUEUED
+    assert job.available_at > job.updated_at
+    assert spooled.exists()
+
+
+def test_ocr_stage_failure_returns_500(monkeypatch):
+    """
+    Given: OCR 단계에서 예외가 발생할 때 (OpenAI 5xx 등)
+    When: image_process 를 호출하면
+    Then: 분석 단계는 실행되지 않고, 작업 큐가 재시도하도록 500 응답을 반환해야 한다
+    """
+    # Given
+    def ocr(*args, **kwargs):
+        raise RuntimeError("Internal server error")
+    monkeypatch.setattr(image_process_service, "image2text", ocr)
+    monkeypatch.setattr(image_process_service, "get_problem_repository", lambda: FakeProblems())
+    llm = use_fake_llm(monkeypatch, ['{"unused": true}'])
+    request = ImageProcessRequest(
+        imageURL="https://example.com/a.png", acaId="aca", assignmentUuid="a", problemId="1", studentId="s",
+    )
+
+    # When
+    response = image_process_service.image_process(request, image_bytes=b"image")
+
+    # Then
+    assert response.status_code == 500
+    assert response.message == "failed to convert image to text"
+    assert llm.i == 0
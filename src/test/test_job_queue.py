@@ -0,0 +1,154 @@
+import time
+import pytest
+from src.model.job_model import JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED
+from src.utils.job_queue import SQLiteJobQueue, WorkerPool, PermanentJobError, retry_delay
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_enqueue_and_dequeue(queue):
+    """
+    Given: 작업 하나가 enqueue 되었을 때
+    When: dequeue 하면
+    Then: running 상태로 한 번만 꺼내져야 한다
+    """
+    # Given
+    job = queue.enqueue("image_process", {"problemId": "1"})
+
+    # When
+    dequeued = queue.dequeue(visibility_timeout=60)
+
+    # Then
+    assert dequeued.id == job.id
+    assert dequeued.status == JOB_RUNNING
+    assert dequeued.attempts == 1
+    assert dequeued.payload == {"problemId": "1"}
+    assert queue.dequeue(visibility_timeout=60) is None
+
+
+def test_visibility_timeout_redelivers_job(queue):
+    """
+    Given: dequeue 된 작업의 visibility timeout 이 만료되었을 때
+    When: 다시 dequeue 하면
+    Then: 같은 작업이 재전달되어야 한다
+    """
+    # Given
+    job = queue.enqueue("image_process", {})
+    queue.dequeue(visibility_timeout=0)
+
+    # When
+    redelivered = queue.dequeue(visibility_timeout=60)
+
+    # Then
+    assert redelivered.id == job.id
+    assert redelivered.attempts == 2
+
+
+def test_failed_job_is_retried_with_backoff(queue):
+    """
+    Given: 최대 시도 횟수가 남은 작업이 실패했을 때
+    When: fail 을 호출하면
+    Then: 백오프 시간 이후에 다시 실행 가능해야 한다
+    """
+    # Given
+    job = queue.enqueue("image_process", {}, max_attempts=3)
+    queue.dequeue()
+
+    # When
+    failed = queue.fail(job.id, "boom")
+
+    # Then
+    assert failed.status == JOB_QUEUED
+    assert failed.available_at >= time.time() + retry_delay(1) - 1
+    assert queue.dequeue() is None
+
+
+def test_job_fails_after_max_attempts(queue):
+    """
+    Given: 항상 예외를 던지는 핸들러가 등록된 워커 풀이 있을 때
+    When: 최대 시도 횟수만큼 실행하면
+    Then: 작업은 failed 상태가 되어야 한다
+    """
+    # Given
+    def handler(payload):
+        raise RuntimeError("boom")
+
+    job = queue.enqueue("image_process", {}, max_attempts=1)
+    pool = WorkerPool(queue, {"image_process": handler}, workers=1)
+
+    # When
+    pool.run_once()
+
+    # Then
+    stored = queue.get(job.id)
+    assert stored.status == JOB_FAILED
+    assert stored.error == "boom"
+
+
+def test_worker_pool_completes_job(queue):
+    """
+    Given: 성공하는 핸들러가 등록된 워커 풀이 있을 때
+    When: 작업을 실행하면
+    Then: 결과와 함께 succeeded 상태가 되어야 한다
+    """
+    # Given
+    job = queue.enqueue("image_process", {"value": 1})
+    pool = WorkerPool(queue, {"image_process": lambda payload: {"echo": payload["value"]}}, workers=1)
+
+    # When
+    ran = pool.run_once()
+
+    # Then
+    stored = queue.get(job.id)
+    assert ran is True
+    assert stored.status == JOB_SUCCEEDED
+    assert stored.result == {"echo": 1}
+
+
+def test_permanent_error_is_not_retried(queue):
+    """
+    Given: 재시도 횟수가 남은 작업의 핸들러가 PermanentJobError 를 던질 때
+    When: 작업을 실행하면
+    Then: 재시도 없이 바로 failed 상태가 되어야 한다
+    """
+    # Given
+    def handler(payload):
+        raise PermanentJobError("rejected")
+
+    job = queue.enqueue("image_process", {}, max_attempts=3)
+    pool = WorkerPool(queue, {"image_process": handler}, workers=1)
+
+    # When
+    pool.run_once()
+
+    # Then
+    stored = queue.get(job.id)
+    assert stored.status == JOB_FAILED
+    assert stored.attempts == 1
+    assert stored.error == "rejected"
+
+
+def test_late_worker_cannot_overwrite_redelivered_job(queue):
+    """
+    Given: visibility timeout 이 지나 작업이 다른 워커에게 재전달되었을 때
+    When: 첫 번째 워커가 늦게 complete / fail 을 호출하면
+    Then: 기록되지 않고, 재전달된 시도만 결과를 기록할 수 있어야 한다
+    """
+    # Given
+    job = queue.enqueue("image_process", {})
+    first = queue.dequeue(visibility_timeout=0)
+    second = queue.dequeue(visibility_timeout=60)
+
+    # When
+    completed = queue.complete(job.id, {"late": True}, attempts=first.attempts)
+    failed = queue.fail(job.id, "late", attempts=first.attempts)
+
+    # Then
+    assert completed is False
+    assert failed is None
+    assert queue.get(job.id).status == JOB_RUNNING
+    assert queue.complete(job.id, {"ok": True}, attempts=second.attempts) is True
+    assert queue.get(job.id).result == {"ok": True}
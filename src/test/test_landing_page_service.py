@@ -0,0 +1,91 @@
+import pytest
+from fastapi.testclient import TestClient
+from src.main import app
+from src.service import landing_page_service
+from src.utils.shared_cache import MemoryCacheBackend
+
+ITEM = {
+    "subdomain": "myaca",
+    "hero": {"subtitle": "s", "title": "t", "description": "d"},
+    "section_1": {"title": "1", "description": "d", "imageURL": "https://example.com/1.png"},
+    "section_2": {"title": "2", "description": "d", "imageURL": "https://example.com/2.png"},
+    "section_3": {"title": "3", "description": "d", "imageURL": "https://example.com/3.png"},
+}
+
+
+class FakeTable:
+    def __init__(self):
+        self.reads = 0
+
+    def get_item(self, Key):
+        self.reads += 1
+        return {"Item": ITEM}
+
+    def update_item(self, **kwargs):
+        return {}
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeTable()
+    monkeypatch.setattr(landing_page_service, "landing_page_table", lambda: table)
+    monkeypatch.setattr(landing_page_service, "_cache", MemoryCacheBackend())
+    return table
+
+
+def test_landing_page_is_served_from_cache(table):
+    """
+    Given: 랜딩 페이지를 한 번 조회했을 때
+    When: 같은 서브도메인을 다시 조회하면
+    Then: DynamoDB 를 다시 읽지 않고 같은 ETag 를 반환해야 한다
+    """
+    # Given
+    client = TestClient(app)
+    first = client.get("/landing/myaca")
+
+    # When
+    second = client.get("/landing/myaca")
+
+    # Then
+    assert first.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert table.reads == 1
+
+
+def test_landing_page_returns_304_for_matching_etag(table):
+    """
+    Given: 클라이언트가 현재 ETag 를 가지고 있을 때
+    When: If-None-Match 로 조회하면
+    Then: 본문 없이 304 를 반환해야 한다
+    """
+    # Given
+    client = TestClient(app)
+    etag = client.get("/landing/myaca").headers["ETag"]
+
+    # When
+    response = client.get("/landing/myaca", headers={"If-None-Match": etag})
+
+    # Then
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_update_invalidates_cache(table):
+    """
+    Given: 캐시된 랜딩 페이지가 있을 때
+    When: 랜딩 페이지를 수정하면
+    Then: 다음 조회는 DynamoDB 에서 다시 읽어야 한다
+    """
+    # Given
+    client = TestClient(app)
+    client.get("/landing/myaca")
+    body = {key: value for key, value in ITEM.items() if key != "subdomain"}
+
+    # When
+    client.put("/landing/myaca", json=body)
+    client.get("/landing/myaca")
+
+    # Then
+    assert table.reads == 2
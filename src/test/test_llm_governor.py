@@ -0,0 +1,170 @@
+import asyncio
+import time
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+from src.utils import llm_governor
+from src.utils.llm_governor import governed, LLMGovernor, MemoryBucketStore, GovernorTimeout, LANES, INTERACTIVE, ADMIN, BACKGROUND
+
+NO_RESERVES = {lane: 0.0 for lane in LANES}
+
+
+def drained_store(rpm=1200, tpm=1_000_000):
+    # 1200 rpm refills one request every 50ms, so queued waiters are granted one by one
+    store = MemoryBucketStore(rpm=rpm, tpm=tpm)
+    store.take(rpm, 0, 0)
+    return store
+
+
+def test_interactive_is_granted_before_queued_background():
+    """
+    Given: 요청 한도가 바닥나 background 호출이 먼저 기다리고 있을 때
+    When: interactive 호출이 뒤늦게 들어오면
+    Then: 한도가 차오르자마자 interactive 호출이 먼저 차례를 받아야 한다
+    """
+    # Given
+    governor = LLMGovernor(drained_store(), NO_RESERVES, max_wait=5)
+    order = []
+
+    async def call(lane):
+        permit = await governor.aacquire(10, lane=lane, academy="aca")
+        order.append(permit.lane)
+
+    # When
+    async def run():
+        background = [asyncio.create_task(call(BACKGROUND)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        await asyncio.gather(call(INTERACTIVE), *background)
+    asyncio.run(run())
+
+    # Then
+    assert order == [INTERACTIVE, BACKGROUND, BACKGROUND]
+
+
+def test_background_leaves_reserve_for_interactive():
+    """
+    Given: TPM 한도의 20% 를 상위 lane 에 남겨 두도록 설정되어 있고, 한도의 절반이 이미 쓰였을 때
+    When: 남은 한도의 대부분 (40%) 을 쓰는 호출을 background 와 interactive 로 보내면
+    Then: background 는 기다리다 GovernorTimeout 이 나고 interactive 는 바로 차례를 받아야 한다
+    """
+    # Given
+    reserves = {INTERACTIVE: 0.0, ADMIN: 0.1, BACKGROUND: 0.2}
+    governor = LLMGovernor(MemoryBucketStore(rpm=100, tpm=1000), reserves, max_wait=0.05)
+    governor.acquire(500, lane=INTERACTIVE)
+
+    # When / Then
+    with pytest.raises(GovernorTimeout):
+        governor.acquire(400, lane=BACKGROUND)
+    permit = governor.acquire(400, lane=INTERACTIVE)
+
+    assert permit.waited < 0.05
+    metrics = governor.metrics()["lanes"]
+    assert metrics[BACKGROUND]["timeouts"] == 1
+    assert metrics[BACKGROUND]["waiting"] == 0
+    assert metrics[INTERACTIVE]["granted"] == 2
+
+
+def test_academies_take_turns_within_a_lane():
+    """
+    Given: 한 학원이 같은 lane 에 호출을 여러 개 먼저 쌓아 두었을 때
+    When: 다른 학원의 호출이 뒤에 들어오면
+    Then: 먼저 쌓인 호출을 모두 기다리지 않고 번갈아 차례를 받아야 한다
+    """
+    # Given
+    governor = LLMGovernor(drained_store(), NO_RESERVES, max_wait=5)
+    order = []
+
+    async def call(academy):
+        await governor.aacquire(10, lane=BACKGROUND, academy=academy)
+        order.append(academy)
+
+    # When
+    async def run():
+        await asyncio.gather(call("a"), call("a"), call("a"), call("b"))
+    asyncio.run(run())
+
+    # Then
+    assert order == ["a", "b", "a", "a"]
+
+
+def test_metrics_report_queue_depth():
+    """
+    Given: 한도가 바닥나 여러 학원의 호출이 기다리고 있을 때
+    When: metrics 를 조회하고 기다리던 호출을 취소하면
+    Then: lane / 학원별 대기 수가 보이고, 취소된 호출은 대기열에서 빠져야 한다
+    """
+    # Given
+    governor = LLMGovernor(drained_store(rpm=60), NO_RESERVES, max_wait=5)
+
+    async def run():
+        tasks = [
+            asyncio.create_task(governor.aacquire(10, lane=BACKGROUND, academy=academy))
+            for academy in ("a", "a", "b")
+        ]
+        await asyncio.sleep(0.01)
+
+        # When
+        queued = governor.metrics()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return queued, governor.metrics()
+    queued, cancelled = asyncio.run(run())
+
+    # Then
+    assert queued["lanes"][BACKGROUND]["waiting"] == 3
+    assert queued["lanes"][BACKGROUND]["waiting_by_academy"] == {"a": 2, "b": 1}
+    assert queued["lanes"][INTERACTIVE]["waiting"] == 0
+    assert cancelled["lanes"][BACKGROUND]["waiting"] == 0
+
+
+def test_slow_store_does_not_block_event_loop():
+    """
+    Given: 한 번 조회에 0.2초가 걸리는 (파일 잠금을 기다리는) bucket 저장소가 있을 때
+    When: 비동기로 차례를 기다리는 동안 다른 코루틴이 10ms 마다 실행되면
+    Then: 저장소 I/O 는 스레드에서 실행되어 다른 코루틴이 계속 실행되어야 한다
+    """
+    # Given
+    class SlowStore(MemoryBucketStore):
+        def take(self, requests, tokens, reserve):
+            time.sleep(0.2)
+            return super().take(requests, tokens, reserve)
+
+    governor = LLMGovernor(SlowStore(), NO_RESERVES, max_wait=5)
+    ticks = []
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    # When
+    async def run():
+        return await asyncio.gather(governor.aacquire(10, lane=INTERACTIVE), ticker())
+    permit, _ = asyncio.run(run())
+
+    # Then
+    assert permit.lane == INTERACTIVE
+    assert ticks[-1] - ticks[0] < 0.18
+
+
+def test_each_fallback_attempt_takes_a_permit(monkeypatch):
+    """
+    Given: 기본 모델이 429 로 실패하고 fallback 모델이 답하는 runnable 이 있을 때
+    When: governed 로 감싸 호출하면
+    Then: 기본 모델과 fallback 호출이 각각 차례를 받아 요청 한도에 모두 계산되어야 한다
+    """
+    # Given
+    governor = LLMGovernor(MemoryBucketStore(rpm=100, tpm=100_000), NO_RESERVES, max_wait=1)
+    monkeypatch.setattr(llm_governor, "get_llm_governor", lambda: governor)
+
+    def rate_limited(prompt):
+        raise RuntimeError("429 Too Many Requests")
+    model = RunnableLambda(rate_limited).with_fallbacks([FakeListChatModel(responses=["답변"])])
+
+    # When
+    output = governed(model, max_tokens=10).invoke("질문")
+
+    # Then
+    assert output.content == "답변"
+    assert sum(lane["granted"] for lane in governor.metrics()["lanes"].values()) == 2
@@ -0,0 +1,97 @@
+import asyncio
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from src.utils import map_reduce_summary
+from src.utils.map_reduce_summary import MapReduceSummarizer, chunk_items
+from src.utils.shared_cache import MemoryCacheBackend
+
+ITEMS = [(f"ASSIGNMENT#a#student{i:03d}#1", f"학생 {i} 은 분배법칙을 잘못 적용했습니다.") for i in range(60)]
+
+
+def test_new_item_only_changes_its_chunk():
+    """
+    Given: 키 해시로 경계가 정해진 청크들이 있을 때
+    When: 새 아이템이 하나 추가되면
+    Then: 새 아이템이 들어간 청크를 제외한 나머지 청크는 그대로여야 한다
+    """
+    # Given
+    before = chunk_items(ITEMS, max_tokens=10_000, boundary_every=8)
+
+    # When
+    new_item = ("ASSIGNMENT#a#student030x#1", "새로 제출한 학생의 분석")
+    after = chunk_items(ITEMS + [new_item], max_tokens=10_000, boundary_every=8)
+
+    # Then
+    changed = [chunk for chunk in after if chunk not in before]
+    assert len(before) > 2
+    assert 1 <= len(changed) <= 2
+    assert any(new_item[1] in chunk for chunk in changed)
+
+
+def test_chunks_respect_token_budget():
+    """
+    Given: 경계 해시가 거의 나오지 않는 설정일 때
+    When: 청크로 나누면
+    Then: 각 청크는 토큰 예산을 넘지 않아야 한다
+    """
+    # When
+    chunks = chunk_items(ITEMS, max_tokens=100, boundary_every=10_000)
+
+    # Then
+    assert len(chunks) > 1
+    assert sum(len(chunk) for chunk in chunks) == len(ITEMS)
+    assert all(sum(map_reduce_summary.count_tokens(text) for text in chunk) <= 100 for chunk in chunks)
+
+
+def test_new_submission_recomputes_only_its_chunk_and_reduce(monkeypatch):
+    """
+    Given: 한 번 요약한 문제가 있을 때
+    When: 제출물이 하나 추가된 뒤 다시 요약하면
+    Then: 바뀐 청크와 최종 reduce 만 LLM 을 다시 호출해야 한다
+    """
+    # Given
+    llm = FakeListChatModel(responses=[f'{{"analysis": "요약 {i}"}}' for i in range(100)])
+    monkeypatch.setattr(map_reduce_summary, "get_stage_model", lambda *args, **kwargs: llm)
+    summarizer = MapReduceSummarizer(MemoryCacheBackend(), max_tokens=10_000, boundary_every=8)
+    asyncio.run(summarizer.summarize(ITEMS))
+    first = summarizer.metrics()
+
+    # When
+    summary = asyncio.run(summarizer.summarize(ITEMS + [("ASSIGNMENT#a#student030x#1", "새 분석")]))
+    second = summarizer.metrics()
+
+    # Then
+    assert summary.startswith("요약")
+    assert first["chunks"] > 2
+    assert first["llm_calls"] == first["chunks"] + 1
+    assert 2 <= second["llm_calls"] - first["llm_calls"] <= 3
+    assert second["cache_hits"] - first["cache_hits"] >= first["chunks"] - 1
+
+
+def test_oversized_partials_are_truncated_before_reduce(monkeypatch):
+    """
+    Given: 부분 요약 하나하나가 reduce 예산의 절반을 넘어 둘씩도 묶이지 않을 때
+    When: 요약하면
+    Then: 모든 부분 요약을 한 번에 합치지 않고, 잘라서 예산 안에서 여러 단계로 합쳐야 한다
+    """
+    # Given
+    long_summary = "분배법칙을 잘못 적용함 " * 40
+    llm = FakeListChatModel(responses=[f'{{"analysis": "{long_summary}"}}'])
+    monkeypatch.setattr(map_reduce_summary, "get_stage_model", lambda *args, **kwargs: llm)
+    summarizer = MapReduceSummarizer(MemoryCacheBackend(), max_tokens=100, boundary_every=1)
+    reduce_inputs = []
+    summarize_group = summarizer._summarize
+
+    async def record(prompt, texts, semaphore):
+        if prompt == map_reduce_summary.REDUCE_PROMPT:
+            reduce_inputs.append(texts)
+        return await summarize_group(prompt, texts, semaphore)
+    monkeypatch.setattr(summarizer, "_summarize", record)
+
+    # When
+    summary = asyncio.run(summarizer.summarize(ITEMS[:4]))
+
+    # Then
+    assert summary.startswith("분배법칙")
+    assert len(reduce_inputs) > 1
+    assert all(len(texts) >= 2 for texts in reduce_inputs)
+    assert all(sum(map_reduce_summary.count_tokens(text) for text in texts) <= 100 for texts in reduce_inputs)
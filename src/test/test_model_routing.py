@@ -0,0 +1,64 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from src.model.utils_model import ModelRoute
+from src.utils import model_routing
+from src.utils.model_routing import parse_routes
+
+
+class FailingChatModel(FakeListChatModel):
+    def _call(self, *args, **kwargs):
+        raise TimeoutError("primary model exceeded its timeout")
+
+
+def test_overrides_are_merged_into_defaults():
+    """
+    Given: 기본 라우팅 표가 있을 때
+    When: 일부 단계의 모델과 fallback 만 덮어쓰면
+    Then: 나머지 필드와 다른 단계의 설정은 기본값을 유지해야 한다
+    """
+    # Given
+    defaults = {
+        "title": ModelRoute("gpt-4o-mini", 0.5, max_tokens=100, timeout=15),
+        "chat": ModelRoute("gpt-4o", 0.5, timeout=60),
+    }
+
+    # When
+    routes = parse_routes({"title": {"model": "gpt-4.1-nano", "fallbacks": ["gpt-4o-mini"]}}, defaults)
+
+    # Then
+    assert routes["title"] == ModelRoute("gpt-4.1-nano", 0.5, max_tokens=100, timeout=15, fallbacks=("gpt-4o-mini",))
+    assert routes["chat"] == defaults["chat"]
+
+
+def test_invalid_override_fails_fast():
+    """
+    Given: 오타가 있거나 model 이 없는 새 단계 설정이 있을 때
+    When: 라우팅 표를 읽으면
+    Then: ValueError 로 바로 실패해야 한다
+    """
+    with pytest.raises(ValueError):
+        parse_routes({"title": {"modle": "gpt-4o"}})
+    with pytest.raises(ValueError):
+        parse_routes({"unknown_stage": {"timeout": 3}})
+
+
+def test_fallback_model_answers_when_primary_fails(monkeypatch):
+    """
+    Given: 기본 모델이 항상 실패하고 fallback 모델이 설정된 단계가 있을 때
+    When: 단계 모델을 호출하면
+    Then: fallback 모델의 응답을 반환해야 한다
+    """
+    # Given
+    models = {
+        "primary": FailingChatModel(responses=["unused"]),
+        "backup": FakeListChatModel(responses=["fallback answer"]),
+    }
+    monkeypatch.setattr(model_routing, "_routes", {"title": ModelRoute("primary", fallbacks=("backup",))})
+    monkeypatch.setattr(model_routing, "_models", {})
+    monkeypatch.setattr(model_routing, "get_chat_model", lambda model, *args, **kwargs: models[model])
+
+    # When
+    message = model_routing.get_stage_model("title").invoke("제목을 지어 주세요")
+
+    # Then
+    assert message.content == "fallback answer"
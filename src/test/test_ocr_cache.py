@@ -0,0 +1,80 @@
+import pytest
+from src.utils.ocr_cache import OCRCache, UrlValidator, content_key
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "ocr_cache.sqlite3")
+
+
+def test_same_bytes_same_version_hit(cache_path):
+    """
+    Given: 같은 이미지 바이트와 같은 프롬프트 버전으로 저장된 OCR 결과가 있을 때
+    When: 메모리 캐시가 비어 있는 새 캐시 인스턴스로 조회하면
+    Then: SQLite 캐시에서 결과를 찾아야 하고, 버전이 다르면 찾지 못해야 한다
+    """
+    # Given
+    OCRCache(cache_path).set(content_key(b"image", "image2text@v1"), "x = 2")
+
+    # When
+    cache = OCRCache(cache_path)
+
+    # Then
+    assert cache.get(content_key(b"image", "image2text@v1")) == "x = 2"
+    assert cache.get(content_key(b"image", "image2text@v2")) is None
+
+
+def test_expired_entry_is_ignored(cache_path):
+    """
+    Given: TTL 이 0 인 캐시에 저장된 OCR 결과가 있을 때
+    When: 조회하면
+    Then: 만료되어 None 을 반환해야 한다
+    """
+    # Given
+    cache = OCRCache(cache_path, ttl=0)
+    cache.set("key", "x = 2")
+
+    # When
+    result = cache.get("key")
+
+    # Then
+    assert result is None
+
+
+def test_size_eviction_drops_least_recently_used(cache_path):
+    """
+    Given: 최대 용량이 두 항목 크기인 캐시가 있을 때
+    When: 세 번째 항목을 저장하면
+    Then: 가장 오래 전에 사용된 항목이 SQLite 캐시에서 지워져야 한다
+    """
+    # Given
+    cache = OCRCache(cache_path, memory_items=0, max_bytes=20)
+    cache.set("a", "a" * 10)
+    cache.set("b", "b" * 10)
+
+    # When
+    cache.set("c", "c" * 10)
+
+    # Then
+    assert cache.get("a") is None
+    assert cache.get("b") == "b" * 10
+    assert cache.get("c") == "c" * 10
+
+
+def test_url_validator_round_trip(cache_path):
+    """
+    Given: ETag 가 있는 URL 검증자를 저장했을 때
+    When: 같은 URL 로 조회하면
+    Then: 저장한 검증자를 돌려줘야 하고, 검증자가 없는 응답은 저장하지 않아야 한다
+    """
+    # Given
+    cache = OCRCache(cache_path)
+    cache.set_url("https://cdn/a.jpg", UrlValidator(etag='"abc"', last_modified=None, content_key="k"))
+    cache.set_url("https://cdn/b.jpg", UrlValidator(etag=None, last_modified=None, content_key="k"))
+
+    # When
+    validator = cache.get_url("https://cdn/a.jpg")
+
+    # Then
+    assert validator == UrlValidator(etag='"abc"', last_modified=None, content_key="k")
+    assert cache.get_url("https://cdn/b.jpg") is None
@@ -0,0 +1,68 @@
+from io import BytesIO
+from PIL import Image
+from src.utils.preprocess_image import preprocess_image, sniff_image_format
+
+
+def make_image(size, mode="RGB", image_format="PNG", exif=None) -> bytes:
+    buffer = BytesIO()
+    img = Image.new(mode, size, "white")
+    if exif is not None:
+        img.save(buffer, format=image_format, exif=exif)
+    else:
+        img.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def test_large_png_is_downscaled_to_jpeg():
+    """
+    Given: 긴 변이 최대 크기보다 큰 PNG 이미지가 있을 때
+    When: 전처리하면
+    Then: 긴 변이 최대 크기로 줄어든 JPEG 로 재인코딩되어야 한다
+    """
+    # Given
+    image_bytes = make_image((4000, 3000), mode="RGBA")
+
+    # When
+    prepared = preprocess_image(image_bytes, max_side=1000)
+
+    # Then
+    assert prepared.mime_type == "image/jpeg"
+    assert (prepared.width, prepared.height) == (1000, 750)
+    assert prepared.detail == "high"
+    assert sniff_image_format(prepared.data[:12]) == "JPEG"
+
+
+def test_exif_orientation_is_applied():
+    """
+    Given: EXIF 방향이 90도 회전(6)으로 기록된 JPEG 이미지가 있을 때
+    When: 전처리하면
+    Then: 회전이 적용되어 가로 / 세로가 바뀌어야 한다
+    """
+    # Given
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    image_bytes = make_image((200, 100), image_format="JPEG", exif=exif)
+
+    # When
+    prepared = preprocess_image(image_bytes)
+
+    # Then
+    assert (prepared.width, prepared.height) == (100, 200)
+
+
+def test_small_image_keeps_original_with_real_mime_type():
+    """
+    Given: 이미 작은 PNG 이미지가 있을 때
+    When: 전처리하면
+    Then: low detail 로 보내고, 재인코딩이 더 크면 원본을 image/png 로 보내야 한다
+    """
+    # Given
+    image_bytes = make_image((64, 64))
+
+    # When
+    prepared = preprocess_image(image_bytes)
+
+    # Then
+    assert prepared.detail == "low"
+    assert prepared.data == image_bytes
+    assert prepared.mime_type == "image/png"
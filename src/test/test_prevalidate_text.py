@@ -0,0 +1,59 @@
+from src.benchmark.prevalidation_report import load_fixtures, evaluate
+from src.utils import text_validation as text_validation_module
+from src.utils.prevalidate_text import (
+    prevalidate_text, latex_balanced, PREVALIDATION_REJECT_BELOW, PREVALIDATION_ACCEPT_ABOVE, ACCEPT, REJECT,
+)
+
+
+def test_default_thresholds_do_not_misjudge_fixtures():
+    """
+    Given: 라벨된 OCR 텍스트 fixture 가 있을 때
+    When: 기본 임계값으로 사전 검증하면
+    Then: 잘못 통과 / 반려한 건 없이 일부는 LLM 호출을 건너뛰어야 한다
+    """
+    # Given
+    fixtures = load_fixtures()
+
+    # When
+    report = evaluate(fixtures, PREVALIDATION_REJECT_BELOW, PREVALIDATION_ACCEPT_ABOVE)
+
+    # Then
+    assert report["false_accept"] == 0
+    assert report["false_reject"] == 0
+    assert report["avoided_llm_calls"] >= len(fixtures) * 2 // 3
+
+
+def test_clear_cases_short_circuit(monkeypatch):
+    """
+    Given: 빈 텍스트와 깔끔한 수식 텍스트가 있을 때
+    When: text_validation 을 호출하면
+    Then: LLM 을 호출하지 않고 각각 반려 / 통과해야 한다
+    """
+    # Given
+    def no_llm(*args, **kwargs):
+        raise AssertionError("LLM must not be called")
+    monkeypatch.setattr(text_validation_module, "get_stage_model", no_llm)
+    clean = "x^2 - 5x + 6 = 0\n(x-2)(x-3) = 0\nx = 2 또는 x = 3"
+
+    # When
+    blank = text_validation_module.text_validation("   ")
+    accepted = text_validation_module.text_validation(clean)
+
+    # Then
+    assert (blank.ok, blank.text) == (False, "")
+    assert (accepted.ok, accepted.text) == (True, clean)
+    assert prevalidate_text("   ").decision == REJECT
+    assert prevalidate_text(clean).decision == ACCEPT
+
+
+def test_latex_balance():
+    """
+    Given: 짝이 맞는 / 맞지 않는 LaTeX 텍스트가 있을 때
+    When: latex_balanced 를 호출하면
+    Then: 짝이 맞는 경우만 True 여야 한다
+    """
+    assert latex_balanced("\\frac{1}{2} = \\left( \\frac{2}{4} \\right)")
+    assert latex_balanced("$x$ 와 \\{1, 2\\}")
+    assert not latex_balanced("\\frac{1}{2")
+    assert not latex_balanced("\\left( x")
+    assert not latex_balanced("$x = 2")
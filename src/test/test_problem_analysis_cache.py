@@ -0,0 +1,150 @@
+import asyncio
+from src.utils.problem_analysis_cache import ProblemAnalysisCache
+from src.utils.shared_cache import MemoryCacheBackend
+from src.utils.llm_governor import ADMIN, BACKGROUND, current_lane, llm_lane
+
+
+class FakeSource:
+    def __init__(self):
+        self.items = [("ASSIGNMENT#a#s1#1", "분배법칙 오류")]
+        self.loads = 0
+        self.summaries = 0
+
+    async def load(self, problem_id):
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        return list(self.items)
+
+    async def summarize(self, items):
+        self.summaries += 1
+        return f"요약 {self.summaries} ({len(items)}명)"
+
+
+def make_cache(source, fresh_ttl=300):
+    return ProblemAnalysisCache(MemoryCacheBackend(), source.load, source.summarize, fresh_ttl=fresh_ttl)
+
+
+def test_concurrent_requests_are_coalesced():
+    """
+    Given: 요약이 저장되지 않은 문제가 있을 때
+    When: 같은 문제를 동시에 다섯 번 조회하면
+    Then: 요약은 한 번만 계산되고 모두 같은 결과를 받아야 한다
+    """
+    # Given
+    source = FakeSource()
+    cache = make_cache(source)
+
+    # When
+    async def run():
+        return await asyncio.gather(*(cache.get("1") for _ in range(5)))
+    results = asyncio.run(run())
+
+    # Then
+    assert results == ["요약 1 (1명)"] * 5
+    assert source.loads == 1
+    assert source.summaries == 1
+    assert cache.metrics()["coalesced"] == 4
+
+
+def test_fresh_summary_is_served_without_reading_submissions():
+    """
+    Given: 방금 계산된 요약이 있을 때
+    When: 다시 조회하면
+    Then: 제출물을 다시 읽지 않고 저장된 요약을 반환해야 한다
+    """
+    # Given
+    source = FakeSource()
+    cache = make_cache(source)
+
+    async def run():
+        await cache.get("1")
+        return await cache.get("1")
+
+    # When
+    result = asyncio.run(run())
+
+    # Then
+    assert result == "요약 1 (1명)"
+    assert source.loads == 1
+    assert cache.metrics()["hits"] == 1
+
+
+def test_stale_summary_is_served_then_revalidated():
+    """
+    Given: 새 제출물이 들어와 오래된 것으로 표시된 요약이 있을 때
+    When: 조회하면
+    Then: 오래된 요약을 바로 반환하고, 백그라운드 갱신 후에는 새 요약을 반환해야 한다
+    """
+    # Given
+    source = FakeSource()
+    cache = make_cache(source)
+
+    async def run():
+        await cache.get("1")
+        source.items.append(("ASSIGNMENT#a#s2#1", "계산 실수"))
+        cache.mark_stale("1")
+
+        # When
+        stale = await cache.get("1")
+        await asyncio.gather(*cache._background)
+        return stale, await cache.get("1")
+    stale, fresh = asyncio.run(run())
+
+    # Then
+    assert stale == "요약 1 (1명)"
+    assert fresh == "요약 2 (2명)"
+    assert cache.metrics()["stale_hits"] == 1
+
+
+def test_unchanged_submissions_skip_summarization():
+    """
+    Given: 신선도 시간이 지났지만 제출물은 그대로인 요약이 있을 때
+    When: 조회 후 백그라운드 갱신이 끝나면
+    Then: LLM 요약을 다시 하지 않고 신선도만 연장해야 한다
+    """
+    # Given
+    source = FakeSource()
+    cache = make_cache(source, fresh_ttl=0)
+
+    async def run():
+        await cache.get("1")
+
+        # When
+        await cache.get("1")
+        await asyncio.gather(*cache._background)
+    asyncio.run(run())
+
+    # Then
+    assert source.loads == 2
+    assert source.summaries == 1
+    assert cache.metrics()["unchanged"] == 1
+
+
+def test_miss_uses_caller_lane_and_refresh_uses_background():
+    """
+    Given: admin lane 에서 요약을 조회할 때
+    When: 저장된 요약이 없어 바로 계산하고, 이후 오래된 요약을 백그라운드에서 갱신하면
+    Then: 바로 계산하는 요약은 admin lane, 백그라운드 갱신은 background lane 으로 LLM 을 호출해야 한다
+    """
+    # Given
+    lanes = []
+
+    async def summarize(items):
+        lanes.append(current_lane()[0])
+        return "요약"
+
+    source = FakeSource()
+    cache = ProblemAnalysisCache(MemoryCacheBackend(), source.load, summarize, fresh_ttl=300)
+
+    # When
+    async def run():
+        with llm_lane(ADMIN):
+            await cache.get("1")
+            source.items.append(("ASSIGNMENT#a#s2#1", "부호 실수"))
+            cache.mark_stale("1")
+            await cache.get("1")
+            await asyncio.gather(*cache._background)
+    asyncio.run(run())
+
+    # Then
+    assert lanes == [ADMIN, BACKGROUND]
@@ -0,0 +1,99 @@
+from botocore.exceptions import ClientError
+from src.utils.problem_counters import CounterWriter, CounterDelta, apply_counter_delta
+
+
+class FakeTable:
+    def __init__(self, fail_first: str = None):
+        self.fail_first = fail_first
+        self.calls = []
+
+    def update_item(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.fail_first and len(self.calls) == 1:
+            raise ClientError({"Error": {"Code": self.fail_first, "Message": "boom"}}, "UpdateItem")
+        return {}
+
+
+def test_writer_coalesces_increments_per_problem():
+    """
+    Given: 같은 문제에 대한 분류 결과가 여러 번 기록되었을 때
+    When: flush 하면
+    Then: 문제당 한 번의 ADD 요청으로 합쳐져야 한다
+    """
+    # Given
+    table = FakeTable()
+    flushed = []
+    writer = CounterWriter(table=table, flush_interval=60, on_flush=lambda *key: flushed.append(key))
+    writer.record("aca", "1", "계산 실수")
+    writer.record("aca", "1", "계산 실수")
+    writer.record("aca", "1", "정답")
+    writer.record("aca", "2", "오타")
+
+    # When
+    written = writer.flush()
+
+    # Then
+    assert written == 2
+    first = table.calls[0]
+    assert first["UpdateExpression"] == "ADD IncorrectCount :inc, Reasons.#r0 :r0, Reasons.#r1 :r1"
+    assert first["ExpressionAttributeValues"] == {":inc": 2, ":r0": 2, ":r1": 1}
+    assert first["ExpressionAttributeNames"] == {"#r0": "계산 실수", "#r1": "정답"}
+    assert flushed == [("aca", "1"), ("aca", "2")]
+
+
+def test_missing_reasons_map_is_created_before_add():
+    """
+    Given: Reasons 맵이 없어서 중첩 ADD 가 ValidationException 으로 실패하는 문제가 있을 때
+    When: 증가분을 쓰면
+    Then: 빈 맵을 만든 뒤 ADD 를 다시 시도해야 한다
+    """
+    # Given
+    table = FakeTable(fail_first="ValidationException")
+    delta = CounterDelta()
+    delta.add("오타")
+
+    # When
+    apply_counter_delta(table, "aca", "1", delta)
+
+    # Then
+    assert len(table.calls) == 3
+    assert table.calls[1]["UpdateExpression"] == "SET Reasons = if_not_exists(Reasons, :empty)"
+    assert table.calls[2] == table.calls[0]
+
+
+def test_failed_flush_keeps_increments():
+    """
+    Given: 첫 쓰기가 스로틀링으로 실패하는 테이블이 있을 때
+    When: 두 번 flush 하면
+    Then: 실패한 증가분이 다음 flush 에 다시 쓰여야 한다
+    """
+    # Given
+    table = FakeTable(fail_first="ProvisionedThroughputExceededException")
+    writer = CounterWriter(table=table, flush_interval=60)
+    writer.record("aca", "1", "오타")
+
+    # When
+    first = writer.flush()
+    second = writer.flush()
+
+    # Then
+    assert (first, second) == (0, 1)
+    assert table.calls[1]["ExpressionAttributeValues"] == {":inc": 1, ":r0": 1}
+
+
+def test_record_event_is_set_once_written():
+    """
+    Given: 기록된 증가분이 아직 메모리에만 있을 때
+    When: 첫 flush 는 실패하고 다음 flush 는 성공하면
+    Then: record 가 돌려준 이벤트는 실제로 쓰인 뒤에만 세워져야 한다
+    """
+    # Given
+    writer = CounterWriter(table=FakeTable(fail_first="ProvisionedThroughputExceededException"), flush_interval=60)
+    written = writer.record("aca", "1", "계산 실수")
+    assert not written.is_set()
+
+    # When / Then
+    writer.flush()
+    assert not written.is_set()
+    writer.flush()
+    assert written.is_set()
@@ -0,0 +1,80 @@
+import threading
+import time
+from src.utils.problem_repository import ProblemRepository
+
+
+class FakeTable:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.calls = []
+        self.item = {"PK": "aca", "SK": "PROBLEM#1", "Solution": "x = 2", "Reasons": {"정답": 1}}
+
+    def get_item(self, **kwargs):
+        self.calls.append(kwargs)
+        time.sleep(self.delay)
+        return {"Item": dict(self.item)}
+
+
+def test_concurrent_misses_are_coalesced():
+    """
+    Given: 캐시가 비어 있는 저장소가 있을 때
+    When: 여러 스레드가 같은 문제를 동시에 조회하면
+    Then: DynamoDB 조회는 한 번만 일어나고 이후 조회는 캐시에서 반환되어야 한다
+    """
+    # Given
+    table = FakeTable(delay=0.1)
+    repository = ProblemRepository(table=table)
+    results = []
+
+    # When
+    threads = [threading.Thread(target=lambda: results.append(repository.get("aca", "1"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    repository.get("aca", "1")
+
+    # Then
+    assert len(table.calls) == 1
+    assert all(result["Solution"] == "x = 2" for result in results)
+    assert repository.metrics()["coalesced"] + repository.metrics()["misses"] == 8
+
+
+def test_invalidate_drops_every_projection():
+    """
+    Given: 전체 아이템과 projection 아이템이 캐시되어 있을 때
+    When: 문제를 무효화하면
+    Then: 두 조회 모두 DynamoDB 에서 다시 읽어야 한다
+    """
+    # Given
+    table = FakeTable()
+    repository = ProblemRepository(table=table)
+    repository.get("aca", "1")
+    repository.get("aca", "1", ("Name", "Solution"))
+
+    # When
+    repository.invalidate("aca", "1")
+    repository.get("aca", "1")
+    repository.get("aca", "1", ("Name", "Solution"))
+
+    # Then
+    assert len(table.calls) == 4
+
+
+def test_projection_uses_attribute_name_placeholders():
+    """
+    Given: 예약어(Name)가 포함된 필드 목록이 있을 때
+    When: projection 으로 조회하면
+    Then: ExpressionAttributeNames placeholder 로 요청해야 한다
+    """
+    # Given
+    table = FakeTable()
+    repository = ProblemRepository(table=table)
+
+    # When
+    repository.get("aca", "1", ("Name", "Solution"))
+
+    # Then
+    call = table.calls[0]
+    assert call["ProjectionExpression"] == "#f0, #f1"
+    assert call["ExpressionAttributeNames"] == {"#f0": "Name", "#f1": "Solution"}
@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models.fake_chat_models import FakeListChatModel, FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+from src.model.outputParser import ReasonResult
+from src.utils.prompt_registry import PROMPT_SPECS, STRUCTURED_REPAIR_ATTEMPTS, get_chain, get_prompt, prompt_version
+from src.utils.llm_usage import get_prompt_cache_metrics
+
+
+def test_all_prompts_are_precompiled():
+    """
+    Given: 등록된 모든 프롬프트 정의가 있을 때
+    When: 레지스트리에서 조회하면
+    Then: 출력 모델이 있는 프롬프트는 format_instructions 가 미리 렌더링되어 있어야 한다
+    """
+    for spec in PROMPT_SPECS:
+        compiled = get_prompt(spec.name)
+        if spec.output_model is None:
+            assert compiled.parser is None
+            assert not compiled.format_instructions
+            if spec.input_variables:
+                assert sorted(compiled.prompt.input_variables) == sorted(spec.input_variables)
+            continue
+        assert compiled.format_instructions
+        assert sorted(compiled.prompt.input_variables) == sorted(spec.input_variables)
+
+
+def test_prompt_version():
+    """
+    Given: analysis 프롬프트가 등록되어 있을 때
+    When: prompt_version 을 호출하면
+    Then: 이름과 버전이 합쳐진 식별자를 반환해야 한다
+    """
+    assert prompt_version("analysis") == "analysis@v2"
+
+
+def test_get_chain_is_reused_and_parses_output():
+    """
+    Given: 같은 llm 으로 같은 프롬프트의 chain 을 두 번 요청할 때
+    When: chain 을 실행하면
+    Then: 같은 runnable 을 재사용하고 출력 모델로 파싱해야 한다
+    """
+    # Given
+    llm = FakeListChatModel(responses=['{"reason": "정답"}'])
+
+    # When
+    chain = get_chain("categorize", llm)
+    result = chain.invoke({"analysis_result": "맞음", "categories": "{}"})
+
+    # Then
+    assert chain is get_chain("categorize", llm)
+    assert isinstance(result, ReasonResult)
+    assert result.reason == "정답"
+
+
+def test_malformed_output_is_repaired_once():
+    """
+    Given: 첫 응답은 형식이 깨졌고, 수정 요청에는 올바른 JSON 을 주는 LLM 이 있을 때
+    When: chain 을 실행하면
+    Then: 전체 요청을 다시 하지 않고 응답 수정만으로 출력 모델을 만들어야 한다
+    """
+    # Given
+    llm = FakeListChatModel(responses=["정답입니다", '{"reason": "정답"}', "unused"])
+
+    # When
+    result = get_chain("categorize", llm).invoke({"analysis_result": "맞음", "categories": "{}"})
+
+    # Then
+    assert result.reason == "정답"
+    assert llm.i == 2
+
+
+def test_async_repair_gives_up_after_attempts():
+    """
+    Given: 수정 요청에도 계속 형식이 깨진 응답을 주는 LLM 이 있을 때
+    When: chain 을 비동기로 실행하면
+    Then: STRUCTURED_REPAIR_ATTEMPTS 번만 수정을 요청하고 OutputParserException 을 던져야 한다
+    """
+    # Given
+    llm = FakeListChatModel(responses=["정답입니다", "여전히 정답입니다", "unused"])
+
+    # When / Then
+    with pytest.raises(OutputParserException):
+        asyncio.run(get_chain("categorize", llm).ainvoke({"analysis_result": "맞음", "categories": "{}"}))
+    assert llm.i == 1 + STRUCTURED_REPAIR_ATTEMPTS
+
+
+def test_system_prefix_is_shared_across_questions():
+    """
+    Given: 같은 문제에 대한 서로 다른 학생의 질문이 있을 때
+    When: chat 프롬프트를 렌더링하면
+    Then: 지침, 출력 형식, 문제가 담긴 system 메시지는 같고 질문은 그 뒤에 와야 한다
+    """
+    # Given
+    prompt = get_prompt("chat").prompt
+    first = {"problem": "x + 1 = 3", "submission": "x = 3", "history": "없음", "question": "왜 틀렸나요?"}
+    second = {"problem": "x + 1 = 3", "submission": "x = 1", "history": "없음", "question": "정답은요?"}
+
+    # When
+    first_messages = prompt.invoke(first).to_messages()
+    second_messages = prompt.invoke(second).to_messages()
+
+    # Then
+    assert first_messages[0].type == "system"
+    assert first_messages[0].content == second_messages[0].content
+    assert "x + 1 = 3" in first_messages[0].content
+    assert "왜 틀렸나요?" in first_messages[1].content
+
+
+def test_chain_records_cached_tokens():
+    """
+    Given: usage_metadata 에 cached_tokens 를 담아 응답하는 LLM 이 있을 때
+    When: chain 을 실행하면
+    Then: 프롬프트 버전별로 입력 / 캐시 토큰이 기록되어야 한다
+    """
+    # Given
+    message = AIMessage(
+        content='{"reason": "정답"}',
+        usage_metadata={
+            "input_tokens": 2000, "output_tokens": 10, "total_tokens": 2010,
+            "input_token_details": {"cache_read": 1536},
+        },
+    )
+    llm = FakeMessagesListChatModel(responses=[message, message])
+    before = get_prompt_cache_metrics().get("categorize@v2", {"input_tokens": 0, "cached_tokens": 0})
+
+    # When
+    get_chain("categorize", llm).invoke({"analysis_result": "맞음", "categories": "{}"})
+
+    # Then
+    after = get_prompt_cache_metrics()["categorize@v2"]
+    assert after["input_tokens"] - before["input_tokens"] == 2000
+    assert after["cached_tokens"] - before["cached_tokens"] == 1536
+    assert 0 < after["cache_hit_ratio"] <= 1
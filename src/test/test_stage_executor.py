@@ -0,0 +1,101 @@
+import threading
+import time
+import pytest
+from src.utils.stage_executor import Stage, StageError, StageTimeout, run_stages, raise_if_cancelled
+
+
+def test_independent_stages_run_concurrently():
+    """
+    Given: 서로 의존하지 않는 두 단계와 둘 다에 의존하는 단계가 있을 때
+    When: 파이프라인을 실행하면
+    Then: 앞의 두 단계는 동시에 실행되고 마지막 단계는 두 결과를 받아야 한다
+    """
+    # Given
+    def slow(value):
+        def run(_):
+            time.sleep(0.2)
+            return value
+        return run
+
+    stages = [
+        Stage("ocr", slow("x = 2")),
+        Stage("problem", slow({"Solution": "x = 2"})),
+        Stage("analyze", lambda inputs: inputs["ocr"] == inputs["problem"]["Solution"], deps=("ocr", "problem")),
+    ]
+
+    # When
+    started = time.monotonic()
+    run = run_stages(stages)
+    elapsed = time.monotonic() - started
+
+    # Then
+    assert run.results["analyze"] is True
+    assert elapsed < 0.35
+    assert set(run.timings) == {"ocr", "problem", "analyze"}
+
+
+def test_stage_timeout_raises():
+    """
+    Given: 제한 시간보다 오래 걸리는 단계가 있을 때
+    When: 파이프라인을 실행하면
+    Then: StageTimeout 이 발생하고 의존 단계는 실행되지 않아야 한다
+    """
+    # Given
+    ran = []
+    stages = [
+        Stage("ocr", lambda _: time.sleep(1), timeout=0.05),
+        Stage("analyze", lambda inputs: ran.append(True), deps=("ocr",)),
+    ]
+
+    # When / Then
+    with pytest.raises(StageTimeout) as error:
+        run_stages(stages)
+    assert error.value.stage == "ocr"
+    assert ran == []
+
+
+def test_stage_failure_keeps_cause():
+    """
+    Given: 예외를 던지는 단계가 있을 때
+    When: 파이프라인을 실행하면
+    Then: 실패한 단계 이름과 원래 예외를 가진 StageError 가 발생해야 한다
+    """
+    # Given
+    def boom(_):
+        raise RuntimeError("ddb down")
+
+    # When / Then
+    with pytest.raises(StageError) as error:
+        run_stages([Stage("problem", boom)])
+    assert error.value.stage == "problem"
+    assert isinstance(error.value.__cause__, RuntimeError)
+
+
+def test_failure_stops_running_stage_before_next_call():
+    """
+    Given: 다른 단계가 실패할 때 LLM 호출을 이어 가는 단계가 실행 중일 때
+    When: 파이프라인이 실패로 끝나면
+    Then: 실행 중인 단계는 cancelled 를 보고 다음 호출 전에 멈춰야 한다
+    """
+    # Given
+    cancelled = threading.Event()
+    calls = []
+
+    def analyze(_):
+        for _ in range(20):
+            raise_if_cancelled(cancelled)
+            calls.append(True)
+            time.sleep(0.02)
+
+    def boom(_):
+        time.sleep(0.05)
+        raise RuntimeError("ddb down")
+
+    # When
+    with pytest.raises(StageError):
+        run_stages([Stage("analyze", analyze), Stage("problem", boom)], cancelled)
+    time.sleep(0.1)
+
+    # Then
+    assert cancelled.is_set()
+    assert len(calls) < 6
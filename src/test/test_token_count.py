@@ -0,0 +1,65 @@
+from decimal import Decimal
+from src.utils.llm_usage import get_prompt_token_metrics
+from src.utils.token_count import compact_item, count_tokens, fit_prompt, truncate_tokens, TRUNCATION_MARKER
+
+
+def test_compact_item_keeps_selected_fields():
+    """
+    Given: 카운터와 빈 값이 섞인 DynamoDB 문제 아이템이 있을 때
+    When: 필요한 필드만 골라 직렬화하면
+    Then: 카운터와 빈 값은 빠지고 Decimal 은 숫자로 바뀌어야 한다
+    """
+    # Given
+    item = {
+        "PK": "aca", "Question": "x + 1 = 3", "Answer": Decimal("2"), "Choices": [],
+        "TotalSolved": Decimal("120"), "Reasons": {"계산 실수": Decimal("3")},
+    }
+
+    # When
+    text = compact_item(item, ("Question", "Answer", "Choices"))
+
+    # Then
+    assert text == '{"Answer":2,"Question":"x + 1 = 3"}'
+
+
+def test_truncate_tokens_fits_budget():
+    """
+    Given: 예산보다 긴 텍스트가 있을 때
+    When: truncate_tokens 를 호출하면
+    Then: 예산 이하로 잘리고 생략 표시가 붙어야 한다
+    """
+    # Given
+    text = "학생은 분배법칙을 잘못 적용했습니다. " * 200
+
+    # When
+    trimmed = truncate_tokens(text, 100)
+
+    # Then
+    assert trimmed.endswith(TRUNCATION_MARKER)
+    assert count_tokens(trimmed) <= 100
+    assert truncate_tokens("짧은 텍스트", 100) == "짧은 텍스트"
+
+
+def test_fit_prompt_trims_lists_and_records_tokens():
+    """
+    Given: 예산을 훨씬 넘는 과제 제출물 목록이 있을 때
+    When: fit_prompt 로 assignment_analysis 입력을 만들면
+    Then: 예산 안의 제출물만 남고 나머지는 개수로 표시되며, 잘린 호출로 기록되어야 한다
+    """
+    # Given
+    submissions = [
+        {"PK": "ASSIGNMENT#a", "SK": f"student{i}#1", "Reason": "계산 실수", "Analysis": "분배법칙 오류 " * 50}
+        for i in range(500)
+    ]
+    before = get_prompt_token_metrics().get("assignment_analysis", {"calls": 0, "truncated_calls": 0})
+
+    # When
+    fitted = fit_prompt("assignment_analysis", {"assignment_submissions": submissions})
+
+    # Then
+    after = get_prompt_token_metrics()["assignment_analysis"]
+    assert "PK" not in fitted["assignment_submissions"]
+    assert "건 생략)" in fitted["assignment_submissions"]
+    assert count_tokens(fitted["assignment_submissions"]) <= 12000
+    assert after["calls"] - before["calls"] == 1
+    assert after["truncated_calls"] - before["truncated_calls"] == 1
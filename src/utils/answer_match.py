@@ -0,0 +1,183 @@
+import os
+import re
+from fractions import Fraction
+from typing import Any, Dict, List, Set, Union
+from dotenv import load_dotenv
+from src.model.utils_model import AnswerKey
+
+load_dotenv()
+
+ANSWER_MATCH_ENABLED = os.getenv("ANSWER_MATCH_ENABLED", "true") == "true"
+# problems 의 선택지 정답 인덱스가 0 부터인지 1 부터인지 (학생은 ①, 1번 처럼 1 부터 씁니다)
+ANSWER_CHOICE_INDEX_BASE = int(os.getenv("ANSWER_CHOICE_INDEX_BASE", "0"))
+
+# problems 아이템에서 정답 비교에 필요한 필드
+ANSWER_FIELDS = ("Type", "Answer", "Choices")
+
+SUBJECTIVE = "subjective"
+SELECT = "select"
+MULTI = "multi"
+
+_CIRCLED = {chr(0x2460 + i): i + 1 for i in range(10)}
+_MARKER = re.compile(r"(?:정답|답|answer|ans|∴|\\therefore|따라서|그러므로)\s*[:：은는=]?\s*(.+)$", re.IGNORECASE)
+_TRAILING_WORDS = re.compile(r"\s*(입니다|이다|임|이에요|예요|입니당)?\s*[.。!]*\s*$")
+_LATEX_FRACTION = re.compile(r"^(-)?\\[dt]?frac\{(-?\d+)\}\{(-?\d+)\}$")
+_PLAIN_NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+_PLAIN_FRACTION = re.compile(r"^(-?\d+)/(\d+)$")
+_CHOICE_NUMBER = re.compile(r"(\d+)\s*번")
+_THOUSANDS = re.compile(r"^-?\d{1,3}(,\d{3})+(\.\d+)?$")
+
+
+def answer_key_from_problem(problem: Dict[str, Any]) -> Union[AnswerKey, None]:
+    """
+    problems 아이템에서 AnswerKey 를 만듭니다. 정답 정보가 없으면 None 입니다.
+    """
+    answers = problem.get("Answer")
+    problem_type = problem.get("Type")
+    if answers in (None, "", []) or not problem_type:
+        return None
+    if not isinstance(answers, (list, tuple)):
+        answers = [answers]
+    return AnswerKey(problem_type=str(problem_type), answers=list(answers), choices=list(problem.get("Choices") or []))
+
+
+def extract_final_answer(text: str) -> Union[str, None]:
+    """
+    풀이 텍스트에서 최종 답 부분을 찾습니다.
+    "답: 3", "∴ x = 3" 같은 표시를 먼저 찾고, 없으면 마지막 줄의 마지막 "=" 오른쪽을 사용합니다.
+
+    Returns:
+        최종 답 문자열, 찾지 못하면 None
+    """
+    lines = [line.strip() for line in text.strip().splitlines() if line.strip()]
+    if not lines:
+        return None
+
+    for line in reversed(lines[-3:]):
+        match = _MARKER.search(line)
+        if match:
+            answer = match.group(1)
+            # "따라서 답은 3" -> "3"
+            while _MARKER.search(answer):
+                answer = _MARKER.search(answer).group(1)
+            # "답: x = 3" -> "3"
+            return answer.rsplit("=", 1)[-1].strip() or None
+
+    last = lines[-1]
+    if "=" in last:
+        return last.rsplit("=", 1)[-1].strip() or None
+    if len(last) <= 12:
+        return last
+    return None
+
+
+def _clean(value: str) -> str:
+    value = _TRAILING_WORDS.sub("", value)
+    for token in ("$", "\\(", "\\)", "\\left", "\\right", " "):
+        value = value.replace(token, "")
+    if _THOUSANDS.match(value):
+        value = value.replace(",", "")
+    return value.rstrip(".")
+
+
+def to_number(value: Any) -> Union[Fraction, None]:
+    """
+    정수, 소수, a/b, \\frac{a}{b} 를 Fraction 으로 바꿉니다. 그 외는 None 입니다.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return Fraction(str(value))
+    if not isinstance(value, str):
+        # DynamoDB numbers arrive as Decimal
+        try:
+            return Fraction(value)
+        except (TypeError, ValueError):
+            return None
+
+    value = _clean(value)
+    if _PLAIN_NUMBER.match(value):
+        return Fraction(value)
+    match = _PLAIN_FRACTION.match(value)
+    if match and int(match.group(2)):
+        return Fraction(int(match.group(1)), int(match.group(2)))
+    match = _LATEX_FRACTION.match(value)
+    if match and int(match.group(3)):
+        number = Fraction(int(match.group(2)), int(match.group(3)))
+        return -number if match.group(1) else number
+    return None
+
+
+def _choice_numbers(value: str) -> Set[int]:
+    numbers = {_CIRCLED[char] for char in value if char in _CIRCLED}
+    numbers.update(int(number) for number in _CHOICE_NUMBER.findall(value))
+    return numbers
+
+
+def _match_subjective(final: str, key: AnswerKey) -> bool:
+    student = to_number(final)
+    for expected in key.answers:
+        expected_number = to_number(expected)
+        if student is not None and expected_number is not None:
+            if student == expected_number:
+                return True
+        elif _clean(final) == _clean(str(expected)):
+            return True
+    return False
+
+
+def _expected_choices(key: AnswerKey) -> Union[Set[int], None]:
+    # Answers that are not choice indexes ("③", None) can't be compared locally
+    try:
+        return {int(index) - ANSWER_CHOICE_INDEX_BASE + 1 for index in key.answers}
+    except (TypeError, ValueError):
+        return None
+
+
+def _choices_by_value(final: str, key: AnswerKey) -> Set[int]:
+    # The student may write the value of the choice instead of its number
+    parts = [part for part in re.split(r"[,\s]+|와|과|및", final) if part]
+    numbers = set()
+    for part in parts:
+        value = to_number(part)
+        for number, choice in enumerate(key.choices, start=1):
+            choice_value = to_number(str(choice))
+            if value is not None and choice_value is not None and value == choice_value:
+                numbers.add(number)
+            elif _clean(part) == _clean(str(choice)):
+                numbers.add(number)
+    return numbers
+
+
+def _match_choices(final: str, key: AnswerKey) -> bool:
+    expected = _expected_choices(key)
+    if not expected:
+        return False
+    # Plain numbers are ambiguous (value or choice number), only explicit choice markers count as numbers
+    chosen = _choice_numbers(final) or _choices_by_value(final, key)
+    return bool(chosen) and chosen == expected
+
+
+def match_answer(text: str, key: Union[AnswerKey, None]) -> bool:
+    """
+    풀이 텍스트의 최종 답이 문제의 정답과 일치하는지 로컬에서 확인합니다.
+    True 일 때만 확실한 정답이며, False 는 "판단 불가" 로 LLM 분류에 맡깁니다.
+
+    Args:
+        text: 학생 풀이 텍스트
+        key: 문제의 정답 정보
+
+    Returns:
+        bool
+    """
+    if key is None:
+        return False
+    final = extract_final_answer(text)
+    if not final:
+        return False
+
+    if key.problem_type == SUBJECTIVE:
+        return _match_subjective(final, key)
+    if key.problem_type in (SELECT, MULTI):
+        return _match_choices(final, key)
+    return False
@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+from dataclasses import asdict
+from typing import List, Tuple, Union
+from dotenv import load_dotenv
+from src.model.utils_model import ChatSession
+from src.utils.shared_cache import CacheBackend, create_cache_backend
+from src.utils.token_count import count_tokens
+
+load_dotenv()
+
+# 작업 워커의 forget_context 가 웹 프로세스의 세션에 닿아야 하므로 기본값은 프로세스 간에 공유되는 "sqlite" 입니다.
+# "memory" 는 웹 워커 하나가 작업 워커까지 함께 실행할 때만 사용할 수 있습니다. (그 외 "package.module:ClassName")
+CHAT_SESSION_BACKEND = os.getenv("CHAT_SESSION_BACKEND", "sqlite")
+CHAT_SESSION_PATH = os.getenv("CHAT_SESSION_PATH", "chat_sessions.sqlite3")
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", str(30 * 60)))
+CHAT_SESSION_MAX_ITEMS = int(os.getenv("CHAT_SESSION_MAX_ITEMS", "4096"))
+# 요약 + 최근 대화가 이 토큰 수를 넘으면 오래된 대화를 요약으로 압축합니다.
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+# 압축 후에도 원문으로 남겨 둘 최근 대화 수 (질문 + 답변 = 2)
+CHAT_HISTORY_KEEP_MESSAGES = int(os.getenv("CHAT_HISTORY_KEEP_MESSAGES", "4"))
+
+STUDENT = "student"
+TEACHER = "teacher"
+# 클라이언트가 보낸 이전 대화처럼 누가 말했는지 모르는 내용
+CONTEXT = "context"
+_ROLE_LABELS = {STUDENT: "학생", TEACHER: "선생님", CONTEXT: "이전 대화"}
+
+
+def render_messages(messages: List[dict]) -> str:
+    """
+    대화 목록을 "학생: ... / 선생님: ..." 형식의 텍스트로 만듭니다.
+    """
+    return "\n".join(f"{_ROLE_LABELS.get(message['role'], message['role'])}: {message['text']}" for message in messages)
+
+
+def render_history(session: ChatSession) -> str:
+    """
+    프롬프트에 넣을 이전 대화 (요약 + 최근 대화) 를 만듭니다. 대화가 없으면 "없음" 입니다.
+    """
+    parts = []
+    if session.summary:
+        parts.append(f"이전 대화 요약: {session.summary}")
+    if session.history:
+        parts.append(render_messages(session.history))
+    return "\n".join(parts) or "없음"
+
+
+def history_tokens(session: ChatSession) -> int:
+    """
+    요약과 최근 대화의 토큰 수를 셉니다.
+    """
+    return count_tokens(session.summary) + count_tokens(render_messages(session.history))
+
+
+def split_for_compaction(
+        session: ChatSession,
+        budget: int = CHAT_HISTORY_TOKEN_BUDGET,
+        keep: int = CHAT_HISTORY_KEEP_MESSAGES,
+) -> Tuple[List[dict], List[dict]]:
+    """
+    예산을 넘었으면 요약할 오래된 대화와 남길 최근 대화로 나눕니다.
+
+    Returns:
+        (요약할 대화, 남길 대화), 압축이 필요 없으면 ([], history)
+    """
+    if len(session.history) <= keep or history_tokens(session) <= budget:
+        return [], session.history
+    return session.history[:-keep], session.history[-keep:]
+
+
+class ChatSessionStore:
+    """
+    채팅 세션 저장소
+
+    세션은 JSON 으로 CacheBackend 에 저장되며 마지막 대화 이후 CHAT_SESSION_TTL 동안 유지됩니다.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = CHAT_SESSION_TTL):
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(assignment_uuid: str, problem_id: str, sub: str) -> str:
+        return f"chat_session:{assignment_uuid}:{problem_id}:{sub}"
+
+    def get(self, assignment_uuid: str, problem_id: str, sub: str) -> Union[ChatSession, None]:
+        """
+        세션을 조회합니다. 없거나 만료되었으면 None 입니다.
+        """
+        cached = self.backend.get(self._key(assignment_uuid, problem_id, sub))
+        return ChatSession(**json.loads(cached)) if cached else None
+
+    def save(self, assignment_uuid: str, problem_id: str, sub: str, session: ChatSession) -> None:
+        """
+        세션을 저장하고 TTL 을 갱신합니다.
+        """
+        value = json.dumps(asdict(session), ensure_ascii=False, default=str)
+        self.backend.set(self._key(assignment_uuid, problem_id, sub), value, self.ttl)
+
+    def forget_context(self, assignment_uuid: str, problem_id: str, sub: str) -> None:
+        """
+        제출물이 바뀌었을 때 호출합니다. 대화는 남기고 문제 / 제출물만 다음 요청에서 다시 조회하게 합니다.
+        """
+        session = self.get(assignment_uuid, problem_id, sub)
+        if session is None:
+            return
+        session.problem = None
+        session.submission = None
+        self.save(assignment_uuid, problem_id, sub, session)
+
+
+def require_shared_sessions(backend: str = CHAT_SESSION_BACKEND) -> None:
+    """
+    작업 워커가 웹 프로세스 밖에서 실행될 때 호출합니다.
+    "memory" 세션은 다른 프로세스의 forget_context 를 볼 수 없어 바뀐 제출물로 계속 답하게 되므로 시작을 막습니다.
+
+    Raises:
+        RuntimeError: backend 가 "memory" 일 때
+    """
+    if backend == "memory":
+        raise RuntimeError(
+            "CHAT_SESSION_BACKEND=memory can't be shared with out-of-process job workers, "
+            "use sqlite or a shared backend"
+        )
+
+
+_store: Union[ChatSessionStore, None] = None
+_store_lock = threading.Lock()
+
+
+def get_chat_session_store() -> ChatSessionStore:
+    """
+    프로세스 전역 채팅 세션 저장소를 반환합니다.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ChatSessionStore(create_cache_backend(CHAT_SESSION_BACKEND, CHAT_SESSION_PATH, CHAT_SESSION_MAX_ITEMS))
+        return _store
@@ -0,0 +1,130 @@
+import os
+import threading
+from typing import Any, Dict, Union
+import boto3
+from botocore.config import Config
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DDB_REGION = os.getenv("DDB_REGION", "ap-northeast-2")
+# ddb_executor 스레드 + 워커 스레드가 커넥션을 기다리지 않도록 executor 크기보다 넉넉하게 잡습니다.
+DDB_MAX_POOL_CONNECTIONS = int(os.getenv("DDB_MAX_POOL_CONNECTIONS", "50"))
+DDB_CONNECT_TIMEOUT = float(os.getenv("DDB_CONNECT_TIMEOUT", "2"))
+DDB_READ_TIMEOUT = float(os.getenv("DDB_READ_TIMEOUT", "10"))
+DDB_MAX_ATTEMPTS = int(os.getenv("DDB_MAX_ATTEMPTS", "5"))
+# "adaptive" 는 스로틀링 응답을 받으면 클라이언트 쪽에서 요청 속도를 줄입니다.
+DDB_RETRY_MODE = os.getenv("DDB_RETRY_MODE", "adaptive")
+
+PROBLEMS = "problems"
+ASSIGNMENT_SUBMITS = "assignment_submits"
+ACADEMIES = "academies"
+LANDING_PAGE = "landing_page"
+
+_lock = threading.Lock()
+_client = None
+_tables: Dict[str, "ThreadLocalTable"] = {}
+# boto3 sessions / resources are not thread-safe, so each thread builds its own (low-level clients are)
+_local = threading.local()
+
+
+def _config() -> Config:
+    return Config(
+        max_pool_connections=DDB_MAX_POOL_CONNECTIONS,
+        connect_timeout=DDB_CONNECT_TIMEOUT,
+        read_timeout=DDB_READ_TIMEOUT,
+        retries={"total_max_attempts": DDB_MAX_ATTEMPTS, "mode": DDB_RETRY_MODE},
+        tcp_keepalive=True,
+    )
+
+
+def get_ddb_resource():
+    """
+    현재 스레드의 DynamoDB resource 를 반환합니다.
+    boto3 의 Session / resource 는 스레드 안전하지 않으므로 스레드마다 하나씩 만들고 재사용합니다.
+    (ddb_executor / 워커 스레드 수만큼만 생성되며, 서비스 모델 로딩도 스레드당 한 번입니다.)
+    """
+    resource = getattr(_local, "resource", None)
+    if resource is None:
+        resource = boto3.session.Session().resource("dynamodb", region_name=DDB_REGION, config=_config())
+        _local.resource = resource
+        _local.tables = {}
+    return resource
+
+
+def get_ddb_client():
+    """
+    프로세스 전역 low-level DynamoDB client 를 반환합니다. client 는 스레드 안전하므로 모든 스레드가 공유합니다.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            _client = boto3.session.Session().client("dynamodb", region_name=DDB_REGION, config=_config())
+        return _client
+
+
+def _thread_table(name: str):
+    resource = get_ddb_resource()
+    table = _local.tables.get(name)
+    if table is None:
+        table = resource.Table(name)
+        _local.tables[name] = table
+    return table
+
+
+class ThreadLocalTable:
+    """
+    테이블 이름만 가지고 있다가, 메서드를 호출하는 스레드의 Table 로 실행하는 핸들
+
+    run_ddb(table.get_item, ...) 처럼 이벤트 루프에서 꺼낸 메서드를 ddb_executor 스레드에서 호출해도
+    실행하는 스레드의 resource 를 사용하므로 resource 가 스레드 간에 공유되지 않습니다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getattr__(self, attr: str):
+        def call(*args, **kwargs):
+            return getattr(_thread_table(self.name), attr)(*args, **kwargs)
+        call.__name__ = attr
+        return call
+
+
+def get_table(name: str) -> ThreadLocalTable:
+    """
+    이름으로 Table 핸들을 반환합니다. 핸들은 스레드 간에 공유해도 되며, 호출 시 현재 스레드의 Table 을 사용합니다.
+    """
+    with _lock:
+        table = _tables.get(name)
+        if table is None:
+            table = ThreadLocalTable(name)
+            _tables[name] = table
+        return table
+
+
+def problems_table():
+    """
+    problems 테이블 (PK: acaId, SK: PROBLEM#{problemId})
+    """
+    return get_table(PROBLEMS)
+
+
+def assignment_submits_table():
+    """
+    assignment_submits 테이블 (PK: ASSIGNMENT#{assignmentUuid}, SK: {sub}#{problemId})
+    """
+    return get_table(ASSIGNMENT_SUBMITS)
+
+
+def academies_table():
+    """
+    academies 테이블
+    """
+    return get_table(ACADEMIES)
+
+
+def landing_page_table():
+    """
+    landing_page 테이블 (PK: subdomain)
+    """
+    return get_table(LANDING_PAGE)
@@ -0,0 +1,29 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DDB_MAX_WORKERS = int(os.getenv("DDB_MAX_WORKERS", "32"))
+
+# boto3 는 동기 클라이언트이므로, 이벤트 루프를 막지 않도록 전용 스레드 풀에서 실행합니다.
+# anyio 기본 스레드 풀(40)과 분리해 DynamoDB 호출 수를 따로 제한합니다.
+_executor = ThreadPoolExecutor(max_workers=DDB_MAX_WORKERS, thread_name_prefix="ddb")
+
+
+async def run_ddb(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    DynamoDB 호출을 bounded executor 에서 실행하고 결과를 기다립니다.
+
+    Args:
+        func: 실행할 boto3 호출 (예: table.get_item)
+        *args, **kwargs: func 에 전달할 인자
+
+    Returns:
+        func 의 반환값
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
@@ -0,0 +1,79 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterator, Sequence, Union
+from src.utils.ddb_executor import run_ddb
+
+
+def _with_projection(params: Dict[str, Any], fields: Union[Sequence[str], None]) -> Dict[str, Any]:
+    """
+    fields 를 ProjectionExpression 으로 추가합니다. 예약어와 겹치지 않도록 placeholder 를 사용합니다.
+    """
+    params = dict(params)
+    if not fields:
+        return params
+
+    names = dict(params.get("ExpressionAttributeNames", {}))
+    placeholders = []
+    for i, field in enumerate(fields):
+        placeholder = f"#p{i}"
+        names[placeholder] = field
+        placeholders.append(placeholder)
+    params["ProjectionExpression"] = ", ".join(placeholders)
+    params["ExpressionAttributeNames"] = names
+    return params
+
+
+def iter_query(table, fields: Union[Sequence[str], None] = None, **kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    query 결과를 LastEvaluatedKey 를 따라가며 한 페이지씩 읽어 아이템 단위로 돌려줍니다.
+    소비하는 만큼만 다음 페이지를 요청합니다.
+
+    Args:
+        table: DynamoDB Table
+        fields: 가져올 필드 (ProjectionExpression), 없으면 전체
+        **kwargs: table.query 인자 (KeyConditionExpression, IndexName 등)
+
+    Returns:
+        아이템 iterator
+    """
+    params = _with_projection(kwargs, fields)
+    while True:
+        page = table.query(**params)
+        yield from page.get("Items", [])
+
+        last_key = page.get("LastEvaluatedKey")
+        if not last_key:
+            return
+        params["ExclusiveStartKey"] = last_key
+
+
+async def aiter_query(table, fields: Union[Sequence[str], None] = None, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+    """
+    iter_query 의 비동기 버전. 현재 페이지를 소비하는 동안 다음 페이지를 미리 요청합니다.
+
+    Args:
+        table: DynamoDB Table
+        fields: 가져올 필드 (ProjectionExpression), 없으면 전체
+        **kwargs: table.query 인자
+
+    Returns:
+        아이템 async iterator
+    """
+    params = _with_projection(kwargs, fields)
+    page = await run_ddb(table.query, **params)
+    next_page = None
+    try:
+        while True:
+            last_key = page.get("LastEvaluatedKey")
+            if last_key:
+                next_page = asyncio.ensure_future(run_ddb(table.query, **{**params, "ExclusiveStartKey": last_key}))
+
+            for item in page.get("Items", []):
+                yield item
+
+            if next_page is None:
+                return
+            page, next_page = await next_page, None
+    finally:
+        # Consumer stopped early, drop the prefetched page
+        if next_page is not None:
+            next_page.cancel()
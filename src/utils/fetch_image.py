@@ -0,0 +1,212 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from io import BytesIO
+from typing import Iterable, Tuple, Union
+import httpx
+import requests
+from dotenv import load_dotenv
+from PIL import Image
+from src.model.utils_model import FetchedImage
+from src.utils.preprocess_image import sniff_image_format
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(5 * 1024 * 1024)))
+IMAGE_FETCH_TIMEOUT = float(os.getenv("IMAGE_FETCH_TIMEOUT", "10"))
+IMAGE_ALLOWED_FORMATS = tuple(os.getenv("IMAGE_ALLOWED_FORMATS", "JPEG,PNG").split(","))
+# 웹 프로세스가 검증한 이미지를 워커에게 넘기는 임시 디렉터리 (웹과 워커가 같은 호스트일 때)
+IMAGE_SPOOL_DIR = os.getenv("IMAGE_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "myaca-images"))
+IMAGE_SPOOL_TTL = float(os.getenv("IMAGE_SPOOL_TTL", str(24 * 3600)))
+
+_SNIFF_BYTES = 12
+
+
+class ImageFetchError(Exception):
+    """
+    이미지 링크가 유효하지 않을 때 발생하는 예외
+    """
+
+
+_async_client: Union[httpx.AsyncClient, None] = None
+_lock = threading.Lock()
+_session = requests.Session()
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    with _lock:
+        if _async_client is None:
+            _async_client = httpx.AsyncClient(timeout=IMAGE_FETCH_TIMEOUT, follow_redirects=True)
+        return _async_client
+
+
+def _check_headers(headers, max_bytes: int) -> None:
+    content_type = headers.get("Content-Type", "").lower()
+    if not content_type.startswith("image/"):
+        raise ImageFetchError(f"unexpected content type: {content_type or 'none'}")
+
+    # Content-Length 는 있으면 미리 거르고, 없어도 본문을 읽으면서 상한을 지킵니다.
+    content_length = headers.get("Content-Length")
+    if not content_length:
+        return
+    try:
+        length = int(content_length)
+    except ValueError:
+        raise ImageFetchError(f"invalid content length: {content_length}")
+    if length > max_bytes:
+        raise ImageFetchError(f"image too large: {content_length} bytes")
+
+
+def _append_chunk(buffer: bytearray, chunk: bytes, max_bytes: int) -> None:
+    buffer.extend(chunk)
+    if len(buffer) > max_bytes:
+        raise ImageFetchError(f"image exceeds {max_bytes} bytes")
+
+
+def _finish(buffer: bytearray, headers, allowed_formats: Tuple[str, ...]) -> FetchedImage:
+    data = bytes(buffer)
+    image_format = sniff_image_format(data[:_SNIFF_BYTES])
+    if image_format not in allowed_formats:
+        raise ImageFetchError(f"unsupported image format: {image_format}")
+
+    # Magic bytes can lie about a truncated or corrupt body
+    try:
+        Image.open(BytesIO(data)).verify()
+    except Exception as e:
+        raise ImageFetchError(f"corrupt image: {e}")
+
+    return FetchedImage(
+        data=data,
+        image_format=image_format,
+        etag=headers.get("ETag"),
+        last_modified=headers.get("Last-Modified"),
+    )
+
+
+async def fetch_image(
+        url: str,
+        max_bytes: int = IMAGE_MAX_BYTES,
+        allowed_formats: Tuple[str, ...] = IMAGE_ALLOWED_FORMATS,
+) -> FetchedImage:
+    """
+    이미지 링크를 한 번만 내려받으면서 검증합니다.
+    본문은 max_bytes 를 넘는 순간 중단하고, 형식은 Content-Type 이 아닌 매직 바이트로 판별합니다.
+
+    Args:
+        url: 이미지 링크
+        max_bytes: 최대 이미지 크기
+        allowed_formats: 허용하는 이미지 형식
+
+    Returns:
+        FetchedImage
+
+    Raises:
+        ImageFetchError: 요청 실패, 크기 초과, 지원하지 않는 형식일 때
+    """
+    buffer = bytearray()
+    try:
+        async with _get_async_client().stream("GET", url) as response:
+            response.raise_for_status()
+            _check_headers(response.headers, max_bytes)
+            async for chunk in response.aiter_bytes():
+                _append_chunk(buffer, chunk, max_bytes)
+            headers = response.headers
+    except httpx.HTTPError as e:
+        raise ImageFetchError(f"failed to fetch image: {e}")
+
+    return _finish(buffer, headers, allowed_formats)
+
+
+def fetch_image_sync(
+        url: str,
+        max_bytes: int = IMAGE_MAX_BYTES,
+        allowed_formats: Tuple[str, ...] = IMAGE_ALLOWED_FORMATS,
+        headers: dict = None,
+) -> Union[FetchedImage, None]:
+    """
+    fetch_image 의 동기 버전 (워커 스레드용). 조건부 요청 헤더를 받을 수 있으며,
+    304 Not Modified 이면 None 을 반환합니다.
+
+    Raises:
+        ImageFetchError: 요청 실패, 크기 초과, 지원하지 않는 형식일 때
+    """
+    buffer = bytearray()
+    try:
+        with _session.get(url, headers=headers or {}, timeout=IMAGE_FETCH_TIMEOUT, stream=True) as response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            _check_headers(response.headers, max_bytes)
+            chunks: Iterable[bytes] = response.iter_content(chunk_size=64 * 1024)
+            for chunk in chunks:
+                _append_chunk(buffer, chunk, max_bytes)
+            response_headers = response.headers
+    except requests.RequestException as e:
+        raise ImageFetchError(f"failed to fetch image: {e}")
+
+    return _finish(buffer, response_headers, allowed_formats)
+
+
+def _sweep_spool(now: float) -> None:
+    for name in os.listdir(IMAGE_SPOOL_DIR):
+        path = os.path.join(IMAGE_SPOOL_DIR, name)
+        try:
+            if now - os.path.getmtime(path) > IMAGE_SPOOL_TTL:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def spool_image(image: FetchedImage) -> str:
+    """
+    검증한 이미지를 워커가 다시 내려받지 않도록 임시 파일로 저장합니다.
+    TTL 이 지난 (처리되지 못한) 파일은 이때 함께 정리합니다.
+
+    Args:
+        image: fetch_image 결과
+
+    Returns:
+        str: 저장된 파일 경로
+    """
+    os.makedirs(IMAGE_SPOOL_DIR, exist_ok=True)
+    _sweep_spool(time.time())
+
+    path = os.path.join(IMAGE_SPOOL_DIR, f"{uuid.uuid4().hex}.{image.image_format.lower()}")
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(image.data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_spooled_image(path: Union[str, None]) -> Union[bytes, None]:
+    """
+    spool_image 로 저장한 이미지를 읽습니다. 스풀 디렉터리 밖의 경로나 없는 파일은 None 입니다.
+    """
+    if not path:
+        return None
+    if os.path.dirname(os.path.abspath(path)) != os.path.abspath(IMAGE_SPOOL_DIR):
+        logger.warning(f"ignoring image path outside spool dir: {path}")
+        return None
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def remove_spooled_image(path: Union[str, None]) -> None:
+    """
+    처리가 끝난 스풀 파일을 지웁니다.
+    """
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except OSError:
+        pass
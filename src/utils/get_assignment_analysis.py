@@ -1,47 +1,45 @@
+import asyncio
 from collections import defaultdict
 
-import boto3
 from typing import Dict
+from boto3.dynamodb.conditions import Key
 from src.model.response_model import BaseResponse, SuccessResponse, InternalServerErrorResponse
+from src.utils.ddb import assignment_submits_table, academies_table
+from src.utils.ddb_query import aiter_query
 
 
-def get_assignment_analysis(course_id: str, assignment_id: str) -> BaseResponse:
+async def get_assignment_analysis(course_id: str, assignment_id: str) -> BaseResponse:
+    key_condition = Key("PK").eq(f"ASSIGNMENT#{assignment_id}")
 
-    ddb = boto3.resource('dynamodb', region_name="ap-northeast-2")
+    async def count_reasons():
+        reasons = defaultdict(int)
+        res_count = 0
+        async for assignment in aiter_query(assignment_submits_table(), fields=("Reason",), KeyConditionExpression=key_condition):
+            reason = assignment.get("Reason")
+            if reason :
+                reasons[reason] += 1
+                res_count += 1
+        return reasons, res_count
 
-    from boto3.dynamodb.conditions import Key
-    assignments = ddb.Table("assignment_submits").query(
-        KeyConditionExpression=Key("PK").eq(f"ASSIGNMENT#{assignment_id}")
-    ).get('Items', [])
+    async def sum_scores():
+        counts = defaultdict(int)
+        total_score = 0
+        score_sum = 0
+        ass_num = 0
+        async for submit in aiter_query(academies_table(), fields=("Problems", "Score", "Count"), KeyConditionExpression=key_condition):
+            ass_num += 1
+            total_score = len(submit.get("Problems"))
+            score_sum += submit.get("Score")
+            count = submit.get("Count", 0)
+            for key, value in count.items() :
+                if key : counts[key] += 1
+        return counts, total_score, score_sum, ass_num
 
-    assignment_submits = ddb.Table("academies").query(
-        KeyConditionExpression=Key("PK").eq(f"ASSIGNMENT#{assignment_id}")
-    ).get("Items", [])
-
-    print(assignments)
-
-    counts = defaultdict(int)
-    total_score = 0
-    score_sum = 0
-    ass_num = 0
-    res_count = 0
-    reasons = defaultdict(int)
-
-    for submit in assignment_submits:
-        ass_num += 1
-        total_score = len(submit.get("Problems"))
-        score_sum += submit.get("Score")
-        count = submit.get("Count", 0)
-        for key, value in count.items() :
-            if key : counts[key] += 1
-
-    for assignment in assignments:
-        reason = assignment.get("Reason")
-        print(reason)
-        if reason :
-            print(reason)
-            reasons[reason] += 1
-            res_count += 1
+    # Both partitions are aggregated page by page, nothing is materialised
+    (reasons, res_count), (counts, total_score, score_sum, ass_num) = await asyncio.gather(
+        count_reasons(),
+        sum_scores(),
+    )
 
     if res_count == 0 :
         return InternalServerErrorResponse(
@@ -1,75 +1,167 @@
-from openai import OpenAI
+import logging
 from dotenv import load_dotenv
 from openai.types.chat import ChatCompletionContentPartTextParam, ChatCompletionContentPartImageParam, ChatCompletionUserMessageParam
 import src.utils.encode_image as encoder
+from src.utils.llm_client import get_openai_client
+from src.utils.prompt_registry import get_prompt, prompt_version
+from src.utils.llm_usage import record_usage
+from src.utils.llm_governor import estimate_call_tokens, get_llm_governor
+from src.utils.ocr_cache import OCRCache, UrlValidator, content_key, get_ocr_cache
+from src.utils.preprocess_image import preprocess_image, PREPROCESS_VERSION
+from src.utils.fetch_image import fetch_image_sync
+from src.utils.model_routing import get_route
+from src.utils.stage_executor import raise_if_cancelled
+from src.model.utils_model import ModelRoute
+from typing import Tuple, Union
 import os
+import threading
+
+logger = logging.getLogger(__name__)
 
 # load_env
 load_dotenv()
 
 # Prompt
-image2text_prompt = """
-아래 이미지에서 모든 텍스트를 추출해 주세요.
-
-추출 시 유의사항:
-
-텍스트의 행(줄): 텍스트가 여러 줄로 되어 있다면, 각 줄의 순서를 정확하게 지켜서 추출해 주세요.
-
-필기 방향: 필기체의 기울기나 사선 방향에 관계없이 텍스트를 올바른 순서로 읽어주세요. 글자가 겹치거나 왜곡되어 있더라도 내용을 정확히 파악해야 합니다.
+image2text_prompt = get_prompt("image2text").spec.template
 
-오류 최소화: 오타나 잘못 읽은 부분이 없도록 최대한 정확하게 텍스트를 변환해 주세요.
 
-수학 수식 정형: 수학 풀이의 경우, 수식을 Latex문법으로 처리한 후, 숫자와 텍스트로 변환해 주세요.
-"""
-
-# Initialize Client
-client = OpenAI(
-    api_key=os.getenv("OPENAI_API_KEY")
-)
+def _load_image_from_url(image_url: str, cache: Union[OCRCache, None], version: str) -> Tuple[Union[bytes, None], Union[str, None]]:
+    """
+    URL 에서 이미지를 받아옵니다. 이전에 받은 ETag / Last-Modified 가 있으면 조건부 요청을 보내고,
+    304 Not Modified 이면 다운로드 없이 캐시된 OCR 결과를 돌려줍니다.
 
-def image2text(image_url: str) -> str:
+    Returns:
+        (이미지 바이트, None) 또는 (None, 캐시된 텍스트)
+    """
+    validator = cache.get_url(image_url) if cache else None
+    headers = {}
+    if validator and validator.etag:
+        headers["If-None-Match"] = validator.etag
+    if validator and validator.last_modified:
+        headers["If-Modified-Since"] = validator.last_modified
+
+    fetched = fetch_image_sync(image_url, headers=headers)
+    if fetched is None:
+        cached_text = cache.get(validator.content_key) if validator else None
+        if cached_text is not None:
+            return None, cached_text
+        fetched = fetch_image_sync(image_url)
+
+    if cache:
+        cache.set_url(image_url, UrlValidator(
+            etag=fetched.etag,
+            last_modified=fetched.last_modified,
+            content_key=content_key(fetched.data, version),
+        ))
+    return fetched.data, None
+
+
+def _create(model: str, messages: list, max_tokens: int, options: dict, tokens: int):
+    # Each attempt waits for its own turn, so fallback calls are charged to the governor too
+    governor = get_llm_governor()
+    permit = governor.acquire(tokens) if governor else None
+    response = None
+    try:
+        client = get_openai_client().with_options(**options)
+        response = client.chat.completions.create(model=model, messages=messages, max_tokens=max_tokens)
+        return response
+    finally:
+        if permit is not None:
+            usage = response.usage if response is not None else None
+            governor.settle(permit, usage.total_tokens if usage else None)
+
+
+def _complete(route: ModelRoute, messages: list, tokens: int):
+    # Primary model first, then each fallback when it errors or runs past route.timeout
+    models = (route.model,) + tuple(route.fallbacks)
+    for i, model in enumerate(models):
+        last = i == len(models) - 1
+        options = {} if last else {"max_retries": 0}
+        if route.timeout is not None:
+            options["timeout"] = route.timeout
+        try:
+            return _create(model, messages, route.max_tokens, options, tokens)
+        except Exception as e:
+            if last:
+                raise
+            logger.warning(f"ocr with {model} failed, falling back to {models[i + 1]}: {e}")
+
+
+def image2text(image_url: str, image_bytes: bytes = None, cancelled: threading.Event = None) -> str:
     """
     이미지 파일 경로를 입력받아 OpenAI GPT-4o 모델을 사용하여 텍스트를 추출합니다.
 
     Args:
         image_url (str): 추출할 텍스트가 포함된 이미지 파일의 경로.
+        image_bytes (bytes): 이미 내려받아 검증한 이미지 바이트. 있으면 다시 내려받지 않습니다.
+        cancelled (threading.Event): 파이프라인 취소 신호. 세워지면 OCR 호출 전에 StageCancelled 를 던집니다.
 
     Returns:
         str: 이미지에서 추출된 텍스트.
+
+    Raises:
+        이미지 다운로드 / OCR 호출 실패 (일시적일 수 있으므로 그대로 던져 호출 측이 재시도하게 합니다)
     """
 
-    try:
-        if image_url.startswith(("http://", "https://")) :
-            base64_image = encoder.encode_image_from_url(image_url)
-        else :
-            if not os.path.exists(image_url):
-                return "invalid file path"
-            base64_image = encoder.encode_image(image_url)
-
-        messages = [
-            ChatCompletionUserMessageParam(
-                role="user",
-                content=[
-                    ChatCompletionContentPartTextParam(type="text", text=image2text_prompt),
-                    ChatCompletionContentPartImageParam(
-                        type="image_url",
-                        image_url={
-                            # Base64 데이터 앞에 올바른 프리픽스 추가
-                            "url": f"data:image/jpeg;base64,{base64_image}"
-                        }
-                    )
-                ]
-            )
-        ]
-
-        # API response
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            max_tokens=300,
+    cache = get_ocr_cache()
+    route = get_route("ocr")
+    version = f"{prompt_version('image2text')}/{route.model}/{PREPROCESS_VERSION}"
+
+    if image_bytes is not None :
+        # Already fetched and validated upstream
+        pass
+    elif image_url.startswith(("http://", "https://")) :
+        image_bytes, cached_text = _load_image_from_url(image_url, cache, version)
+        if cached_text is not None:
+            return cached_text
+    else :
+        if not os.path.exists(image_url):
+            return "invalid file path"
+        with open(image_url, "rb") as image_file:
+            image_bytes = image_file.read()
+
+    # Same image content and prompt version -> reuse the previous OCR result
+    key = content_key(image_bytes, version)
+    cached_text = cache.get(key) if cache else None
+    if cached_text is not None:
+        return cached_text
+
+    # Shrink the payload before base64: orientation, downscale, re-encode
+    prepared = preprocess_image(image_bytes)
+    base64_image = encoder.encode_image_bytes(prepared.data)
+
+    messages = [
+        ChatCompletionUserMessageParam(
+            role="user",
+            content=[
+                ChatCompletionContentPartTextParam(type="text", text=image2text_prompt),
+                ChatCompletionContentPartImageParam(
+                    type="image_url",
+                    image_url={
+                        # Base64 데이터 앞에 올바른 프리픽스 추가
+                        "url": f"data:{prepared.mime_type};base64,{base64_image}",
+                        "detail": prepared.detail,
+                    }
+                )
+            ]
+        )
+    ]
+
+    # API response, each attempt after waiting for this lane's turn in the governor
+    raise_if_cancelled(cancelled)
+    response = _complete(route, messages, estimate_call_tokens(image2text_prompt, route.max_tokens, images=1))
+
+    usage = response.usage
+    if usage is not None:
+        details = usage.prompt_tokens_details
+        record_usage(
+            prompt_version("image2text"),
+            usage.prompt_tokens,
+            (details.cached_tokens if details else 0) or 0,
+            usage.completion_tokens,
         )
 
-        return response.choices[0].message.content
-
-    except Exception as e:
-        return f"error occurred while extracting text: {e}"
\ No newline at end of file
+    text = response.choices[0].message.content
+    if cache and text:
+        cache.set(key, text)
+    return text
@@ -0,0 +1,372 @@
+import importlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Union
+from dotenv import load_dotenv
+from src.model.job_model import Job, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "sqlite")
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_VISIBILITY_TIMEOUT = float(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))
+JOB_RETRY_BASE_DELAY = float(os.getenv("JOB_RETRY_BASE_DELAY", "5"))
+JOB_RETRY_MAX_DELAY = float(os.getenv("JOB_RETRY_MAX_DELAY", "300"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+
+# 워커가 실행 중인 작업 (핸들러가 마지막 시도인지 확인할 때 사용)
+_current_job: ContextVar[Union[Job, None]] = ContextVar("current_job", default=None)
+
+
+class PermanentJobError(Exception):
+    """
+    다시 시도해도 결과가 같은 실패 (반려된 제출물 등), 작업 큐는 재시도하지 않고 바로 failed 로 기록합니다.
+    """
+
+
+def is_final_attempt() -> bool:
+    """
+    실행 중인 작업이 실패하면 더 이상 재시도되지 않는지 여부를 반환합니다. 워커 밖에서 호출하면 True 입니다.
+    """
+    job = _current_job.get()
+    return job is None or job.attempts >= job.max_attempts
+
+
+def retry_delay(attempts: int, base_delay: float = JOB_RETRY_BASE_DELAY, max_delay: float = JOB_RETRY_MAX_DELAY) -> float:
+    """
+    시도 횟수에 따른 지수 백오프 지연 시간을 계산합니다.
+
+    Args:
+        attempts: 지금까지의 시도 횟수 (1부터 시작)
+        base_delay: 첫 재시도 지연 시간 (초)
+        max_delay: 최대 지연 시간 (초)
+
+    Returns:
+        float: 다음 시도까지 기다릴 시간 (초)
+    """
+    return min(max_delay, base_delay * (2 ** max(attempts - 1, 0)))
+
+
+class JobQueue(ABC):
+    """
+    작업 큐 인터페이스
+
+    구현체는 enqueue / dequeue / complete / fail / get 을 제공해야 하며,
+    dequeue 된 작업은 visibility timeout 동안 다른 워커에게 보이지 않아야 합니다.
+    complete / fail 에 attempts 를 넘기면 그 시도의 lease 를 아직 가지고 있을 때만 기록해야 합니다.
+    (visibility timeout 이 지나 재전달된 작업을 늦게 끝난 이전 시도가 덮어쓰지 않도록)
+    """
+
+    @abstractmethod
+    def enqueue(self, task: str, payload: Dict[str, Any], max_attempts: int = JOB_MAX_ATTEMPTS) -> Job:
+        ...
+
+    @abstractmethod
+    def dequeue(self, visibility_timeout: float = JOB_VISIBILITY_TIMEOUT) -> Union[Job, None]:
+        ...
+
+    @abstractmethod
+    def complete(self, job_id: str, result: Union[Dict[str, Any], None] = None, attempts: Union[int, None] = None) -> bool:
+        ...
+
+    @abstractmethod
+    def fail(self, job_id: str, error: str, attempts: Union[int, None] = None, retry: bool = True) -> Union[Job, None]:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Union[Job, None]:
+        ...
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    SQLite 기반 작업 큐
+
+    프로세스 재시작 후에도 작업이 유지되며, 여러 프로세스의 워커가 같은 파일을 공유할 수 있습니다.
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    task TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    available_at REAL NOT NULL,
+                    locked_until REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"],
+            task=row["task"],
+            payload=json.loads(row["payload"]),
+            status=row["status"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            available_at=row["available_at"],
+            locked_until=row["locked_until"],
+        )
+
+    def enqueue(self, task: str, payload: Dict[str, Any], max_attempts: int = JOB_MAX_ATTEMPTS) -> Job:
+        now = time.time()
+        job = Job(
+            id=uuid.uuid4().hex,
+            task=task,
+            payload=payload,
+            max_attempts=max_attempts,
+            created_at=now,
+            updated_at=now,
+            available_at=now,
+        )
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, task, payload, status, attempts, max_attempts, created_at, updated_at, available_at) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)",
+                (job.id, task, json.dumps(payload, ensure_ascii=False), JOB_QUEUED, max_attempts, now, now, now),
+            )
+        return job
+
+    def dequeue(self, visibility_timeout: float = JOB_VISIBILITY_TIMEOUT) -> Union[Job, None]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Running jobs whose lease expired on their last attempt are given up
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+                "WHERE status = ? AND locked_until <= ? AND attempts >= max_attempts",
+                (JOB_FAILED, "visibility timeout exceeded", now, JOB_RUNNING, now),
+            )
+
+            row = conn.execute(
+                "SELECT * FROM jobs "
+                "WHERE (status = ? AND available_at <= ?) OR (status = ? AND locked_until <= ?) "
+                "ORDER BY available_at LIMIT 1",
+                (JOB_QUEUED, now, JOB_RUNNING, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, locked_until = ?, updated_at = ? WHERE id = ?",
+                (JOB_RUNNING, now + visibility_timeout, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        job = self._to_job(row)
+        job.status = JOB_RUNNING
+        job.attempts += 1
+        job.locked_until = now + visibility_timeout
+        job.updated_at = now
+        return job
+
+    @staticmethod
+    def _lease(job_id: str, attempts: Union[int, None]) -> tuple:
+        # Without attempts any running lease matches (callers outside WorkerPool)
+        if attempts is None:
+            return "id = ? AND status = ?", (job_id, JOB_RUNNING)
+        return "id = ? AND status = ? AND attempts = ?", (job_id, JOB_RUNNING, attempts)
+
+    def complete(self, job_id: str, result: Union[Dict[str, Any], None] = None, attempts: Union[int, None] = None) -> bool:
+        """
+        작업을 succeeded 로 기록합니다. lease 를 잃었으면 (재전달 / 이미 종료) 기록하지 않고 False 를 반환합니다.
+        """
+        where, params = self._lease(job_id, attempts)
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET status = ?, result = ?, error = NULL, locked_until = 0, updated_at = ? WHERE {where}",
+                (JOB_SUCCEEDED, json.dumps(result, ensure_ascii=False) if result is not None else None, time.time()) + params,
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, error: str, attempts: Union[int, None] = None, retry: bool = True) -> Union[Job, None]:
+        """
+        실패를 기록합니다. 시도 횟수가 남았고 retry 이면 백오프 후 다시 queued, 아니면 failed 입니다.
+        lease 를 잃었으면 기록하지 않고 None 을 반환합니다.
+        """
+        where, params = self._lease(job_id, attempts)
+        now = time.time()
+        conn = self._connect()
+        try:
+            # Read and update in one write transaction so a concurrent re-dequeue cannot change attempts in between
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(f"SELECT * FROM jobs WHERE {where}", params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            job = self._to_job(row)
+            if not retry or job.attempts >= job.max_attempts:
+                job.status = JOB_FAILED
+                job.available_at = now
+            else:
+                job.status = JOB_QUEUED
+                job.available_at = now + retry_delay(job.attempts)
+            job.error = error
+            job.locked_until = 0
+            job.updated_at = now
+
+            conn.execute(
+                f"UPDATE jobs SET status = ?, error = ?, available_at = ?, locked_until = 0, updated_at = ? WHERE {where}",
+                (job.status, error, job.available_at, now) + params,
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return job
+
+    def get(self, job_id: str) -> Union[Job, None]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+
+class WorkerPool:
+    """
+    작업 큐를 polling 하며 등록된 핸들러로 작업을 실행하는 스레드 워커 풀
+
+    핸들러가 예외를 던지면 작업은 백오프 후 재시도되고,
+    최대 시도 횟수를 넘기거나 PermanentJobError 이면 failed 로 기록됩니다.
+    결과는 dequeue 한 시도의 lease 를 아직 가지고 있을 때만 기록됩니다.
+    """
+
+    def __init__(
+            self,
+            queue: JobQueue,
+            handlers: Dict[str, Callable[[Dict[str, Any]], Any]],
+            workers: int = JOB_WORKERS,
+            visibility_timeout: float = JOB_VISIBILITY_TIMEOUT,
+            poll_interval: float = JOB_POLL_INTERVAL,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"job worker pool started with {self.workers} workers")
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_once(self) -> bool:
+        """
+        큐에서 작업 하나를 꺼내 실행합니다.
+
+        Returns:
+            bool: 실행한 작업이 있으면 True
+        """
+        job = self.queue.dequeue(self.visibility_timeout)
+        if job is None:
+            return False
+
+        handler = self.handlers.get(job.task)
+        if handler is None:
+            logger.error(f"no handler registered for task {job.task}")
+            self.queue.fail(job.id, f"unknown task {job.task}", job.attempts)
+            return True
+
+        token = _current_job.set(job)
+        try:
+            result = handler(job.payload)
+        except Exception as e:
+            failed = self.queue.fail(job.id, str(e), job.attempts, retry=not isinstance(e, PermanentJobError))
+            logger.error(f"job {job.id} attempt {job.attempts}/{job.max_attempts} failed: {e}")
+            if failed is None:
+                logger.warning(f"job {job.id} attempt {job.attempts} lost its lease, result dropped")
+            elif failed.status == JOB_FAILED:
+                logger.error(f"job {job.id} gave up after {job.attempts} attempts")
+            return True
+        finally:
+            _current_job.reset(token)
+
+        if not self.queue.complete(job.id, result if isinstance(result, dict) else None, job.attempts):
+            logger.warning(f"job {job.id} attempt {job.attempts} lost its lease, result dropped")
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if not self.run_once():
+                    self._stop.wait(self.poll_interval)
+            except Exception as e:
+                logger.error(f"job worker error: {e}")
+                self._stop.wait(self.poll_interval)
+
+
+_queue: Union[JobQueue, None] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """
+    프로세스 전역 작업 큐를 반환합니다.
+
+    JOB_QUEUE_BACKEND 가 "sqlite" 이면 SQLiteJobQueue 를,
+    "package.module:ClassName" 형식이면 해당 JobQueue 구현체를 사용합니다.
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            if JOB_QUEUE_BACKEND == "sqlite":
+                _queue = SQLiteJobQueue(JOB_QUEUE_PATH)
+            else:
+                module_name, class_name = JOB_QUEUE_BACKEND.split(":")
+                _queue = getattr(importlib.import_module(module_name), class_name)()
+        return _queue
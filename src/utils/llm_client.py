@@ -0,0 +1,200 @@
+import importlib.util
+import os
+import threading
+from typing import Any, Dict, Tuple, Union
+import httpx
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+from openai import OpenAI, AsyncOpenAI
+
+load_dotenv()
+
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "120"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "120"))
+
+# HTTP/2 는 h2 패키지가 설치되어 있을 때만 사용합니다. (pip install httpx[http2])
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "auto")
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None if LLM_HTTP2 == "auto" else LLM_HTTP2 == "true"
+
+_lock = threading.Lock()
+_http_client: Union[httpx.Client, None] = None
+_http_async_client: Union[httpx.AsyncClient, None] = None
+_openai_client: Union[OpenAI, None] = None
+_async_openai_client: Union[AsyncOpenAI, None] = None
+_chat_models: Dict[Tuple[Any, ...], ChatOpenAI] = {}
+_metrics = {
+    "requests": 0,
+    "in_flight": 0,
+    "registry_hits": 0,
+    "registry_misses": 0,
+}
+
+
+def _count(key: str, delta: int = 1) -> None:
+    with _lock:
+        _metrics[key] += delta
+
+
+class _MeteredTransport(httpx.HTTPTransport):
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        _count("requests")
+        _count("in_flight")
+        try:
+            return super().handle_request(request)
+        finally:
+            _count("in_flight", -1)
+
+
+class _AsyncMeteredTransport(httpx.AsyncHTTPTransport):
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _count("requests")
+        _count("in_flight")
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            _count("in_flight", -1)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+
+
+def get_http_client() -> httpx.Client:
+    """
+    OpenAI 동기 호출이 공유하는 httpx 커넥션 풀을 반환합니다.
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                transport=_MeteredTransport(limits=_limits(), http2=HTTP2_ENABLED),
+                timeout=_timeout(),
+            )
+        return _http_client
+
+
+def get_http_async_client() -> httpx.AsyncClient:
+    """
+    OpenAI 비동기 호출이 공유하는 httpx 커넥션 풀을 반환합니다.
+    """
+    global _http_async_client
+    with _lock:
+        if _http_async_client is None:
+            _http_async_client = httpx.AsyncClient(
+                transport=_AsyncMeteredTransport(limits=_limits(), http2=HTTP2_ENABLED),
+                timeout=_timeout(),
+            )
+        return _http_async_client
+
+
+def get_openai_client() -> OpenAI:
+    """
+    프로세스 전역 OpenAI 클라이언트를 반환합니다.
+    """
+    global _openai_client
+    http_client = get_http_client()
+    with _lock:
+        if _openai_client is None:
+            _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
+        return _openai_client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    프로세스 전역 AsyncOpenAI 클라이언트를 반환합니다.
+    """
+    global _async_openai_client
+    http_async_client = get_http_async_client()
+    with _lock:
+        if _async_openai_client is None:
+            _async_openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_async_client)
+        return _async_openai_client
+
+
+def get_chat_model(
+        model: str = "gpt-4o",
+        temperature: float = 0.5,
+        role: str = "default",
+        max_tokens: Union[int, None] = None,
+        timeout: Union[float, None] = None,
+        max_retries: Union[int, None] = None,
+) -> ChatOpenAI:
+    """
+    (model, temperature, role, max_tokens, timeout, max_retries) 별로 재사용되는 ChatOpenAI 인스턴스를 반환합니다.
+    모든 인스턴스는 같은 httpx 커넥션 풀을 공유하므로 TLS 핸드셰이크를 반복하지 않습니다.
+    단계별 설정은 model_routing.get_stage_model 을 사용합니다.
+
+    Args:
+        model: 모델 이름
+        temperature: 샘플링 온도
+        role: 호출 용도 (chat, analyze, categorize 등)
+        max_tokens: 최대 출력 토큰 수 (None 이면 모델 기본값)
+        timeout: 호출 제한 시간 (None 이면 LLM_READ_TIMEOUT)
+        max_retries: 실패 시 재시도 횟수 (None 이면 ChatOpenAI 기본값)
+
+    Returns:
+        ChatOpenAI
+    """
+    key = (model, temperature, role, max_tokens, timeout, max_retries)
+    with _lock:
+        llm = _chat_models.get(key)
+        if llm is not None:
+            _metrics["registry_hits"] += 1
+            return llm
+        _metrics["registry_misses"] += 1
+
+    http_client = get_http_client()
+    http_async_client = get_http_async_client()
+    options = {}
+    if max_tokens is not None:
+        options["max_tokens"] = max_tokens
+    if timeout is not None:
+        options["timeout"] = timeout
+    if max_retries is not None:
+        options["max_retries"] = max_retries
+    with _lock:
+        if key not in _chat_models:
+            _chat_models[key] = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                http_client=http_client,
+                http_async_client=http_async_client,
+                # Streaming responses report usage (incl. cached_tokens) on the final chunk
+                stream_usage=True,
+                **options,
+            )
+        return _chat_models[key]
+
+
+def _pool_stats(client: Union[httpx.Client, httpx.AsyncClient, None]) -> Dict[str, int]:
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    return {
+        "connections": len(connections),
+        "idle": sum(1 for connection in connections if connection.is_idle()),
+    }
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """
+    LLM 클라이언트 레지스트리와 커넥션 풀 사용량을 반환합니다.
+    """
+    with _lock:
+        metrics = dict(_metrics)
+        metrics["chat_models"] = len(_chat_models)
+    metrics["max_connections"] = LLM_MAX_CONNECTIONS
+    metrics["http2"] = HTTP2_ENABLED
+    metrics["sync_pool"] = _pool_stats(_http_client)
+    metrics["async_pool"] = _pool_stats(_http_async_client)
+    return metrics
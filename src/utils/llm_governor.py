@@ -0,0 +1,511 @@
+import asyncio
+import importlib
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Tuple, Union
+from dotenv import load_dotenv
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda, RunnableWithFallbacks
+from src.model.utils_model import LLMPermit
+from src.utils.token_count import count_tokens
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+LLM_GOVERNOR_ENABLED = os.getenv("LLM_GOVERNOR_ENABLED", "true") == "true"
+# OpenAI 계정 (조직) 의 분당 요청 수 / 토큰 수 한도
+LLM_RPM_LIMIT = float(os.getenv("LLM_RPM_LIMIT", "5000"))
+LLM_TPM_LIMIT = float(os.getenv("LLM_TPM_LIMIT", "450000"))
+# "memory" 는 프로세스별 한도, 여러 워커가 한도를 나눠 쓰려면 "sqlite" 또는 "package.module:ClassName"
+LLM_GOVERNOR_BACKEND = os.getenv("LLM_GOVERNOR_BACKEND", "memory")
+LLM_GOVERNOR_PATH = os.getenv("LLM_GOVERNOR_PATH", "llm_governor.sqlite3")
+# 한도 중 이 비율은 상위 lane 을 위해 남겨 둡니다. (background 는 20% 이상 남아 있을 때만 시작)
+LLM_ADMIN_RESERVE = float(os.getenv("LLM_ADMIN_RESERVE", "0.1"))
+LLM_BACKGROUND_RESERVE = float(os.getenv("LLM_BACKGROUND_RESERVE", "0.2"))
+# 이 시간 넘게 차례를 기다리면 GovernorTimeout
+LLM_GOVERNOR_MAX_WAIT = float(os.getenv("LLM_GOVERNOR_MAX_WAIT", "120"))
+# 출력 토큰 수를 모를 때의 추정치, 이미지 한 장의 입력 토큰 추정치
+LLM_OUTPUT_TOKEN_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKEN_ESTIMATE", "1000"))
+LLM_IMAGE_TOKEN_ESTIMATE = int(os.getenv("LLM_IMAGE_TOKEN_ESTIMATE", "1000"))
+
+# Lanes in priority order
+INTERACTIVE = "interactive"
+ADMIN = "admin"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, ADMIN, BACKGROUND)
+RESERVES = {INTERACTIVE: 0.0, ADMIN: LLM_ADMIN_RESERVE, BACKGROUND: LLM_BACKGROUND_RESERVE}
+
+_lane: ContextVar[Tuple[str, str]] = ContextVar("llm_lane", default=(ADMIN, "-"))
+
+
+class GovernorTimeout(TimeoutError):
+    """
+    LLM 호출 차례를 LLM_GOVERNOR_MAX_WAIT 안에 받지 못했을 때 발생합니다.
+    """
+
+
+@contextmanager
+def llm_lane(lane: str, academy: Union[str, None] = None) -> Iterator[None]:
+    """
+    블록 안의 LLM 호출이 사용할 lane 과 학원을 지정합니다. (contextvar 이므로 같은 요청 / 작업 안에서만 적용)
+
+    Args:
+        lane: INTERACTIVE / ADMIN / BACKGROUND
+        academy: 학원 id (같은 lane 안에서 학원별로 번갈아 차례를 줍니다)
+    """
+    if lane not in LANES:
+        raise ValueError(f"unknown llm lane: {lane}")
+    token = _lane.set((lane, academy or "-"))
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane() -> Tuple[str, str]:
+    """
+    현재 (lane, 학원) 을 반환합니다. 지정하지 않았으면 (ADMIN, "-") 입니다.
+    """
+    return _lane.get()
+
+
+class BucketStore(ABC):
+    """
+    분당 요청 수 (RPM) / 토큰 수 (TPM) token bucket 저장소
+
+    여러 워커가 한도를 나눠 쓰려면 프로세스 밖의 저장소 (SQLite, Redis 등) 구현체를 사용합니다.
+    """
+
+    @abstractmethod
+    def take(self, requests: float, tokens: float, reserve: float) -> float:
+        """
+        차감 후에도 두 bucket 에 용량의 reserve 비율 이상이 남으면 차감하고 0 을,
+        아니면 차감하지 않고 다시 시도할 때까지 기다릴 초를 반환합니다.
+        """
+
+    @abstractmethod
+    def give_back(self, tokens: float) -> None:
+        """
+        TPM bucket 을 보정합니다. 추정보다 적게 썼으면 양수 (반환), 많이 썼으면 음수 (빚) 입니다.
+        """
+
+    @abstractmethod
+    def levels(self) -> Dict[str, float]:
+        """
+        현재 남은 요청 수 / 토큰 수를 반환합니다.
+        """
+
+
+def _refill(level: float, capacity: float, elapsed: float) -> float:
+    return min(capacity, level + capacity / 60 * max(elapsed, 0))
+
+
+def _wait_seconds(levels: Tuple[float, float], costs: Tuple[float, float], capacities: Tuple[float, float], reserve: float) -> float:
+    wait = 0.0
+    for level, cost, capacity in zip(levels, costs, capacities):
+        # A call larger than the lane's share still fits into a full bucket (the bucket goes into debt)
+        cost = min(cost, capacity * (1 - reserve))
+        missing = cost + capacity * reserve - level
+        if missing > 0:
+            wait = max(wait, missing / (capacity / 60))
+    return wait
+
+
+class MemoryBucketStore(BucketStore):
+    """
+    프로세스 내 token bucket
+    """
+
+    def __init__(self, rpm: float = LLM_RPM_LIMIT, tpm: float = LLM_TPM_LIMIT):
+        self.capacities = (rpm, tpm)
+        self._levels = [rpm, tpm]
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill_locked(self) -> None:
+        now = time.monotonic()
+        elapsed, self._updated = now - self._updated, now
+        self._levels = [_refill(level, capacity, elapsed) for level, capacity in zip(self._levels, self.capacities)]
+
+    def take(self, requests: float, tokens: float, reserve: float) -> float:
+        with self._lock:
+            self._refill_locked()
+            wait = _wait_seconds(tuple(self._levels), (requests, tokens), self.capacities, reserve)
+            if wait == 0:
+                self._levels[0] -= requests
+                self._levels[1] -= tokens
+            return wait
+
+    def give_back(self, tokens: float) -> None:
+        with self._lock:
+            self._refill_locked()
+            self._levels[1] = min(self.capacities[1], self._levels[1] + tokens)
+
+    def levels(self) -> Dict[str, float]:
+        with self._lock:
+            self._refill_locked()
+            return {"requests": round(self._levels[0], 1), "tokens": round(self._levels[1], 1)}
+
+
+class SQLiteBucketStore(BucketStore):
+    """
+    같은 호스트의 여러 워커 프로세스가 나눠 쓰는 SQLite token bucket
+    """
+
+    def __init__(self, path: str, rpm: float = LLM_RPM_LIMIT, tpm: float = LLM_TPM_LIMIT):
+        self.path = path
+        self.capacities = (rpm, tpm)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_buckets ("
+                "name TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            now = time.time()
+            conn.execute("INSERT OR IGNORE INTO llm_buckets VALUES ('requests', ?, ?)", (rpm, now))
+            conn.execute("INSERT OR IGNORE INTO llm_buckets VALUES ('tokens', ?, ?)", (tpm, now))
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _update(self, change) -> Any:
+        with closing(self._connect()) as conn:
+            # IMMEDIATE takes the write lock up front so read-refill-write is atomic across processes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                rows = dict(
+                    (name, (level, updated_at))
+                    for name, level, updated_at in conn.execute("SELECT name, level, updated_at FROM llm_buckets")
+                )
+                levels = [
+                    _refill(rows["requests"][0], self.capacities[0], now - rows["requests"][1]),
+                    _refill(rows["tokens"][0], self.capacities[1], now - rows["tokens"][1]),
+                ]
+                result = change(levels)
+                conn.execute("UPDATE llm_buckets SET level = ?, updated_at = ? WHERE name = 'requests'", (levels[0], now))
+                conn.execute("UPDATE llm_buckets SET level = ?, updated_at = ? WHERE name = 'tokens'", (levels[1], now))
+                conn.execute("COMMIT")
+                return result
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def take(self, requests: float, tokens: float, reserve: float) -> float:
+        def change(levels: List[float]) -> float:
+            wait = _wait_seconds(tuple(levels), (requests, tokens), self.capacities, reserve)
+            if wait == 0:
+                levels[0] -= requests
+                levels[1] -= tokens
+            return wait
+        return self._update(change)
+
+    def give_back(self, tokens: float) -> None:
+        def change(levels: List[float]) -> None:
+            levels[1] = min(self.capacities[1], levels[1] + tokens)
+        self._update(change)
+
+    def levels(self) -> Dict[str, float]:
+        levels = self._update(lambda levels: list(levels))
+        return {"requests": round(levels[0], 1), "tokens": round(levels[1], 1)}
+
+
+def create_bucket_store(backend: str, path: str = None) -> BucketStore:
+    """
+    설정 문자열로 token bucket 저장소를 만듭니다.
+
+    Args:
+        backend: "memory" / "sqlite" / "package.module:ClassName"
+        path: sqlite 파일 경로
+
+    Returns:
+        BucketStore
+    """
+    if backend == "memory":
+        return MemoryBucketStore()
+    if backend == "sqlite":
+        return SQLiteBucketStore(path or os.path.join(os.getcwd(), "llm_governor.sqlite3"))
+
+    module_name, class_name = backend.split(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class _Waiter:
+    def __init__(self, lane: str, academy: str, tokens: int, seq: int, loop: Union[asyncio.AbstractEventLoop, None]):
+        self.lane = lane
+        self.academy = academy
+        self.tokens = tokens
+        self.seq = seq
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.event = threading.Event()
+        self.loop = loop
+        self.future = loop.create_future() if loop else None
+
+
+class LLMGovernor:
+    """
+    프로세스 전역 LLM 호출 조절기
+
+    RPM / TPM token bucket 을 공유하며, 기다리는 호출은 lane 우선순위 (interactive > admin > background) 순으로,
+    같은 lane 안에서는 가장 오래 차례를 받지 못한 학원부터 차례를 받습니다.
+    하위 lane 은 RESERVES 만큼의 여유를 남겨 두므로, 몰린 background 작업이 interactive 호출의 한도를 먹지 않습니다.
+    """
+
+    def __init__(self, store: BucketStore, reserves: Dict[str, float] = None, max_wait: float = LLM_GOVERNOR_MAX_WAIT):
+        self.store = store
+        self.reserves = dict(RESERVES if reserves is None else reserves)
+        self.max_wait = max_wait
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._grants = 0
+        # (lane, academy) -> grant number of its last turn, for round-robin within a lane
+        self._served: Dict[Tuple[str, str], int] = {}
+        # _lock guards the queue and metrics only, _dispatch_lock serializes store access
+        self._lock = threading.Lock()
+        self._dispatch_lock = threading.Lock()
+        self._metrics = {lane: {"granted": 0, "timeouts": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0} for lane in LANES}
+
+    def _next(self) -> _Waiter:
+        return min(self._waiters, key=lambda w: (LANES.index(w.lane), self._served.get((w.lane, w.academy), -1), w.seq))
+
+    def _grant(self, waiter: _Waiter) -> None:
+        self._waiters.remove(waiter)
+        waiter.granted = True
+        self._grants += 1
+        self._served[(waiter.lane, waiter.academy)] = self._grants
+
+        waited = time.monotonic() - waiter.enqueued
+        metrics = self._metrics[waiter.lane]
+        metrics["granted"] += 1
+        metrics["wait_seconds"] += waited
+        metrics["max_wait_seconds"] = max(metrics["max_wait_seconds"], waited)
+
+        waiter.event.set()
+        if waiter.future is not None:
+            waiter.loop.call_soon_threadsafe(lambda: waiter.future.done() or waiter.future.set_result(True))
+
+    def _dispatch(self) -> float:
+        """
+        차례가 된 대기 호출들에 한도가 허락하는 만큼 차례를 줍니다. 다음 시도까지 기다릴 초를 반환합니다.
+        저장소 I/O (SQLite 등) 를 하므로 이벤트 루프에서는 asyncio.to_thread 로 호출합니다.
+        """
+        # One dispatcher at a time keeps grants in queue order; store calls stay outside self._lock
+        with self._dispatch_lock:
+            while True:
+                with self._lock:
+                    if not self._waiters:
+                        return 0.0
+                    waiter = self._next()
+                wait = self.store.take(1, waiter.tokens, self.reserves[waiter.lane])
+                if wait > 0:
+                    return wait
+                with self._lock:
+                    granted = waiter in self._waiters
+                    if granted:
+                        self._grant(waiter)
+                if not granted:
+                    # The waiter gave up while its tokens were being taken
+                    self.store.give_back(waiter.tokens)
+
+    def _enqueue(self, tokens: int, lane: Union[str, None], academy: Union[str, None], loop) -> _Waiter:
+        context_lane, context_academy = current_lane()
+        waiter = _Waiter(lane or context_lane, academy or context_academy, tokens, next(self._seq), loop)
+        with self._lock:
+            self._waiters.append(waiter)
+        return waiter
+
+    def _leave(self, waiter: _Waiter) -> bool:
+        """
+        대기열에서 빠집니다. 그 사이에 차례를 받았으면 True (토큰을 돌려줘야 함) 를 반환합니다.
+        """
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                return False
+            return waiter.granted
+
+    def _release(self, waiter: _Waiter, granted: bool) -> None:
+        if granted:
+            self.store.give_back(waiter.tokens)
+        # The waiter may have been the blocked head, let the next one try
+        self._dispatch()
+
+    def _timeout(self, waiter: _Waiter) -> GovernorTimeout:
+        self._release(waiter, self._leave(waiter))
+        with self._lock:
+            self._metrics[waiter.lane]["timeouts"] += 1
+        return GovernorTimeout(f"no llm capacity for {waiter.lane} lane within {self.max_wait}s")
+
+    def acquire(self, tokens: int, lane: str = None, academy: str = None) -> LLMPermit:
+        """
+        LLM 호출 차례를 기다립니다. (동기)
+
+        Args:
+            tokens: 호출에 쓸 것으로 추정한 입력 + 출력 토큰 수
+            lane: lane (없으면 llm_lane 으로 지정한 값)
+            academy: 학원 id (없으면 llm_lane 으로 지정한 값)
+
+        Returns:
+            LLMPermit: 호출이 끝나면 settle 에 넘깁니다.
+
+        Raises:
+            GovernorTimeout: max_wait 안에 차례를 받지 못했을 때
+        """
+        waiter = self._enqueue(tokens, lane, academy, None)
+        deadline = time.monotonic() + self.max_wait
+        delay = self._dispatch()
+        while not waiter.granted:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise self._timeout(waiter)
+            waiter.event.wait(min(delay or remaining, remaining))
+            if not waiter.granted:
+                delay = self._dispatch()
+        return LLMPermit(waiter.lane, waiter.academy, tokens, time.monotonic() - waiter.enqueued)
+
+    async def aacquire(self, tokens: int, lane: str = None, academy: str = None) -> LLMPermit:
+        """
+        acquire 의 비동기 버전. 저장소 I/O 는 스레드에서 하므로 기다리는 동안 이벤트 루프를 막지 않습니다.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = self._enqueue(tokens, lane, academy, loop)
+        deadline = time.monotonic() + self.max_wait
+        try:
+            delay = await asyncio.to_thread(self._dispatch)
+            while not waiter.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise await asyncio.to_thread(self._timeout, waiter)
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), min(delay or remaining, remaining))
+                except asyncio.TimeoutError:
+                    pass
+                if not waiter.granted:
+                    delay = await asyncio.to_thread(self._dispatch)
+        except asyncio.CancelledError:
+            # Leave the queue now, return tokens in the background without awaiting
+            loop.run_in_executor(None, self._release, waiter, self._leave(waiter))
+            raise
+        return LLMPermit(waiter.lane, waiter.academy, tokens, time.monotonic() - waiter.enqueued)
+
+    def settle(self, permit: LLMPermit, used_tokens: Union[int, None]) -> None:
+        """
+        호출이 끝난 뒤 실제 사용한 토큰 수로 TPM bucket 을 보정합니다. 사용량을 모르면 추정치를 그대로 둡니다.
+        """
+        if used_tokens is None or used_tokens == permit.tokens:
+            return
+        self.store.give_back(permit.tokens - used_tokens)
+        self._dispatch()
+
+    async def asettle(self, permit: LLMPermit, used_tokens: Union[int, None]) -> None:
+        """
+        settle 의 비동기 버전 (저장소 I/O 를 스레드에서 실행)
+        """
+        if used_tokens is None or used_tokens == permit.tokens:
+            return
+        await asyncio.to_thread(self.settle, permit, used_tokens)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        lane 별 대기 수 / 학원별 대기 수 / 차례를 받은 수 / 대기 시간, 남은 한도를 반환합니다.
+        """
+        with self._lock:
+            lanes = {lane: dict(metrics) for lane, metrics in self._metrics.items()}
+            for lane in lanes.values():
+                lane["waiting"] = 0
+                lane["waiting_by_academy"] = {}
+            for waiter in self._waiters:
+                lane = lanes[waiter.lane]
+                lane["waiting"] += 1
+                lane["waiting_by_academy"][waiter.academy] = lane["waiting_by_academy"].get(waiter.academy, 0) + 1
+        for lane in lanes.values():
+            lane["avg_wait_seconds"] = round(lane["wait_seconds"] / lane["granted"], 3) if lane["granted"] else 0.0
+            lane["wait_seconds"] = round(lane["wait_seconds"], 3)
+            lane["max_wait_seconds"] = round(lane["max_wait_seconds"], 3)
+        return {"lanes": lanes, "buckets": self.store.levels(), "limits": {"rpm": LLM_RPM_LIMIT, "tpm": LLM_TPM_LIMIT}}
+
+
+_governor: Union[LLMGovernor, None] = None
+_governor_lock = threading.Lock()
+
+
+def get_llm_governor() -> Union[LLMGovernor, None]:
+    """
+    프로세스 전역 LLM 호출 조절기를 반환합니다. LLM_GOVERNOR_ENABLED=false 이면 None 입니다.
+    """
+    global _governor
+    if not LLM_GOVERNOR_ENABLED:
+        return None
+
+    with _governor_lock:
+        if _governor is None:
+            _governor = LLMGovernor(create_bucket_store(LLM_GOVERNOR_BACKEND, LLM_GOVERNOR_PATH))
+        return _governor
+
+
+def estimate_call_tokens(prompt: Any, max_tokens: Union[int, None] = None, images: int = 0) -> int:
+    """
+    호출 전에 입력 + 출력 토큰 수를 추정합니다.
+
+    Args:
+        prompt: 프롬프트 (PromptValue 또는 텍스트)
+        max_tokens: 최대 출력 토큰 수 (없으면 LLM_OUTPUT_TOKEN_ESTIMATE)
+        images: 이미지 수
+    """
+    text = prompt.to_string() if hasattr(prompt, "to_string") else str(prompt or "")
+    return count_tokens(text) + (max_tokens or LLM_OUTPUT_TOKEN_ESTIMATE) + images * LLM_IMAGE_TOKEN_ESTIMATE
+
+
+def used_tokens(output: Any) -> Union[int, None]:
+    """
+    응답 메시지 (또는 structured output 의 {"raw": 메시지}) 에서 실제 사용한 토큰 수를 읽습니다.
+    """
+    message = output.get("raw") if isinstance(output, dict) else output
+    usage = getattr(message, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+def governed(runnable: Runnable, max_tokens: Union[int, None] = None) -> Runnable:
+    """
+    runnable (채팅 모델 호출) 앞뒤로 차례 기다리기 / 사용량 보정을 붙입니다. 조절기가 꺼져 있으면 그대로 반환합니다.
+
+    fallback 이 있는 runnable 은 모델마다 따로 감싸므로, 기본 모델이 timeout / 429 로 실패한 뒤의
+    fallback 호출도 각각 차례를 기다리고 RPM / TPM 에 계산됩니다.
+
+    Args:
+        runnable: PromptValue 를 받아 모델을 호출하는 runnable
+        max_tokens: 모델의 최대 출력 토큰 수 (추정용)
+    """
+    if isinstance(runnable, RunnableWithFallbacks):
+        return governed(runnable.runnable, max_tokens).with_fallbacks(
+            [governed(fallback, max_tokens) for fallback in runnable.fallbacks],
+            exceptions_to_handle=runnable.exceptions_to_handle,
+            exception_key=runnable.exception_key,
+        )
+
+    def invoke(prompt: Any, config: RunnableConfig) -> Any:
+        governor = get_llm_governor()
+        if governor is None:
+            return runnable.invoke(prompt, config)
+        permit = governor.acquire(estimate_call_tokens(prompt, max_tokens))
+        output = runnable.invoke(prompt, config)
+        governor.settle(permit, used_tokens(output))
+        return output
+
+    async def ainvoke(prompt: Any, config: RunnableConfig) -> Any:
+        governor = get_llm_governor()
+        if governor is None:
+            return await runnable.ainvoke(prompt, config)
+        permit = await governor.aacquire(estimate_call_tokens(prompt, max_tokens))
+        output = await runnable.ainvoke(prompt, config)
+        await governor.asettle(permit, used_tokens(output))
+        return output
+
+    return RunnableLambda(invoke, afunc=ainvoke)
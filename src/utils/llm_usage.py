@@ -0,0 +1,99 @@
+import threading
+from typing import Any, Dict, Sequence
+
+_lock = threading.Lock()
+_usage: Dict[str, Dict[str, int]] = {}
+_prompt_tokens: Dict[str, Dict[str, Any]] = {}
+
+
+def record_usage(prompt: str, input_tokens: int, cached_tokens: int = 0, output_tokens: int = 0) -> None:
+    """
+    LLM 호출 한 번의 토큰 사용량을 프롬프트별로 누적합니다.
+
+    Args:
+        prompt: 프롬프트 식별자 (예: "chat@v3")
+        input_tokens: 입력 토큰 수 (캐시된 토큰 포함)
+        cached_tokens: provider 프롬프트 캐시에서 읽은 입력 토큰 수
+        output_tokens: 출력 토큰 수
+    """
+    with _lock:
+        usage = _usage.setdefault(prompt, {
+            "calls": 0,
+            "cache_hit_calls": 0,
+            "input_tokens": 0,
+            "cached_tokens": 0,
+            "output_tokens": 0,
+        })
+        usage["calls"] += 1
+        usage["cache_hit_calls"] += 1 if cached_tokens else 0
+        usage["input_tokens"] += input_tokens
+        usage["cached_tokens"] += cached_tokens
+        usage["output_tokens"] += output_tokens
+
+
+def record_message_usage(prompt: str, message: Any) -> None:
+    """
+    langchain 응답 메시지의 usage_metadata 를 기록합니다. 사용량이 없는 메시지 (스트리밍 중간 청크, 테스트용 모델 등) 는 무시합니다.
+    """
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return
+    details = usage.get("input_token_details") or {}
+    record_usage(
+        prompt,
+        usage.get("input_tokens", 0),
+        details.get("cache_read", 0) or 0,
+        usage.get("output_tokens", 0),
+    )
+
+
+def get_prompt_cache_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    프롬프트별 토큰 사용량과 provider 프롬프트 캐시 적중률을 반환합니다.
+
+    Returns:
+        {prompt: {calls, cache_hit_calls, input_tokens, cached_tokens, output_tokens, cache_hit_ratio}}
+        cache_hit_ratio 는 입력 토큰 중 캐시에서 읽은 토큰의 비율입니다.
+    """
+    with _lock:
+        metrics = {prompt: dict(usage) for prompt, usage in _usage.items()}
+    for usage in metrics.values():
+        usage["cache_hit_ratio"] = round(usage["cached_tokens"] / usage["input_tokens"], 4) if usage["input_tokens"] else 0.0
+    return metrics
+
+
+def record_prompt_tokens(prompt: str, tokens: Dict[str, int], truncated: Sequence[str] = ()) -> None:
+    """
+    호출 직전에 잰 프롬프트 변수별 토큰 수를 누적합니다.
+
+    Args:
+        prompt: 프롬프트 이름
+        tokens: {변수: 토큰 수}
+        truncated: 예산에 맞춰 잘린 변수
+    """
+    total = sum(tokens.values())
+    with _lock:
+        usage = _prompt_tokens.setdefault(prompt, {"calls": 0, "tokens": 0, "max_tokens": 0, "truncated_calls": 0, "variables": {}})
+        usage["calls"] += 1
+        usage["tokens"] += total
+        usage["max_tokens"] = max(usage["max_tokens"], total)
+        usage["truncated_calls"] += 1 if truncated else 0
+        for name, count in tokens.items():
+            variable = usage["variables"].setdefault(name, {"tokens": 0, "max_tokens": 0, "truncated": 0})
+            variable["tokens"] += count
+            variable["max_tokens"] = max(variable["max_tokens"], count)
+            variable["truncated"] += 1 if name in truncated else 0
+
+
+def get_prompt_token_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    프롬프트별 변수 토큰 수 (합계 / 최대), 예산 때문에 잘린 호출 수를 반환합니다.
+    """
+    with _lock:
+        metrics = {
+            prompt: {**usage, "variables": {name: dict(variable) for name, variable in usage["variables"].items()}}
+            for prompt, usage in _prompt_tokens.items()
+        }
+    for usage in metrics.values():
+        usage["avg_tokens"] = round(usage["tokens"] / usage["calls"], 1) if usage["calls"] else 0.0
+    return metrics
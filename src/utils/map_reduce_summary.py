@@ -0,0 +1,200 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Sequence, Tuple, Union
+from dotenv import load_dotenv
+from src.utils.model_routing import get_route, get_stage_model
+from src.utils.prompt_registry import get_chain, prompt_version
+from src.utils.shared_cache import CacheBackend, create_cache_backend
+from src.utils.token_count import count_tokens, truncate_tokens
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+# 부분 요약은 LLM 결과이므로 기본값은 워커 간에 공유되고 재시작에도 남는 SQLite 입니다.
+SUMMARY_CACHE_BACKEND = os.getenv("SUMMARY_CACHE_BACKEND", "sqlite")
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "summary_cache.sqlite3")
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", str(30 * 24 * 3600)))
+SUMMARY_CACHE_MAX_ITEMS = int(os.getenv("SUMMARY_CACHE_MAX_ITEMS", "4096"))
+# 한 번의 map 호출에 넣을 최대 토큰 수
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "6000"))
+# 평균 몇 개의 아이템마다 청크를 끊을지 (아이템 키 해시로 정하므로 새 아이템이 와도 다른 청크 경계는 그대로입니다)
+SUMMARY_BOUNDARY_EVERY = int(os.getenv("SUMMARY_BOUNDARY_EVERY", "32"))
+SUMMARY_MAX_CONCURRENCY = int(os.getenv("SUMMARY_MAX_CONCURRENCY", "8"))
+
+MAP_PROMPT = "problem_analysis"
+REDUCE_PROMPT = "problem_analysis_reduce"
+
+
+def _is_boundary(key: str, every: int) -> bool:
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % every == 0
+
+
+def chunk_items(
+        items: Sequence[Tuple[str, str]],
+        max_tokens: int = SUMMARY_CHUNK_TOKENS,
+        boundary_every: int = SUMMARY_BOUNDARY_EVERY,
+) -> List[List[str]]:
+    """
+    (키, 텍스트) 목록을 키 순서로 정렬해 청크로 나눕니다.
+    청크 경계는 키의 해시로 정하고 (content-defined chunking), 토큰 수가 max_tokens 를 넘을 때만 추가로 끊습니다.
+    따라서 아이템이 추가 / 수정되면 해당 아이템이 속한 청크만 바뀌고 나머지 청크의 캐시는 그대로 적중합니다.
+
+    Args:
+        items: (정렬 / 경계 기준 키, 요약할 텍스트)
+        max_tokens: 청크당 최대 토큰 수
+        boundary_every: 평균 청크 크기 (아이템 수)
+
+    Returns:
+        텍스트 청크 목록
+    """
+    chunks = []
+    current, current_tokens = [], 0
+    for key, text in sorted(items):
+        tokens = count_tokens(text)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+        if _is_boundary(key, boundary_every):
+            chunks.append(current)
+            current, current_tokens = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def pack_texts(texts: Sequence[str], max_tokens: int = SUMMARY_CHUNK_TOKENS) -> List[List[str]]:
+    """
+    순서를 유지하면서 max_tokens 이하로 텍스트를 묶습니다. (reduce 단계용)
+    """
+    groups = []
+    current, current_tokens = [], 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+class MapReduceSummarizer:
+    """
+    계층적 (map-reduce) 문제 분석 요약기
+
+    분석들을 토큰 수 기준 청크로 나눠 병렬로 요약 (map) 하고, 부분 요약들을 합칩니다 (reduce).
+    부분 요약이 한 번에 합치기에 너무 크면 reduce 를 여러 단계로 반복합니다.
+    모든 단계의 결과는 (프롬프트 버전, 모델, 입력) 해시로 캐시되므로,
+    새 제출물이 들어오면 그 제출물이 속한 청크와 그 위의 reduce 만 다시 계산합니다.
+    """
+
+    def __init__(
+            self,
+            cache: CacheBackend,
+            ttl: float = SUMMARY_CACHE_TTL,
+            max_tokens: int = SUMMARY_CHUNK_TOKENS,
+            boundary_every: int = SUMMARY_BOUNDARY_EVERY,
+            max_concurrency: int = SUMMARY_MAX_CONCURRENCY,
+            stage: str = "problem_analysis",
+    ):
+        self.cache = cache
+        self.ttl = ttl
+        self.max_tokens = max_tokens
+        self.boundary_every = boundary_every
+        self.max_concurrency = max_concurrency
+        self.stage = stage
+        self._lock = threading.Lock()
+        self._metrics = {"summaries": 0, "chunks": 0, "cache_hits": 0, "llm_calls": 0}
+
+    def _count(self, key: str, delta: int = 1) -> None:
+        with self._lock:
+            self._metrics[key] += delta
+
+    def _cache_key(self, prompt: str, texts: Sequence[str]) -> str:
+        payload = json.dumps(list(texts), ensure_ascii=False)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"summary:{prompt_version(prompt)}:{get_route(self.stage).model}:{digest}"
+
+    async def _summarize(self, prompt: str, texts: List[str], semaphore: asyncio.Semaphore) -> str:
+        key = self._cache_key(prompt, texts)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            self._count("cache_hits")
+            return cached
+
+        chain = get_chain(prompt, get_stage_model(self.stage))
+        variables = {"analysis": texts} if prompt == MAP_PROMPT else {"partials": texts}
+        async with semaphore:
+            self._count("llm_calls")
+            result = await chain.ainvoke(variables)
+
+        await asyncio.to_thread(self.cache.set, key, result.analysis, self.ttl)
+        return result.analysis
+
+    async def summarize(self, items: Sequence[Tuple[str, str]]) -> str:
+        """
+        (키, 분석) 목록을 하나의 문제 분석으로 요약합니다.
+
+        Args:
+            items: (제출물 키, 분석 텍스트), 키는 청크 경계와 순서를 정하므로 제출물마다 고정되어야 합니다.
+
+        Returns:
+            str: 문제 분석
+        """
+        self._count("summaries")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        chunks = chunk_items([(key, text) for key, text in items if text], self.max_tokens, self.boundary_every)
+        self._count("chunks", len(chunks))
+
+        # A single chunk needs no reduce step, which keeps small problems on one call as before
+        if len(chunks) <= 1:
+            return await self._summarize(MAP_PROMPT, chunks[0] if chunks else [], semaphore)
+
+        partials = await asyncio.gather(*(self._summarize(MAP_PROMPT, chunk, semaphore) for chunk in chunks))
+
+        # Reduce level by level until the partials fit one call
+        groups = pack_texts(partials, self.max_tokens)
+        while len(groups) > 1:
+            if len(groups) == len(partials):
+                # No two partials fit together; trim them so every reduce call merges at least two
+                logger.warning(f"{len(partials)} partial summaries exceed half the reduce budget, truncating")
+                partials = [truncate_tokens(partial, self.max_tokens // 2) for partial in partials]
+                groups = pack_texts(partials, self.max_tokens)
+                continue
+            logger.info(f"reducing {len(partials)} partial summaries in {len(groups)} groups")
+            partials = await asyncio.gather(*(self._summarize(REDUCE_PROMPT, group, semaphore) for group in groups))
+            groups = pack_texts(partials, self.max_tokens)
+
+        return await self._summarize(REDUCE_PROMPT, list(partials), semaphore)
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        요약 호출 수, 청크 수, 부분 요약 캐시 적중 수, LLM 호출 수를 반환합니다.
+        """
+        with self._lock:
+            return dict(self._metrics)
+
+
+_summarizer: Union[MapReduceSummarizer, None] = None
+_summarizer_lock = threading.Lock()
+
+
+def get_analysis_summarizer() -> MapReduceSummarizer:
+    """
+    프로세스 전역 문제 분석 요약기를 반환합니다.
+    """
+    global _summarizer
+    with _summarizer_lock:
+        if _summarizer is None:
+            cache = create_cache_backend(SUMMARY_CACHE_BACKEND, SUMMARY_CACHE_PATH, SUMMARY_CACHE_MAX_ITEMS)
+            _summarizer = MapReduceSummarizer(cache)
+        return _summarizer
@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, replace
+from typing import Any, Dict, Union
+from dotenv import load_dotenv
+from langchain_core.runnables import Runnable
+from src.model.utils_model import ModelRoute
+from src.utils.llm_client import get_chat_model
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+# 단계별 설정을 덮어쓸 JSON 파일 경로 또는 JSON 문자열
+# 예: {"title": {"model": "gpt-4o-mini", "timeout": 5}, "chat": {"fallbacks": ["gpt-4o-mini"]}}
+MODEL_ROUTES_PATH = os.getenv("MODEL_ROUTES_PATH")
+MODEL_ROUTES = os.getenv("MODEL_ROUTES")
+
+# 분석 / 채팅 / 생성은 gpt-4o, 짧은 구조화 출력 단계는 gpt-4o-mini
+DEFAULT_ROUTES: Dict[str, ModelRoute] = {
+    "ocr": ModelRoute("gpt-4o", 0, max_tokens=300, timeout=60),
+    "modify": ModelRoute("gpt-4o-mini", 0.2, max_tokens=3000, timeout=30, fallbacks=("gpt-4o",)),
+    "validate": ModelRoute("gpt-4o-mini", 0, max_tokens=100, timeout=15, fallbacks=("gpt-4o",)),
+    "analyze": ModelRoute("gpt-4o", 0.5, max_tokens=1500, timeout=90, fallbacks=("gpt-4o-mini",)),
+    "categorize": ModelRoute("gpt-4o-mini", 0, max_tokens=100, timeout=15, fallbacks=("gpt-4o",)),
+    "fused_analysis": ModelRoute("gpt-4o", 0.5, max_tokens=2500, timeout=120, fallbacks=("gpt-4o-mini",)),
+    "chat": ModelRoute("gpt-4o", 0.5, max_tokens=1500, timeout=60, fallbacks=("gpt-4o-mini",)),
+    "chat_summary": ModelRoute("gpt-4o-mini", 0, max_tokens=500, timeout=30),
+    "generate": ModelRoute("gpt-4o", 0.5, max_tokens=2000, timeout=120),
+    "new_generate": ModelRoute("gpt-4o", 0.3, max_tokens=2000, timeout=120),
+    "verify": ModelRoute("gpt-4o", 0.3, max_tokens=2000, timeout=90),
+    "title": ModelRoute("gpt-4o-mini", 0.5, max_tokens=100, timeout=15, fallbacks=("gpt-4o",)),
+    "assignment_analysis": ModelRoute("gpt-4o", 0.5, max_tokens=2000, timeout=120),
+    "problem_analysis": ModelRoute("gpt-4o", 0.5, max_tokens=2000, timeout=120, fallbacks=("gpt-4o-mini",)),
+}
+
+_lock = threading.Lock()
+_routes: Union[Dict[str, ModelRoute], None] = None
+_models: Dict[str, Runnable] = {}
+
+
+def parse_routes(overrides: Dict[str, Dict[str, Any]], defaults: Dict[str, ModelRoute] = None) -> Dict[str, ModelRoute]:
+    """
+    기본 라우팅 표에 단계별 설정을 덮어씁니다. 없는 단계는 새로 추가되며 model 이 필요합니다.
+
+    Raises:
+        ValueError: 알 수 없는 필드이거나 새 단계에 model 이 없을 때
+    """
+    routes = dict(DEFAULT_ROUTES if defaults is None else defaults)
+    for stage, override in overrides.items():
+        unknown = set(override) - set(asdict(ModelRoute("")))
+        if unknown:
+            raise ValueError(f"unknown model route fields for {stage}: {sorted(unknown)}")
+        if "fallbacks" in override:
+            override = {**override, "fallbacks": tuple(override["fallbacks"])}
+        if stage in routes:
+            routes[stage] = replace(routes[stage], **override)
+        elif "model" in override:
+            routes[stage] = ModelRoute(**override)
+        else:
+            raise ValueError(f"model route for new stage {stage} needs a model")
+    return routes
+
+
+def load_model_routes() -> Dict[str, ModelRoute]:
+    """
+    라우팅 표를 읽습니다. 프로세스에서 한 번만 읽고, 잘못된 설정은 시작할 때 바로 실패합니다.
+    """
+    global _routes
+    with _lock:
+        if _routes is None:
+            overrides = {}
+            if MODEL_ROUTES_PATH:
+                with open(MODEL_ROUTES_PATH, encoding="utf-8") as f:
+                    overrides.update(json.load(f))
+            if MODEL_ROUTES:
+                overrides.update(json.loads(MODEL_ROUTES))
+            _routes = parse_routes(overrides)
+            logger.info(f"model routes: { {stage: route.model for stage, route in _routes.items()} }")
+        return _routes
+
+
+def get_route(stage: str) -> ModelRoute:
+    """
+    단계의 모델 설정을 반환합니다.
+
+    Raises:
+        KeyError: 라우팅 표에 없는 단계일 때
+    """
+    return load_model_routes()[stage]
+
+
+def get_stage_model(stage: str) -> Runnable:
+    """
+    단계에 설정된 채팅 모델을 반환합니다. fallback 이 있으면 기본 모델이 실패하거나
+    timeout 을 넘을 때 다음 모델로 넘어가는 runnable 이며, 단계별로 재사용됩니다.
+
+    Args:
+        stage: 파이프라인 단계 (chat, analyze, categorize 등)
+
+    Returns:
+        Runnable: 채팅 모델 (fallback 포함)
+    """
+    with _lock:
+        model = _models.get(stage)
+        if model is not None:
+            return model
+
+    route = get_route(stage)
+    # With a fallback configured, a timed out or rate limited call moves on instead of retrying in place
+    primary = get_chat_model(
+        route.model, route.temperature, role=stage,
+        max_tokens=route.max_tokens, timeout=route.timeout, max_retries=0 if route.fallbacks else None,
+    )
+    fallbacks = [
+        get_chat_model(fallback, route.temperature, role=stage, max_tokens=route.max_tokens, timeout=route.timeout)
+        for fallback in route.fallbacks
+    ]
+    model = primary.with_fallbacks(fallbacks) if fallbacks else primary
+
+    with _lock:
+        return _models.setdefault(stage, model)
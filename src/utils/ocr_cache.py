@@ -0,0 +1,195 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Union
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true") == "true"
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", "ocr_cache.sqlite3")
+OCR_CACHE_MEMORY_ITEMS = int(os.getenv("OCR_CACHE_MEMORY_ITEMS", "1024"))
+OCR_CACHE_TTL = float(os.getenv("OCR_CACHE_TTL", str(7 * 24 * 3600)))
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+@dataclass
+class UrlValidator:
+    """
+    URL 로 받은 이미지의 HTTP 검증자
+
+    Args :
+        - etag : ETag 헤더
+        - last_modified : Last-Modified 헤더
+        - content_key : 해당 응답 본문의 캐시 키
+    """
+    etag: Union[str, None]
+    last_modified: Union[str, None]
+    content_key: str
+
+
+def content_key(image_bytes: bytes, version: str) -> str:
+    """
+    이미지 바이트와 프롬프트 버전으로 캐시 키를 만듭니다.
+
+    Args:
+        image_bytes: 이미지 원본 바이트
+        version: OCR 프롬프트 버전 (예: "image2text@v1")
+
+    Returns:
+        str: "{version}:{sha256}"
+    """
+    return f"{version}:{hashlib.sha256(image_bytes).hexdigest()}"
+
+
+class OCRCache:
+    """
+    OCR 결과 캐시
+
+    메모리 LRU 1차 캐시와 SQLite 2차 캐시로 구성되며,
+    SQLite 캐시는 TTL 이 지난 항목과 최대 용량을 넘는 오래된 항목을 지웁니다.
+    URL 별 ETag / Last-Modified 를 저장해 변경되지 않은 이미지는 다시 다운로드하지 않습니다.
+    """
+
+    def __init__(
+            self,
+            path: str = OCR_CACHE_PATH,
+            memory_items: int = OCR_CACHE_MEMORY_ITEMS,
+            ttl: float = OCR_CACHE_TTL,
+            max_bytes: int = OCR_CACHE_MAX_BYTES,
+    ):
+        self.path = path
+        self.memory_items = memory_items
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_results ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ocr_results_accessed ON ocr_results (accessed_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_urls ("
+                "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_key TEXT NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _remember(self, key: str, text: str, created_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (text, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Union[str, None]:
+        """
+        캐시된 OCR 결과를 조회합니다. 만료된 항목은 없는 것으로 취급합니다.
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                if now - cached[1] < self.ttl:
+                    self._memory.move_to_end(key)
+                    return cached[0]
+                del self._memory[key]
+
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT text, created_at FROM ocr_results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] >= self.ttl:
+                conn.execute("DELETE FROM ocr_results WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE ocr_results SET accessed_at = ? WHERE key = ?", (now, key))
+
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def set(self, key: str, text: str) -> None:
+        """
+        OCR 결과를 저장하고, 필요하면 만료 / 용량 초과 항목을 정리합니다.
+        """
+        now = time.time()
+        size = len(text.encode("utf-8"))
+        self._remember(key, text, now)
+
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_results (key, text, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, text, size, now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM ocr_results WHERE created_at <= ?", (now - self.ttl,))
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Drop least recently used rows until the store fits again
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM ocr_results ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM ocr_results WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.info(f"ocr cache evicted {evicted} entries")
+
+    def get_url(self, url: str) -> Union[UrlValidator, None]:
+        """
+        URL 에 대해 마지막으로 받은 ETag / Last-Modified 와 본문 캐시 키를 조회합니다.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, content_key FROM ocr_urls WHERE url = ?", (url,)
+            ).fetchone()
+        return UrlValidator(*row) if row else None
+
+    def set_url(self, url: str, validator: UrlValidator) -> None:
+        """
+        URL 의 ETag / Last-Modified 와 본문 캐시 키를 저장합니다. 검증자가 없으면 저장하지 않습니다.
+        """
+        if not validator.etag and not validator.last_modified:
+            return
+
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_urls (url, etag, last_modified, content_key, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (url, validator.etag, validator.last_modified, validator.content_key, time.time()),
+            )
+
+
+_cache: Union[OCRCache, None] = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> Union[OCRCache, None]:
+    """
+    프로세스 전역 OCR 캐시를 반환합니다. OCR_CACHE_ENABLED=false 이면 None 입니다.
+    """
+    global _cache
+    if not OCR_CACHE_ENABLED:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = OCRCache()
+        return _cache
@@ -0,0 +1,124 @@
+import logging
+import os
+from io import BytesIO
+from typing import Union
+from dotenv import load_dotenv
+from PIL import Image, ImageOps
+from src.model.utils_model import PreparedImage
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "1568"))
+IMAGE_GRAYSCALE = os.getenv("IMAGE_GRAYSCALE", "false") == "true"
+IMAGE_CONTRAST_STRETCH = os.getenv("IMAGE_CONTRAST_STRETCH", "false") == "true"
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "JPEG").upper()
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+# "auto" 이면 결과 크기로 결정, "low" / "high" 이면 고정
+IMAGE_DETAIL = os.getenv("IMAGE_DETAIL", "auto")
+# low detail 은 512px 로 줄여서 보내므로, 이 크기 이하의 이미지는 low 로도 손실이 없습니다.
+IMAGE_LOW_DETAIL_MAX_SIDE = int(os.getenv("IMAGE_LOW_DETAIL_MAX_SIDE", "512"))
+
+MIME_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp", "GIF": "image/gif"}
+
+# 전처리 설정이 바뀌면 OCR 결과도 달라지므로 캐시 키에 포함합니다.
+PREPROCESS_VERSION = (
+    f"pre:{IMAGE_MAX_SIDE}:{IMAGE_FORMAT}:{IMAGE_QUALITY}:"
+    f"{int(IMAGE_GRAYSCALE)}{int(IMAGE_CONTRAST_STRETCH)}:{IMAGE_DETAIL}"
+)
+
+
+def sniff_image_format(header: bytes) -> Union[str, None]:
+    """
+    파일 앞부분의 매직 바이트로 이미지 형식을 판별합니다.
+
+    Args:
+        header: 이미지 데이터의 앞 12바이트 이상
+
+    Returns:
+        "JPEG" / "PNG" / "WEBP" / "GIF", 알 수 없으면 None
+    """
+    if header.startswith(b"\xff\xd8\xff"):
+        return "JPEG"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "PNG"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "WEBP"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "GIF"
+    return None
+
+
+def _pick_detail(width: int, height: int) -> str:
+    if IMAGE_DETAIL in ("low", "high"):
+        return IMAGE_DETAIL
+    return "low" if max(width, height) <= IMAGE_LOW_DETAIL_MAX_SIDE else "high"
+
+
+def preprocess_image(
+        image_bytes: bytes,
+        max_side: int = IMAGE_MAX_SIDE,
+        grayscale: bool = IMAGE_GRAYSCALE,
+        contrast_stretch: bool = IMAGE_CONTRAST_STRETCH,
+        image_format: str = IMAGE_FORMAT,
+        quality: int = IMAGE_QUALITY,
+) -> PreparedImage:
+    """
+    vision 요청 전에 이미지를 전처리합니다.
+    EXIF 회전 보정 -> (선택) 흑백 변환 / 대비 보정 -> 긴 변 기준 축소 -> JPEG / WEBP 재인코딩 순으로 처리합니다.
+    재인코딩 결과가 원본보다 크고 원본을 그대로 쓸 수 있으면 원본을 보냅니다.
+
+    Args:
+        image_bytes: 원본 이미지 바이트
+        max_side: 긴 변의 최대 픽셀
+        grayscale: 흑백 변환 여부
+        contrast_stretch: 대비 보정 여부
+        image_format: 재인코딩 형식 (JPEG / WEBP)
+        quality: 재인코딩 품질
+
+    Returns:
+        PreparedImage
+    """
+    original_format = sniff_image_format(image_bytes[:12])
+
+    try:
+        img = Image.open(BytesIO(image_bytes))
+        img.load()
+    except Exception as e:
+        # Pillow 가 열지 못하는 이미지는 원본 그대로, 판별한 형식으로 보냅니다.
+        logger.warning(f"failed to preprocess image, sending original: {e}")
+        return PreparedImage(image_bytes, MIME_TYPES.get(original_format, "image/jpeg"), 0, 0, "high")
+
+    orientation = img.getexif().get(0x0112, 1)
+    img = ImageOps.exif_transpose(img)
+    changed = orientation != 1
+
+    if grayscale:
+        img = ImageOps.grayscale(img)
+        changed = True
+    if contrast_stretch:
+        img = ImageOps.autocontrast(img.convert("L") if grayscale else img.convert("RGB"), cutoff=1)
+        changed = True
+
+    if max(img.size) > max_side:
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        changed = True
+
+    # JPEG 는 알파 채널이 없으므로 흰 배경에 합성합니다.
+    if img.mode in ("RGBA", "LA", "P"):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        img = background
+    elif img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    buffer = BytesIO()
+    img.save(buffer, format=image_format, quality=quality, optimize=True)
+    encoded = buffer.getvalue()
+    width, height = img.size
+
+    if not changed and original_format in MIME_TYPES and len(image_bytes) <= len(encoded):
+        return PreparedImage(image_bytes, MIME_TYPES[original_format], width, height, _pick_detail(width, height))
+
+    return PreparedImage(encoded, MIME_TYPES[image_format], width, height, _pick_detail(width, height))
@@ -0,0 +1,153 @@
+import os
+import re
+import threading
+from typing import Dict
+from dotenv import load_dotenv
+from src.model.utils_model import TextScore
+
+load_dotenv()
+
+PREVALIDATION_ENABLED = os.getenv("PREVALIDATION_ENABLED", "true") == "true"
+# src/benchmark/prevalidation_report.py 로 라벨된 fixture 에서 튜닝한 값 (accept 는 0.70 에서 여유를 둠)
+PREVALIDATION_REJECT_BELOW = float(os.getenv("PREVALIDATION_REJECT_BELOW", "0.05"))
+PREVALIDATION_ACCEPT_ABOVE = float(os.getenv("PREVALIDATION_ACCEPT_ABOVE", "0.9"))
+PREVALIDATION_MIN_CHARS = int(os.getenv("PREVALIDATION_MIN_CHARS", "2"))
+
+ACCEPT = "accept"
+REJECT = "reject"
+DEFER = "defer"
+
+# 로컬 경로에 파일이 없을 때 image2text 가 돌려주는 문자열 (OCR / 다운로드 실패는 예외로 던져져 재시도됩니다)
+OCR_ERROR_PREFIXES = ("invalid file path",)
+# vision 모델이 텍스트를 찾지 못했을 때의 응답
+OCR_REFUSAL_MARKERS = ("추출할 수 없", "텍스트가 없", "읽을 수 없", "i'm sorry", "i can't", "unable to")
+
+_MATH_SYMBOLS = set("+-*/=()[]{}^_\\.,<>|!':;%~$&?" "×÷±≤≥≠≈∞√∫∑∏πθαβγΔ·°′″→⇒⇔∴∵∈∉⊂∪∩")
+_OPERATOR = re.compile(r"[=+\-*/×÷^<>≤≥]|\\(frac|sqrt|times|div|cdot|le|ge)")
+_REPEAT_RUN = re.compile(r"(\S)\1{3,}")
+_LATEX_ENVIRONMENT = re.compile(r"\\(begin|end)\{")
+
+_metrics_lock = threading.Lock()
+_metrics = {ACCEPT: 0, REJECT: 0, DEFER: 0, "avoided_llm_calls": 0}
+
+
+def _is_text_char(char: str) -> bool:
+    return char.isalnum() or char.isspace() or char in _MATH_SYMBOLS
+
+
+def latex_balanced(text: str) -> bool:
+    """
+    중괄호, \\left / \\right, \\begin / \\end, $ 의 짝이 맞는지 확인합니다.
+    """
+    depth = 0
+    for char in text.replace("\\{", "").replace("\\}", ""):
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth < 0:
+                return False
+    if depth:
+        return False
+
+    if text.count("\\left") != text.count("\\right"):
+        return False
+    environments = _LATEX_ENVIRONMENT.findall(text)
+    if environments.count("begin") != environments.count("end"):
+        return False
+    return text.replace("\\$", "").count("$") % 2 == 0
+
+
+def text_features(text: str) -> Dict[str, float]:
+    """
+    사전 검증에 쓰는 특징값을 계산합니다.
+
+    Returns:
+        {"length", "noise_ratio", "repeat_ratio", "latex_balanced", "math_signal"}
+    """
+    visible = [char for char in text if not char.isspace()]
+    length = len(visible)
+    if not length:
+        return {"length": 0, "noise_ratio": 1.0, "repeat_ratio": 0.0, "latex_balanced": 1.0, "math_signal": 0.0}
+
+    noise = sum(1 for char in visible if not _is_text_char(char))
+    repeated = sum(len(match.group(0)) for match in _REPEAT_RUN.finditer(text))
+    has_digit = any(char.isdigit() for char in visible)
+    return {
+        "length": length,
+        "noise_ratio": noise / length,
+        "repeat_ratio": repeated / length,
+        "latex_balanced": 1.0 if latex_balanced(text) else 0.0,
+        "math_signal": 1.0 if has_digit and _OPERATOR.search(text) else 0.0,
+    }
+
+
+def score_text(text: str) -> float:
+    """
+    OCR 텍스트가 채점에 쓸 수 있을 정도로 읽히는지를 0 ~ 1 점수로 계산합니다.
+    짧을수록, 알 수 없는 문자와 반복 문자가 많을수록, LaTeX 짝이 맞지 않을수록, 수식이 없을수록 낮아집니다.
+    """
+    lowered = text.strip().lower()
+    if lowered.startswith(OCR_ERROR_PREFIXES) or any(marker in lowered for marker in OCR_REFUSAL_MARKERS):
+        return 0.0
+
+    features = text_features(text)
+    if features["length"] < PREVALIDATION_MIN_CHARS:
+        return 0.0
+
+    # Short answers like "x=2" are legitimate, only very short text is discounted
+    score = min(1.0, features["length"] / 12)
+    score *= (1 - features["noise_ratio"]) ** 2
+    score *= 1 - features["repeat_ratio"]
+    score *= 1.0 if features["latex_balanced"] else 0.7
+    score *= 1.0 if features["math_signal"] else 0.6
+    return round(score, 3)
+
+
+def prevalidate_text(
+        text: str,
+        reject_below: float = PREVALIDATION_REJECT_BELOW,
+        accept_above: float = PREVALIDATION_ACCEPT_ABOVE,
+) -> TextScore:
+    """
+    LLM 검증 전에 로컬에서 명확한 경우만 판단합니다.
+
+    Args:
+        text: 이미지로부터 추출된 텍스트
+        reject_below: 이 점수 미만이면 반려
+        accept_above: 이 점수 이상이면 통과
+
+    Returns:
+        TextScore (애매하면 decision 이 "defer")
+    """
+    score = score_text(text)
+    if score < reject_below:
+        return TextScore(REJECT, score, "blank or unreadable text")
+    if score >= accept_above:
+        return TextScore(ACCEPT, score, "clean math text")
+    return TextScore(DEFER, score)
+
+
+def record_decision(decision: str, skipped_calls: int = 2) -> None:
+    """
+    사전 검증 결과를 metrics 에 기록합니다.
+
+    Args:
+        decision: ACCEPT / REJECT / DEFER
+        skipped_calls: 이 결과로 건너뛴 LLM 호출 수 (chain 모드는 modify + validate 2번, DEFER 는 항상 0)
+    """
+    with _metrics_lock:
+        _metrics[decision] += 1
+        if decision != DEFER:
+            _metrics["avoided_llm_calls"] += skipped_calls
+
+
+def get_prevalidation_metrics() -> Dict[str, float]:
+    """
+    사전 검증 결과별 건수와 LLM 호출을 건너뛴 비율을 반환합니다.
+    """
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    total = metrics[ACCEPT] + metrics[REJECT] + metrics[DEFER]
+    metrics["short_circuit_ratio"] = round((metrics[ACCEPT] + metrics[REJECT]) / total, 3) if total else 0.0
+    return metrics
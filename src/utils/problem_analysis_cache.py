@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict
+from typing import Awaitable, Callable, Dict, List, Sequence, Set, Tuple, Union
+from dotenv import load_dotenv
+from boto3.dynamodb.conditions import Key
+from src.model.utils_model import AnalysisSummaryEntry
+from src.utils.ddb import assignment_submits_table
+from src.utils.ddb_query import aiter_query
+from src.utils.llm_governor import BACKGROUND, llm_lane
+from src.utils.map_reduce_summary import get_analysis_summarizer
+from src.utils.shared_cache import CacheBackend, create_cache_backend
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+PROBLEM_ANALYSIS_CACHE_BACKEND = os.getenv("PROBLEM_ANALYSIS_CACHE_BACKEND", "sqlite")
+PROBLEM_ANALYSIS_CACHE_PATH = os.getenv("PROBLEM_ANALYSIS_CACHE_PATH", "problem_analysis.sqlite3")
+PROBLEM_ANALYSIS_CACHE_MAX_ITEMS = int(os.getenv("PROBLEM_ANALYSIS_CACHE_MAX_ITEMS", "1024"))
+# 이 시간 동안은 제출물을 다시 확인하지 않고 저장된 요약을 그대로 반환합니다.
+PROBLEM_ANALYSIS_FRESH_TTL = float(os.getenv("PROBLEM_ANALYSIS_FRESH_TTL", "300"))
+# 오래된 요약이라도 이 시간 동안은 먼저 반환하고 백그라운드에서 갱신합니다. (stale-while-revalidate)
+PROBLEM_ANALYSIS_TTL = float(os.getenv("PROBLEM_ANALYSIS_TTL", str(7 * 24 * 3600)))
+
+Items = List[Tuple[str, str]]
+
+
+def compute_watermark(items: Sequence[Tuple[str, str]]) -> str:
+    """
+    요약에 포함되는 제출물들의 지문을 만듭니다.
+    제출 시각이 저장되지 않으므로, 제출물 수와 (키, 분석) 해시로 새 제출물 / 다시 분석된 제출물을 감지합니다.
+
+    Returns:
+        str: "{제출물 수}:{sha256}"
+    """
+    digest = hashlib.sha256()
+    for key, text in sorted(items):
+        digest.update(key.encode("utf-8"))
+        digest.update(b"\x1f")
+        digest.update(hashlib.sha256((text or "").encode("utf-8")).digest())
+    return f"{len(items)}:{digest.hexdigest()}"
+
+
+async def load_analyses(problem_id: str) -> Items:
+    """
+    문제의 모든 제출물 분석을 (제출물 키, 분석) 으로 읽습니다.
+    """
+    return [
+        (f"{item['PK']}#{item['SK']}", item.get('Analysis', ""))
+        async for item in aiter_query(
+            assignment_submits_table(),
+            fields=("PK", "SK", "Analysis"),
+            IndexName="ProblemID-index",
+            KeyConditionExpression=Key('ProblemID').eq(problem_id),
+        )
+    ]
+
+
+async def summarize_analyses(items: Items) -> str:
+    return await get_analysis_summarizer().summarize(items)
+
+
+class ProblemAnalysisCache:
+    """
+    문제 분석 요약 저장소
+
+    요약은 제출물 지문 (watermark) 과 함께 저장됩니다.
+    - fresh_until 이전: 저장된 요약을 바로 반환합니다.
+    - fresh_until 이후: 저장된 요약을 바로 반환하고, 백그라운드에서 제출물을 다시 읽어 지문이 바뀌었을 때만 다시 요약합니다.
+    - 없음: 요약을 계산해 반환합니다.
+    같은 문제의 계산 / 갱신은 프로세스 안에서 하나만 실행되고, 동시에 들어온 요청은 그 결과를 기다립니다. (single-flight)
+    """
+
+    def __init__(
+            self,
+            backend: CacheBackend,
+            load: Callable[[str], Awaitable[Items]] = load_analyses,
+            summarize: Callable[[Items], Awaitable[str]] = summarize_analyses,
+            fresh_ttl: float = PROBLEM_ANALYSIS_FRESH_TTL,
+            ttl: float = PROBLEM_ANALYSIS_TTL,
+    ):
+        self.backend = backend
+        self.load = load
+        self.summarize = summarize
+        self.fresh_ttl = fresh_ttl
+        self.ttl = ttl
+        self._flights: Dict[str, asyncio.Task] = {}
+        # Background refreshes are referenced here so they are not garbage collected mid-flight
+        self._background: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self._metrics = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "unchanged": 0,
+            "summaries": 0,
+            "refresh_errors": 0,
+        }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._metrics[key] += 1
+
+    @staticmethod
+    def _key(problem_id: str) -> str:
+        return f"problem_analysis:{problem_id}"
+
+    def _read(self, problem_id: str) -> Union[AnalysisSummaryEntry, None]:
+        cached = self.backend.get(self._key(problem_id))
+        return AnalysisSummaryEntry(**json.loads(cached)) if cached else None
+
+    def _write(self, problem_id: str, entry: AnalysisSummaryEntry) -> None:
+        self.backend.set(self._key(problem_id), json.dumps(asdict(entry), ensure_ascii=False), self.ttl)
+
+    async def _compute(self, problem_id: str, previous: Union[AnalysisSummaryEntry, None]) -> AnalysisSummaryEntry:
+        items = await self.load(problem_id)
+        watermark = compute_watermark(items)
+        now = time.time()
+
+        if previous is not None and previous.watermark == watermark:
+            # No new or re-analyzed submissions, only extend the freshness window
+            self._count("unchanged")
+            entry = AnalysisSummaryEntry(previous.summary, watermark, now, now + self.fresh_ttl)
+        else:
+            self._count("summaries")
+            summary = await self.summarize(items)
+            entry = AnalysisSummaryEntry(summary, watermark, now, now + self.fresh_ttl)
+
+        await asyncio.to_thread(self._write, problem_id, entry)
+        return entry
+
+    def _flight(self, problem_id: str, previous: Union[AnalysisSummaryEntry, None]) -> Tuple[asyncio.Task, bool]:
+        task = self._flights.get(problem_id)
+        if task is not None:
+            return task, False
+
+        task = asyncio.ensure_future(self._compute(problem_id, previous))
+        self._flights[problem_id] = task
+        task.add_done_callback(lambda done: self._land(problem_id, done))
+        return task, True
+
+    def _land(self, problem_id: str, task: asyncio.Task) -> None:
+        if self._flights.get(problem_id) is task:
+            del self._flights[problem_id]
+
+    def _log_refresh(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._count("refresh_errors")
+            logger.error(f"problem analysis refresh failed: {task.exception()}")
+
+    async def get(self, problem_id: str) -> str:
+        """
+        문제 분석 요약을 반환합니다.
+
+        Args:
+            problem_id: 문제 id
+
+        Returns:
+            str: 문제 분석
+        """
+        entry = await asyncio.to_thread(self._read, problem_id)
+
+        if entry is not None and entry.fresh_until > time.time():
+            self._count("hits")
+            return entry.summary
+
+        if entry is not None:
+            # Serve the stale summary now, revalidate once in the background
+            # (the task copies this context, so its LLM calls use the background lane)
+            self._count("stale_hits")
+            with llm_lane(BACKGROUND):
+                task, leader = self._flight(problem_id, entry)
+            if leader:
+                self._count("refreshes")
+                self._background.add(task)
+                task.add_done_callback(self._log_refresh)
+            return entry.summary
+
+        # A miss is computed in the caller's lane, the teacher is waiting for it
+        task, leader = self._flight(problem_id, None)
+        self._count("misses" if leader else "coalesced")
+        # shield: a disconnecting client must not cancel the computation others are waiting on
+        return (await asyncio.shield(task)).summary
+
+    def mark_stale(self, problem_id: str) -> None:
+        """
+        제출물의 분석이 바뀌었을 때 호출합니다. 다음 조회는 저장된 요약을 반환하면서 바로 갱신을 시작합니다.
+        """
+        entry = self._read(problem_id)
+        if entry is None or entry.fresh_until <= time.time():
+            return
+        entry.fresh_until = 0
+        self._write(problem_id, entry)
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        적중 / 오래된 적중 / 미스 / 합쳐진 요청 / 갱신 / 재요약 수를 반환합니다.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics["in_flight"] = len(self._flights)
+        return metrics
+
+
+_cache: Union[ProblemAnalysisCache, None] = None
+_cache_lock = threading.Lock()
+
+
+def get_problem_analysis_cache() -> ProblemAnalysisCache:
+    """
+    프로세스 전역 문제 분석 저장소를 반환합니다.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            backend = create_cache_backend(
+                PROBLEM_ANALYSIS_CACHE_BACKEND, PROBLEM_ANALYSIS_CACHE_PATH, PROBLEM_ANALYSIS_CACHE_MAX_ITEMS
+            )
+            _cache = ProblemAnalysisCache(backend)
+        return _cache
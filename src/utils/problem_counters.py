@@ -0,0 +1,229 @@
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple, Union
+from botocore.exceptions import ClientError
+from dotenv import load_dotenv
+from src.utils.ddb import problems_table
+from src.utils.problem_repository import get_problem_repository
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+# 같은 문제에 대한 증가분을 모아서 쓰는 주기 (초), 0 이면 즉시 씁니다.
+COUNTER_FLUSH_INTERVAL = float(os.getenv("COUNTER_FLUSH_INTERVAL", "1"))
+# 모인 문제 수가 이 값을 넘으면 주기를 기다리지 않고 씁니다.
+COUNTER_MAX_PENDING = int(os.getenv("COUNTER_MAX_PENDING", "256"))
+# 작업이 완료되기 전에 자기 증가분이 쓰이기를 기다리는 최대 시간 (초)
+COUNTER_WRITE_WAIT = float(os.getenv("COUNTER_WRITE_WAIT", str(COUNTER_FLUSH_INTERVAL + 5)))
+
+CORRECT_REASON = "정답"
+
+ProblemKey = Tuple[str, str]
+
+
+class CounterDelta:
+    """
+    한 문제에 대해 모인 증가분
+
+    Args :
+        - incorrect : IncorrectCount 증가분
+        - reasons : 이유별 Reasons 증가분
+        - waiters : 증가분이 쓰이면 세워지는 이벤트들 (record 호출마다 하나)
+    """
+
+    def __init__(self):
+        self.incorrect = 0
+        self.reasons: Dict[str, int] = defaultdict(int)
+        self.waiters: List[threading.Event] = []
+
+    def add(self, reason: str, count: int = 1) -> None:
+        self.reasons[reason] += count
+        if reason != CORRECT_REASON:
+            self.incorrect += count
+
+    def merge(self, other: "CounterDelta") -> None:
+        self.incorrect += other.incorrect
+        for reason, count in other.reasons.items():
+            self.reasons[reason] += count
+        self.waiters.extend(other.waiters)
+
+
+def apply_counter_delta(table, aca_id: str, problem_id: str, delta: CounterDelta) -> None:
+    """
+    IncorrectCount 와 Reasons.{reason} 을 읽지 않고 ADD 로 한 번에 증가시킵니다.
+    Reasons 맵이 아직 없는 문제는 빈 맵을 만든 뒤 다시 시도합니다.
+
+    Args:
+        table: problems Table
+        aca_id: 학원 id (PK)
+        problem_id: 문제 id
+        delta: 증가분
+    """
+    key = {"PK": aca_id, "SK": f"PROBLEM#{problem_id}"}
+    names = {}
+    values = {}
+    actions = []
+    if delta.incorrect:
+        actions.append("IncorrectCount :inc")
+        values[":inc"] = delta.incorrect
+    for i, (reason, count) in enumerate(delta.reasons.items()):
+        # Reason labels contain spaces and slashes, so they always go through placeholders
+        names[f"#r{i}"] = reason
+        values[f":r{i}"] = count
+        actions.append(f"Reasons.#r{i} :r{i}")
+    if not actions:
+        return
+
+    params = {
+        "Key": key,
+        "UpdateExpression": "ADD " + ", ".join(actions),
+        "ExpressionAttributeValues": values,
+    }
+    if names:
+        params["ExpressionAttributeNames"] = names
+
+    try:
+        table.update_item(**params)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") != "ValidationException" or not names:
+            raise
+        # Nested ADD needs the parent map to exist
+        table.update_item(
+            Key=key,
+            UpdateExpression="SET Reasons = if_not_exists(Reasons, :empty)",
+            ExpressionAttributeValues={":empty": {}},
+        )
+        table.update_item(**params)
+
+
+class CounterWriter:
+    """
+    문제 카운터 증가분을 짧은 주기로 모아서 쓰는 writer
+
+    같은 문제에 대한 여러 제출은 한 번의 update_item 으로 합쳐지며,
+    쓰기에 실패한 증가분은 다음 flush 에 다시 합쳐서 씁니다.
+    record 가 돌려주는 이벤트를 기다리면 프로세스가 죽기 전에 증가분이 쓰였는지 확인할 수 있습니다.
+    """
+
+    def __init__(
+            self,
+            table=None,
+            flush_interval: float = COUNTER_FLUSH_INTERVAL,
+            max_pending: int = COUNTER_MAX_PENDING,
+            on_flush: Callable[[str, str], None] = None,
+    ):
+        self._table = table
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.on_flush = on_flush
+        self._pending: Dict[ProblemKey, CounterDelta] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread: Union[threading.Thread, None] = None
+
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = problems_table()
+        return self._table
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="counter-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def record(self, aca_id: str, problem_id: str, reason: str) -> threading.Event:
+        """
+        제출 한 건의 분류 결과를 카운터에 반영합니다.
+
+        Args:
+            aca_id: 학원 id
+            problem_id: 문제 id
+            reason: 분류된 이유 ("정답" 이면 IncorrectCount 는 늘리지 않음)
+
+        Returns:
+            threading.Event: 이 증가분이 DynamoDB 에 쓰이면 세워지는 이벤트
+        """
+        written = threading.Event()
+        if self.flush_interval <= 0 or self._closed:
+            delta = CounterDelta()
+            delta.add(reason)
+            self._write(aca_id, problem_id, delta)
+            written.set()
+            return written
+
+        with self._lock:
+            delta = self._pending.setdefault((aca_id, problem_id), CounterDelta())
+            delta.add(reason)
+            delta.waiters.append(written)
+            pending = len(self._pending)
+            self._ensure_thread()
+        if pending >= self.max_pending:
+            self._wakeup.set()
+        return written
+
+    def _write(self, aca_id: str, problem_id: str, delta: CounterDelta) -> None:
+        apply_counter_delta(self.table, aca_id, problem_id, delta)
+        if self.on_flush:
+            self.on_flush(aca_id, problem_id)
+
+    def flush(self) -> int:
+        """
+        모인 증가분을 모두 씁니다.
+
+        Returns:
+            int: 쓴 문제 수
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+
+            written = 0
+            for (aca_id, problem_id), delta in pending.items():
+                try:
+                    self._write(aca_id, problem_id, delta)
+                    written += 1
+                    for waiter in delta.waiters:
+                        waiter.set()
+                except Exception as e:
+                    logger.error(f"failed to update counters for {aca_id}/{problem_id}, retrying next flush: {e}")
+                    with self._lock:
+                        self._pending.setdefault((aca_id, problem_id), CounterDelta()).merge(delta)
+            return written
+
+    def close(self) -> None:
+        """
+        남은 증가분을 쓰고 writer 를 멈춥니다. 이후 record 는 즉시 씁니다.
+        """
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(self.flush_interval + 5)
+        self.flush()
+
+
+_writer: Union[CounterWriter, None] = None
+_writer_lock = threading.Lock()
+
+
+def get_counter_writer() -> CounterWriter:
+    """
+    프로세스 전역 카운터 writer 를 반환합니다. 쓴 문제는 문제 캐시에서 무효화합니다.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = CounterWriter(on_flush=lambda aca_id, problem_id: get_problem_repository().invalidate(aca_id, problem_id))
+            atexit.register(_writer.close)
+        return _writer
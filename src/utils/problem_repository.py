@@ -0,0 +1,188 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple, Union
+from dotenv import load_dotenv
+from src.utils.ddb import problems_table
+from src.utils.ddb_executor import run_ddb
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+PROBLEM_CACHE_MAX_ITEMS = int(os.getenv("PROBLEM_CACHE_MAX_ITEMS", "2048"))
+PROBLEM_CACHE_TTL = float(os.getenv("PROBLEM_CACHE_TTL", "30"))
+# 채팅 프롬프트에 필요한 문제 필드 (카운터 맵은 가져오지 않습니다)
+CHAT_PROBLEM_FIELDS = tuple(os.getenv("CHAT_PROBLEM_FIELDS", "Name,Question,Choices,Answer,Solution").split(","))
+
+CacheKey = Tuple[str, str, Union[Tuple[str, ...], None]]
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.item: Union[Dict[str, Any], None] = None
+        self.error: Union[Exception, None] = None
+
+
+class ProblemRepository:
+    """
+    problems 테이블 조회 캐시
+
+    (acaId, problemId, projection) 단위의 LRU + TTL 캐시이며,
+    같은 키를 동시에 조회하면 DynamoDB 요청은 한 번만 보내고 나머지는 결과를 기다립니다. (single-flight)
+    문제를 수정하는 쪽은 invalidate 를 호출해야 합니다.
+    """
+
+    def __init__(self, table=None, max_items: int = PROBLEM_CACHE_MAX_ITEMS, ttl: float = PROBLEM_CACHE_TTL):
+        self._table = table
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items: "OrderedDict[CacheKey, tuple]" = OrderedDict()
+        self._flights: Dict[CacheKey, _Flight] = {}
+        # Bumped on every invalidate so loads that started earlier do not store stale items
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0, "loads": 0, "coalesced": 0, "invalidations": 0}
+
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = problems_table()
+        return self._table
+
+    def _lookup(self, key: CacheKey) -> Union[Dict[str, Any], None]:
+        with self._lock:
+            cached = self._items.get(key)
+            if cached is not None and cached[1] > time.monotonic():
+                self._items.move_to_end(key)
+                self._metrics["hits"] += 1
+                return cached[0]
+            if cached is not None:
+                del self._items[key]
+            return None
+
+    def _load(self, aca_id: str, problem_id: str, fields: Union[Tuple[str, ...], None], consistent: bool) -> Dict[str, Any]:
+        params = {"Key": {"PK": aca_id, "SK": f"PROBLEM#{problem_id}"}}
+        if fields:
+            # Name 같은 예약어도 쓸 수 있도록 placeholder 로 지정합니다.
+            names = {f"#f{i}": field for i, field in enumerate(fields)}
+            params["ProjectionExpression"] = ", ".join(names)
+            params["ExpressionAttributeNames"] = names
+        if consistent:
+            params["ConsistentRead"] = True
+        return self.table.get_item(**params).get("Item", {})
+
+    def get(
+            self,
+            aca_id: str,
+            problem_id: str,
+            fields: Union[Tuple[str, ...], None] = None,
+            refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        문제 아이템을 조회합니다. 없는 문제는 빈 dict 이며 캐시하지 않습니다.
+
+        Args:
+            aca_id: 학원 id (PK)
+            problem_id: 문제 id
+            fields: 가져올 필드 (ProjectionExpression), 없으면 전체
+            refresh: 캐시를 건너뛰고 강한 일관성 읽기로 다시 읽을지 여부 (읽은 값으로 캐시를 갱신)
+
+        Returns:
+            problems 아이템 dict (캐시와 공유되므로 수정하지 마세요)
+        """
+        key = (aca_id, problem_id, tuple(fields) if fields else None)
+        if not refresh:
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+
+        with self._lock:
+            flight = None if refresh else self._flights.get(key)
+            if flight is not None:
+                self._metrics["coalesced"] += 1
+                leader = False
+            else:
+                flight = _Flight()
+                if not refresh:
+                    self._flights[key] = flight
+                self._metrics["misses"] += 1
+                leader = True
+            epoch = self._epoch
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.item
+
+        try:
+            item = self._load(aca_id, problem_id, key[2], consistent=refresh)
+            flight.item = item
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._metrics["loads"] += 1
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if flight.error is None and flight.item and epoch == self._epoch:
+                    self._items[key] = (flight.item, time.monotonic() + self.ttl)
+                    self._items.move_to_end(key)
+                    while len(self._items) > self.max_items:
+                        self._items.popitem(last=False)
+            flight.done.set()
+        return item
+
+    async def aget(
+            self,
+            aca_id: str,
+            problem_id: str,
+            fields: Union[Tuple[str, ...], None] = None,
+            refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        get 의 비동기 버전. 캐시 적중은 이벤트 루프에서 바로 반환하고, 미스만 DynamoDB executor 로 보냅니다.
+        """
+        if not refresh:
+            cached = self._lookup((aca_id, problem_id, tuple(fields) if fields else None))
+            if cached is not None:
+                return cached
+        return await run_ddb(self.get, aca_id, problem_id, fields, refresh)
+
+    def invalidate(self, aca_id: str, problem_id: str) -> None:
+        """
+        문제의 모든 projection 캐시를 지웁니다. 문제를 수정한 뒤 호출합니다.
+        """
+        with self._lock:
+            self._epoch += 1
+            self._metrics["invalidations"] += 1
+            for key in [key for key in self._items if key[0] == aca_id and key[1] == problem_id]:
+                del self._items[key]
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        캐시 적중 / 미스 / 합쳐진 요청 수를 반환합니다.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["items"] = len(self._items)
+        return metrics
+
+
+_repository: Union[ProblemRepository, None] = None
+_repository_lock = threading.Lock()
+
+
+def get_problem_repository() -> ProblemRepository:
+    """
+    프로세스 전역 문제 저장소를 반환합니다.
+    """
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = ProblemRepository()
+        return _repository
@@ -0,0 +1,269 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Generator, List, Tuple, Type, Union
+from dotenv import load_dotenv
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models import BaseChatModel
+from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
+from langchain_core.prompts import BasePromptTemplate, ChatPromptTemplate, PromptTemplate
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel
+import src.model.prompts as prompts
+from src.model.outputParser import *
+from src.utils.llm_governor import governed
+from src.utils.llm_usage import record_message_usage
+from src.utils.token_count import fit_prompt
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+# 모델의 JSON schema structured output 을 사용할지 여부 (지원하지 않는 모델은 텍스트 파싱으로 대체)
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "true") == "true"
+# 파싱 실패 시 응답만 고쳐 달라고 다시 요청하는 최대 횟수
+STRUCTURED_REPAIR_ATTEMPTS = int(os.getenv("STRUCTURED_REPAIR_ATTEMPTS", "1"))
+
+
+@dataclass(frozen=True)
+class PromptSpec:
+    """
+    프롬프트 정의
+
+    Args :
+        - name : 프롬프트 이름
+        - version : 프롬프트 버전 (템플릿을 바꾸면 함께 올립니다)
+        - template : 프롬프트 템플릿
+        - input_variables : 템플릿 입력 변수
+        - output_model : 응답을 파싱할 pydantic 모델 (없으면 raw text)
+        - system : 요청마다 바뀌지 않는 system 프롬프트 (지침, 출력 형식, 문제 / 솔루션)
+                   provider 프롬프트 캐시가 적중하도록 template 앞에 별도 메시지로 보냅니다.
+    """
+    name: str
+    version: str
+    template: str
+    input_variables: Tuple[str, ...]
+    output_model: Union[Type[BaseModel], None] = None
+    system: str = ""
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """
+    format_instructions 가 미리 렌더링된 프롬프트
+
+    Args :
+        - spec : PromptSpec
+        - prompt : format_instructions 가 포함된 프롬프트 (텍스트 파싱용)
+        - structured_prompt : format_instructions 를 뺀 프롬프트 (structured output 용)
+        - parser : PydanticOutputParser
+        - format_instructions : 렌더링된 format_instructions
+    """
+    spec: PromptSpec
+    prompt: Union[BasePromptTemplate, None]
+    structured_prompt: Union[BasePromptTemplate, None]
+    parser: Union[PydanticOutputParser, None]
+    format_instructions: str
+
+
+PROMPT_SPECS: List[PromptSpec] = [
+    PromptSpec("chat", "v3", prompts.chat_template, ("problem", "submission", "history", "question"), ChatResult, prompts.chat_system_template),
+    PromptSpec("chat_stream", "v3", prompts.chat_stream_template, ("problem", "submission", "history", "question"), system=prompts.chat_stream_system_template),
+    PromptSpec("chat_summary", "v1", prompts.chat_summary_template, ("summary", "history")),
+    PromptSpec("analysis", "v2", prompts.analysis_template, ("explanation", "solution"), AnalysisResult, prompts.analysis_system_template),
+    PromptSpec("categorize", "v2", prompts.categorize_template, ("analysis_result", "categories"), ReasonResult, prompts.categorize_system_template),
+    PromptSpec("modify", "v2", prompts.modify_template, ("text",), ModifyResult, prompts.modify_system_template),
+    PromptSpec("validate", "v2", prompts.validate_template, ("text",), ValidResult, prompts.validate_system_template),
+    PromptSpec("generate", "v1", prompts.generate_template, ("problem", "reasons"), GenerateResult),
+    PromptSpec("title", "v1", prompts.title_template, ("problem", "generate_result"), TitleResult),
+    PromptSpec("new_generate", "v1", prompts.new_generate_template, ("problem", "reasons"), GenerateResult),
+    PromptSpec("verify", "v1", prompts.verify_template, ("new_problem",), VerifyResult),
+    PromptSpec("assignment_analysis", "v1", prompts.assignment_analysis_template, ("assignment_submissions",), AssignmentAnalysisResult),
+    PromptSpec("problem_analysis", "v1", prompts.problem_analysis_template, ("analysis",), ProblemAnalysisResult),
+    PromptSpec("problem_analysis_reduce", "v1", prompts.problem_analysis_reduce_template, ("partials",), ProblemAnalysisResult, prompts.problem_analysis_reduce_system_template),
+    PromptSpec("fused_analysis", "v2", prompts.fused_analysis_template, ("text", "solution", "categories"), FusedAnalysisResult, prompts.fused_analysis_system_template),
+    PromptSpec("image2text", "v1", prompts.image2text_template, ()),
+]
+
+
+def _template(spec: PromptSpec, format_instructions: Union[str, None]) -> BasePromptTemplate:
+    partial_variables = {} if format_instructions is None else {"format_instructions": format_instructions}
+    if not spec.system:
+        return PromptTemplate(
+            template=spec.template,
+            input_variables=list(spec.input_variables),
+            partial_variables=partial_variables,
+        )
+    # The system message renders first, so its tokens form the cacheable prefix
+    prompt = ChatPromptTemplate.from_messages([("system", spec.system), ("human", spec.template)])
+    return prompt.partial(**partial_variables) if partial_variables else prompt
+
+
+def _compile(spec: PromptSpec) -> CompiledPrompt:
+    if spec.output_model is None:
+        # Raw text prompts (streaming chat, OCR) have no parser
+        prompt = _template(spec, None) if spec.input_variables else None
+        return CompiledPrompt(spec=spec, prompt=prompt, structured_prompt=None, parser=None, format_instructions="")
+
+    parser = PydanticOutputParser(pydantic_object=spec.output_model)
+    format_instructions = parser.get_format_instructions()
+    prompt = _template(spec, format_instructions)
+    # The schema travels as response_format, so the prompt does not repeat it
+    structured_prompt = _template(spec, "")
+    return CompiledPrompt(
+        spec=spec,
+        prompt=prompt,
+        structured_prompt=structured_prompt,
+        parser=parser,
+        format_instructions=format_instructions,
+    )
+
+
+# Compiled once at import so schema generation never runs on the request path
+PROMPTS: Dict[str, CompiledPrompt] = {spec.name: _compile(spec) for spec in PROMPT_SPECS}
+
+REPAIR_PROMPT = PromptTemplate(
+    template=prompts.repair_template,
+    input_variables=["error", "completion", "format_instructions"],
+)
+
+_chains: Dict[Tuple[str, int], Runnable] = {}
+_chains_lock = threading.Lock()
+
+
+def get_prompt(name: str) -> CompiledPrompt:
+    """
+    이름으로 컴파일된 프롬프트를 조회합니다.
+
+    Args:
+        name: 프롬프트 이름
+
+    Returns:
+        CompiledPrompt
+
+    Raises:
+        KeyError: 등록되지 않은 프롬프트일 때
+    """
+    return PROMPTS[name]
+
+
+def prompt_version(name: str) -> str:
+    """
+    프롬프트 이름과 버전을 합친 식별자를 반환합니다. (예: "analysis@v1")
+    """
+    spec = PROMPTS[name].spec
+    return f"{spec.name}@{spec.version}"
+
+
+def _content(message: Any) -> str:
+    content = getattr(message, "content", message)
+    return content if isinstance(content, str) else str(content or "")
+
+
+def _repair_input(compiled: CompiledPrompt, completion: str, error: Exception) -> Dict[str, str]:
+    return {
+        "error": str(error),
+        "completion": completion,
+        "format_instructions": compiled.format_instructions,
+    }
+
+
+def _max_tokens(llm: Union[BaseChatModel, Runnable]) -> Union[int, None]:
+    # RunnableWithFallbacks keeps the primary model as .runnable
+    return getattr(getattr(llm, "runnable", llm), "max_tokens", None)
+
+
+def _resolver(compiled: CompiledPrompt, llm: Union[BaseChatModel, Runnable]) -> RunnableLambda:
+    """
+    structured output 결과를 출력 모델로 확정합니다.
+    파싱에 실패했을 때만 로컬 파싱 -> 최대 STRUCTURED_REPAIR_ATTEMPTS 번의 응답 수정 요청 순으로 복구합니다.
+    """
+    repair_chain = REPAIR_PROMPT | governed(llm, _max_tokens(llm)) | StrOutputParser()
+    version = f"{compiled.spec.name}@{compiled.spec.version}"
+
+    def try_parse(completion: str) -> Tuple[Union[BaseModel, None], Union[OutputParserException, None]]:
+        try:
+            return compiled.parser.parse(completion), None
+        except OutputParserException as e:
+            return None, e
+
+    def repair_steps(result: Dict[str, Any]) -> Generator[Dict[str, str], str, BaseModel]:
+        # Yields repair prompt inputs and receives the repaired completions, so sync / async share one loop
+        record_message_usage(version, result.get("raw"))
+        if result.get("parsed") is not None:
+            return result["parsed"]
+
+        completion = _content(result.get("raw"))
+        parsed, error = try_parse(completion)
+        for attempt in range(STRUCTURED_REPAIR_ATTEMPTS):
+            if parsed is not None:
+                return parsed
+            logger.warning(f"repairing {compiled.spec.name} output (attempt {attempt + 1}): {error}")
+            completion = yield _repair_input(compiled, completion, error)
+            parsed, error = try_parse(completion)
+        if parsed is None:
+            raise error
+        return parsed
+
+    def resolve(result: Dict[str, Any]) -> BaseModel:
+        steps = repair_steps(result)
+        try:
+            repair_input = next(steps)
+            while True:
+                repair_input = steps.send(repair_chain.invoke(repair_input))
+        except StopIteration as done:
+            return done.value
+
+    async def aresolve(result: Dict[str, Any]) -> BaseModel:
+        steps = repair_steps(result)
+        try:
+            repair_input = next(steps)
+            while True:
+                repair_input = steps.send(await repair_chain.ainvoke(repair_input))
+        except StopIteration as done:
+            return done.value
+
+    return RunnableLambda(resolve, afunc=aresolve)
+
+
+def _build_chain(compiled: CompiledPrompt, llm: Union[BaseChatModel, Runnable]) -> Runnable:
+    # Every variable is serialized compactly and trimmed to the prompt's token budget first,
+    # and each model call waits for its turn in llm_governor
+    fit = RunnableLambda(lambda variables: fit_prompt(compiled.spec.name, variables))
+    if STRUCTURED_OUTPUT:
+        try:
+            structured_llm = llm.with_structured_output(
+                compiled.spec.output_model,
+                method="json_schema",
+                include_raw=True,
+            )
+            return fit | compiled.structured_prompt | governed(structured_llm, _max_tokens(llm)) | _resolver(compiled, llm)
+        except NotImplementedError:
+            logger.info(f"{type(llm).__name__} has no structured output, parsing {compiled.spec.name} as text")
+
+    as_raw = RunnableLambda(lambda message: {"raw": message, "parsed": None})
+    return fit | compiled.prompt | governed(llm, _max_tokens(llm)) | as_raw | _resolver(compiled, llm)
+
+
+def get_chain(name: str, llm: Union[BaseChatModel, Runnable]) -> Runnable:
+    """
+    budget | prompt | llm | parser 로 구성된 runnable 을 반환합니다.
+    llm 호출은 llm_governor 의 차례를 받은 뒤 실행되며, lane / 학원은 호출하는 쪽의 llm_lane 을 따릅니다.
+    입력 변수는 token_count.PROMPT_BUDGETS 에 맞춰 직렬화 / 자른 뒤 프롬프트에 들어갑니다.
+    모델이 지원하면 JSON schema structured output 을 사용하고 프롬프트에서 format_instructions 를 뺍니다.
+    llm 은 llm_client 레지스트리 / model_routing 에서 받은 장수명 인스턴스이므로 (name, llm) 단위로 재사용합니다.
+
+    Args:
+        name: 프롬프트 이름
+        llm: 사용할 채팅 모델 (model_routing 의 fallback 이 붙은 모델 포함)
+
+    Returns:
+        Runnable: invoke / ainvoke 시 output_model 인스턴스를 반환
+    """
+    key = (name, id(llm))
+    with _chains_lock:
+        chain = _chains.get(key)
+        if chain is None:
+            chain = _build_chain(PROMPTS[name], llm)
+            _chains[key] = chain
+        return chain
@@ -0,0 +1,127 @@
+import importlib
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import closing
+from typing import Union
+
+
+class CacheBackend(ABC):
+    """
+    문자열 값을 TTL 과 함께 저장하는 캐시 저장소
+
+    여러 uvicorn 워커가 같은 값을 보도록 하려면 프로세스 밖의 저장소 (SQLite, Redis 등) 구현체를 사용합니다.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Union[str, None]:
+        """
+        값을 조회합니다. 없거나 만료되었으면 None 입니다.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float) -> None:
+        """
+        값을 ttl 초 동안 저장합니다.
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        값을 지웁니다. (쓰기 후 무효화)
+        """
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    프로세스 내 LRU + TTL 캐시. 워커 간에는 공유되지 않으므로 다른 워커의 무효화는 TTL 이후에 반영됩니다.
+    """
+
+    def __init__(self, max_items: int = 1024):
+        self.max_items = max_items
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Union[str, None]:
+        with self._lock:
+            cached = self._items.get(key)
+            if cached is None:
+                return None
+            if cached[1] <= time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return cached[0]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    같은 호스트의 여러 워커 프로세스가 공유하는 SQLite 캐시
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def get(self, key: str) -> Union[str, None]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl),
+            )
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+
+    def delete(self, key: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+
+def create_cache_backend(backend: str, path: str = None, max_items: int = 1024) -> CacheBackend:
+    """
+    설정 문자열로 캐시 저장소를 만듭니다.
+
+    Args:
+        backend: "memory" / "sqlite" / "package.module:ClassName"
+        path: sqlite 파일 경로
+        max_items: memory 캐시 최대 항목 수
+
+    Returns:
+        CacheBackend
+    """
+    if backend == "memory":
+        return MemoryCacheBackend(max_items)
+    if backend == "sqlite":
+        return SQLiteCacheBackend(path or os.path.join(os.getcwd(), "cache.sqlite3"))
+
+    module_name, class_name = backend.split(":")
+    return getattr(importlib.import_module(module_name), class_name)()
@@ -0,0 +1,148 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple, Union
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+STAGE_MAX_WORKERS = int(os.getenv("STAGE_MAX_WORKERS", "16"))
+
+_executor = ThreadPoolExecutor(max_workers=STAGE_MAX_WORKERS, thread_name_prefix="stage")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    파이프라인 단계
+
+    Args :
+        - name : 단계 이름 (결과 dict 의 키)
+        - func : 의존 단계 결과 dict 를 받아 결과를 반환하는 함수
+        - deps : 먼저 끝나야 하는 단계 이름
+        - timeout : 단계 제한 시간 (초), 없으면 제한 없음
+    """
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    timeout: Union[float, None] = None
+
+
+@dataclass
+class StageRun:
+    """
+    파이프라인 실행 결과
+
+    Args :
+        - results : 단계 이름 -> 결과
+        - timings : 단계 이름 -> 실행 시간 (초)
+    """
+    results: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+class StageError(Exception):
+    """
+    단계가 실패했을 때 발생하는 예외. 원래 예외는 __cause__ 에 있습니다.
+    """
+
+    def __init__(self, stage: str, message: str, timings: Dict[str, float]):
+        super().__init__(f"stage {stage} {message}")
+        self.stage = stage
+        self.timings = timings
+
+
+class StageTimeout(StageError):
+    """
+    단계가 제한 시간을 넘겼을 때 발생하는 예외
+    """
+
+
+class StageCancelled(Exception):
+    """
+    다른 단계가 실패해 취소된 단계가 남은 작업 (LLM 호출 등) 을 멈출 때 던지는 예외
+    """
+
+
+def raise_if_cancelled(cancelled: Union[threading.Event, None]) -> None:
+    """
+    단계 함수가 LLM 호출 / 저장 등 비용이 드는 작업 전에 호출합니다. 취소되었으면 StageCancelled 를 던집니다.
+    """
+    if cancelled is not None and cancelled.is_set():
+        raise StageCancelled()
+
+
+def run_stages(stages: List[Stage], cancelled: threading.Event = None) -> StageRun:
+    """
+    의존 관계가 없는 단계는 동시에 실행하고, 의존 단계가 끝나면 다음 단계를 시작합니다.
+    한 단계가 실패하거나 제한 시간을 넘기면 cancelled 를 세우고 아직 시작하지 않은 단계는 취소합니다.
+    이미 실행 중인 스레드는 강제로 멈출 수 없으므로, 결과를 버리고 바로 반환합니다.
+    실행 중인 단계는 같은 cancelled 를 받아 raise_if_cancelled 로 다음 LLM 호출 전에 멈춥니다.
+
+    Args:
+        stages: 실행할 단계 목록
+        cancelled: 취소 신호 (단계 함수에 같은 Event 를 넘겨 공유)
+
+    Returns:
+        StageRun
+
+    Raises:
+        StageError: 단계가 예외를 던졌을 때
+        StageTimeout: 단계가 제한 시간을 넘겼을 때
+    """
+    names = {stage.name for stage in stages}
+    for stage in stages:
+        missing = set(stage.deps) - names
+        if missing:
+            raise ValueError(f"stage {stage.name} depends on unknown stages {missing}")
+
+    cancelled = cancelled or threading.Event()
+    run = StageRun()
+    pending = {stage.name: stage for stage in stages}
+    running: Dict[Future, Tuple[Stage, float]] = {}
+
+    def fail(error: StageError) -> StageError:
+        cancelled.set()
+        for future in running:
+            future.cancel()
+        logger.warning(f"{error}, timings: {run.timings}")
+        return error
+
+    while pending or running:
+        # Start every stage whose dependencies are done
+        for name, stage in list(pending.items()):
+            if all(dep in run.results for dep in stage.deps):
+                inputs = {dep: run.results[dep] for dep in stage.deps}
+                # Copy the caller's context so stages keep its llm_lane
+                running[_executor.submit(contextvars.copy_context().run, stage.func, inputs)] = (stage, time.monotonic())
+                del pending[name]
+
+        if not running:
+            raise ValueError(f"stages {list(pending)} have a dependency cycle")
+
+        now = time.monotonic()
+        deadlines = [started + stage.timeout for stage, started in running.values() if stage.timeout is not None]
+        wait_timeout = max(0.0, min(deadlines) - now) if deadlines else None
+        done, _ = wait(list(running), timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+        now = time.monotonic()
+        for future in done:
+            stage, started = running.pop(future)
+            run.timings[stage.name] = round(now - started, 3)
+            try:
+                run.results[stage.name] = future.result()
+            except Exception as e:
+                raise fail(StageError(stage.name, f"failed: {e}", run.timings)) from e
+
+        for future, (stage, started) in list(running.items()):
+            if stage.timeout is not None and now - started >= stage.timeout:
+                run.timings[stage.name] = round(now - started, 3)
+                raise fail(StageTimeout(stage.name, f"timed out after {stage.timeout}s", run.timings))
+
+    logger.info(f"stage timings: {run.timings}")
+    return run
@@ -0,0 +1,214 @@
+import json
+import logging
+import os
+import threading
+from decimal import Decimal
+from typing import Any, Dict, Sequence, Tuple, Union
+import tiktoken
+from dotenv import load_dotenv
+from src.utils.llm_usage import record_prompt_tokens
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+# 모든 프롬프트 변수 예산에 곱하는 배율 (모델의 context window 가 바뀔 때 한 번에 조정)
+PROMPT_BUDGET_SCALE = float(os.getenv("PROMPT_BUDGET_SCALE", "1"))
+TRUNCATION_MARKER = " …(생략)"
+
+PROBLEM_FIELDS = ("Name", "Type", "Category", "Tags", "Question", "Choices", "Answer", "Solution")
+SUBMISSION_FIELDS = ("Explanation", "Analysis", "Reason")
+ASSIGNMENT_SUBMISSION_FIELDS = ("SK", "Reason", "Analysis")
+
+# 프롬프트별 변수 예산: {프롬프트: {변수: (최대 토큰 수, dict / list 일 때 남길 필드)}}
+# 카운터 (TotalSolved, IncorrectCount, Reasons 맵) 나 키 같은 필드는 프롬프트에 넣지 않습니다.
+PROMPT_BUDGETS: Dict[str, Dict[str, Tuple[int, Union[Tuple[str, ...], None]]]] = {
+    "chat": {
+        "problem": (1500, PROBLEM_FIELDS),
+        "submission": (1500, SUBMISSION_FIELDS),
+        "history": (2000, None),
+        "question": (500, None),
+    },
+    "analysis": {"explanation": (3000, None), "solution": (3000, None)},
+    "categorize": {"analysis_result": (2000, None)},
+    "modify": {"text": (3000, None)},
+    "validate": {"text": (3000, None)},
+    "fused_analysis": {"text": (3000, None), "solution": (3000, None)},
+    "generate": {"problem": (2000, PROBLEM_FIELDS), "reasons": (300, None)},
+    "new_generate": {"problem": (2000, PROBLEM_FIELDS), "reasons": (300, None)},
+    "title": {"problem": (1500, PROBLEM_FIELDS), "generate_result": (2000, None)},
+    "verify": {"new_problem": (2000, None)},
+    "assignment_analysis": {"assignment_submissions": (12000, ASSIGNMENT_SUBMISSION_FIELDS)},
+    "chat_summary": {"summary": (500, None), "history": (4000, None)},
+    # map / reduce 입력은 SUMMARY_CHUNK_TOKENS 로 묶이므로 JSON 직렬화 여유만 더 둡니다.
+    "problem_analysis": {"analysis": (8000, None)},
+    "problem_analysis_reduce": {"partials": (8000, None)},
+}
+PROMPT_BUDGETS["chat_stream"] = PROMPT_BUDGETS["chat"]
+
+_lock = threading.Lock()
+_encodings: Dict[str, Any] = {}
+_unavailable = set()
+
+
+def _get_encoding(model: str):
+    with _lock:
+        if model in _encodings:
+            return _encodings[model]
+        if model in _unavailable:
+            return None
+
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except Exception as e:
+        # BPE 파일을 받을 수 없는 환경 (오프라인 등) 에서는 추정치를 사용합니다.
+        logger.warning(f"tiktoken encoding for {model} unavailable, estimating token counts: {e}")
+        with _lock:
+            _unavailable.add(model)
+        return None
+
+    with _lock:
+        _encodings[model] = encoding
+    return encoding
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    tokenizer 없이 토큰 수를 보수적으로 추정합니다. (ASCII 4글자당 1토큰, 한글 등은 글자당 1토큰)
+    """
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def count_tokens(text: Union[str, None], model: str = "gpt-4o") -> int:
+    """
+    모델의 tokenizer 로 텍스트의 토큰 수를 셉니다.
+
+    Args:
+        text: 텍스트
+        model: 모델 이름
+
+    Returns:
+        int: 토큰 수
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = "gpt-4o") -> str:
+    """
+    텍스트를 앞에서부터 max_tokens 이하로 자르고, 잘렸다면 생략 표시를 붙입니다.
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text
+
+    keep = max(max_tokens - count_tokens(TRUNCATION_MARKER, model), 0)
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:keep]) + TRUNCATION_MARKER
+
+    # Binary search the longest prefix whose estimate fits
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= keep:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + TRUNCATION_MARKER
+
+
+def _plain(value: Any) -> Any:
+    # DynamoDB numbers arrive as Decimal
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return str(value)
+
+
+def compact_item(item: Dict[str, Any], fields: Union[Sequence[str], None] = None) -> str:
+    """
+    DynamoDB 아이템을 필요한 필드만 남긴 짧은 JSON 으로 직렬화합니다.
+    빈 값은 빼고, 키 순서를 고정해 같은 아이템은 항상 같은 텍스트가 되도록 합니다. (프롬프트 캐시)
+
+    Args:
+        item: DynamoDB 아이템
+        fields: 남길 필드, 없으면 전체
+
+    Returns:
+        str: 직렬화된 아이템
+    """
+    selected = {
+        key: value for key, value in item.items()
+        if (fields is None or key in fields) and value not in (None, "", [], {})
+    }
+    return json.dumps(selected, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=_plain)
+
+
+def compact_items(
+        items: Sequence[Any],
+        max_tokens: int,
+        fields: Union[Sequence[str], None] = None,
+        model: str = "gpt-4o",
+) -> Tuple[str, int]:
+    """
+    아이템 목록을 한 줄에 하나씩 직렬화하고, 예산을 넘는 뒤쪽 아이템은 개수만 남깁니다.
+
+    Returns:
+        (직렬화된 목록, 생략한 아이템 수)
+    """
+    lines, used = [], 0
+    for i, item in enumerate(items):
+        line = compact_item(item, fields) if isinstance(item, dict) else str(item)
+        tokens = count_tokens(line, model) + 1
+        if used + tokens > max_tokens:
+            lines.append(f"…(외 {len(items) - i}건 생략)")
+            return "\n".join(lines), len(items) - i
+        lines.append(line)
+        used += tokens
+    return "\n".join(lines), 0
+
+
+def fit_prompt(name: str, variables: Dict[str, Any], model: str = "gpt-4o") -> Dict[str, Any]:
+    """
+    프롬프트 변수를 PROMPT_BUDGETS 에 맞춰 직렬화 / 자르고, 변수별 토큰 수를 기록합니다.
+    예산이 없는 변수도 dict / list 는 짧은 JSON 으로 바꿔 토큰 수를 기록합니다.
+
+    Args:
+        name: 프롬프트 이름
+        variables: 프롬프트 입력
+        model: 토큰을 셀 모델
+
+    Returns:
+        예산에 맞춘 프롬프트 입력
+    """
+    budgets = PROMPT_BUDGETS.get(name, {})
+    fitted, tokens, truncated = {}, {}, []
+    for key, value in variables.items():
+        max_tokens, fields = budgets.get(key, (None, None))
+        if max_tokens is not None:
+            max_tokens = int(max_tokens * PROMPT_BUDGET_SCALE)
+
+        omitted = 0
+        if isinstance(value, list):
+            text, omitted = compact_items(value, max_tokens or 1 << 30, fields, model)
+        elif isinstance(value, dict):
+            text = compact_item(value, fields)
+        else:
+            text = "" if value is None else str(value)
+
+        if max_tokens is not None:
+            trimmed = truncate_tokens(text, max_tokens, model)
+            if omitted or trimmed != text:
+                truncated.append(key)
+            text = trimmed
+
+        fitted[key] = text
+        tokens[key] = count_tokens(text, model)
+
+    record_prompt_tokens(name, tokens, truncated)
+    if truncated:
+        logger.info(f"{name} prompt trimmed to budget: {truncated} ({sum(tokens.values())} tokens)")
+    return fitted
@@ -0,0 +1,37 @@
+import logging
+import signal
+import threading
+from src.service import image_process_service
+from src.utils.job_queue import WorkerPool, get_job_queue, JOB_WORKERS
+from src.utils.problem_counters import get_counter_writer
+from src.utils.model_routing import load_model_routes
+from src.utils.chat_session import require_shared_sessions
+
+logger = logging.getLogger(__name__)
+
+# task 이름 -> 핸들러
+HANDLERS = {
+    "image_process": image_process_service.image_process_job,
+}
+
+
+def create_worker_pool(workers: int = JOB_WORKERS) -> WorkerPool:
+    return WorkerPool(get_job_queue(), HANDLERS, workers=workers)
+
+
+if __name__ == "__main__":
+    # Run workers in a dedicated process: python -m src.worker
+    logging.basicConfig(level=logging.INFO)
+    load_model_routes()
+    require_shared_sessions()
+    pool = create_worker_pool()
+    pool.start()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    stop.wait()
+
+    logger.info("stopping job workers")
+    pool.stop()
+    get_counter_writer().close()